@@ -2,8 +2,9 @@ from fastapi import WebSocket
 import uuid
 
 from gpt_researcher.utils.llm import get_llm
-from gpt_researcher.memory import Memory
+from gpt_researcher.memory import Memory, get_embedding_cache
 from gpt_researcher.config.config import Config
+from gpt_researcher.utils.scheduler import Priority, get_scheduler, priority
 
 from langgraph.prebuilt import create_react_agent
 from langgraph.checkpoint.memory import MemorySaver
@@ -48,6 +49,8 @@ class ChatAgentWithMemory:
             self.embedding = Memory(
                 cfg.embedding_provider,
                 cfg.embedding_model,
+                cache=get_embedding_cache(cfg),
+                scheduler=get_scheduler(cfg),
                 **cfg.embedding_kwargs
             ).get_embeddings()
             self.vector_store = InMemoryVectorStore(self.embedding)
@@ -99,7 +102,10 @@ class ChatAgentWithMemory:
          User Message: {message}
         """
         inputs = {"messages": [("user", message)]}
-        response = await self.graph.ainvoke(inputs, config=self.chat_config)
+        # 聊天是交互式请求，优先于后台的报告撰写获得LLM调度
+        with priority(Priority.INTERACTIVE):
+            async with get_scheduler(self.config).limit("llm", self.config.smart_llm_provider):
+                response = await self.graph.ainvoke(inputs, config=self.chat_config)
         ai_message = response["messages"][-1].content
         if websocket is not None:
             await websocket.send_json({"type": "chat", "content": ai_message})
@@ -1,8 +1,11 @@
 import asyncio
-from typing import List, Dict, Set, Optional, Any
+from typing import List, Dict, Set, Optional, Any, Awaitable, Callable
 from fastapi import WebSocket
 
 from gpt_researcher import GPTResearcher
+from gpt_researcher.actions import stream_output
+
+from .pipeline import BufferedWebSocket, StageGraph
 
 # 定义一个详细报告类
 class DetailedReport:
@@ -46,16 +49,53 @@ class DetailedReport:
         self.global_written_sections: List[str] = []
         self.global_urls: Set[str] = set(
             self.source_urls) if self.source_urls else set()
+        # 各阶段的执行器和耗时
+        self.pipeline = StageGraph()
 
     # 异步运行方法，用于生成详细报告
+    # 引言只依赖初始研究，与子话题研究并发执行；子话题按顺序撰写前先发送引言，保证输出顺序不变
     async def run(self) -> str:
-        await self._initial_research()
-        subtopics = await self._get_all_subtopics()
-        report_introduction = await self.gpt_researcher.write_introduction()
-        _, report_body = await self._generate_subtopic_reports(subtopics)
+        pipeline = self.pipeline
+        pipeline.add("initial_research", self._initial_research)
+        pipeline.add("subtopics", lambda _: self._get_all_subtopics(), "initial_research")
+        pipeline.add("introduction", lambda _: self._write_introduction(), "initial_research")
+        pipeline.add(
+            "subtopic_reports",
+            lambda subtopics: self._generate_subtopic_reports(subtopics, self._send_introduction),
+            "subtopics",
+        )
+        pipeline.add("report", self._finish_report, "introduction", "subtopic_reports")
+
+        results = await pipeline.run()
+
+        if self.gpt_researcher.verbose:
+            await stream_output(
+                "logs",
+                "stage_timings",
+                "⏱️ Detailed report stages: " + ", ".join(
+                    f"{name} {timing['duration']:.1f}s" for name, timing in pipeline.timings.items()
+                    if ":" not in name
+                ),
+                self.websocket,
+                metadata=pipeline.timings,
+            )
+        return results["report"]
+
+    # 撰写引言，流式输出先缓存起来，等轮到引言时再发送
+    # 只有引言写入缓存，同时进行的其他阶段仍直接使用研究者的WebSocket
+    async def _write_introduction(self) -> str:
+        self._introduction_output = BufferedWebSocket(self.gpt_researcher.websocket)
+        return await self.gpt_researcher.write_introduction(self._introduction_output)
+
+    # 等待引言完成并发送其缓存的输出
+    async def _send_introduction(self) -> None:
+        await self.pipeline.wait("introduction")
+        await self._introduction_output.flush()
+
+    async def _finish_report(self, introduction: str, subtopic_reports: tuple) -> str:
+        _, report_body = subtopic_reports
         self.gpt_researcher.visited_urls.update(self.global_urls)
-        report = await self._construct_detailed_report(report_introduction, report_body)
-        return report
+        return await self._construct_detailed_report(introduction, report_body)
 
     # 进行初始研究
     async def _initial_research(self) -> None:
@@ -76,40 +116,70 @@ class DetailedReport:
 
         return all_subtopics
 
-    # 生成子话题报告
-    async def _generate_subtopic_reports(self, subtopics: List[Dict]) -> tuple:
+    # 生成子话题报告：并发研究所有子话题，再按子话题顺序逐个撰写，保证报告章节顺序与子话题顺序一致
+    # before_writing 在撰写第一个子话题前等待，研究不受其影响
+    async def _generate_subtopic_reports(
+        self, subtopics: List[Dict], before_writing: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> tuple:
         subtopic_reports = []
         subtopics_report_body = ""
 
-        for subtopic in subtopics:
-            result = await self._get_subtopic_report(subtopic)
-            if result["report"]:
-                subtopic_reports.append(result)
-                subtopics_report_body += f"\n\n\n{result['report']}"
+        # 限制同时进行研究的子话题数量
+        semaphore = asyncio.Semaphore(max(1, self.gpt_researcher.cfg.max_subtopic_research_workers))
+        research_tasks = [
+            asyncio.create_task(self._research_subtopic(subtopic, semaphore, index))
+            for index, subtopic in enumerate(subtopics)
+        ]
+
+        try:
+            if before_writing is not None:
+                await before_writing()
+            for index, (subtopic, research_task) in enumerate(zip(subtopics, research_tasks)):
+                subtopic_assistant, draft_section_titles = await research_task
+                async with self.pipeline.timed(f"subtopic_report:{index}"):
+                    result = await self._get_subtopic_report(subtopic, subtopic_assistant, draft_section_titles)
+                if result["report"]:
+                    subtopic_reports.append(result)
+                    subtopics_report_body += f"\n\n\n{result['report']}"
+        finally:
+            # 出错时取消尚未完成的研究任务
+            for research_task in research_tasks:
+                research_task.cancel()
 
         return subtopic_reports, subtopics_report_body
 
-    # 获取子话题报告
-    async def _get_subtopic_report(self, subtopic: Dict) -> Dict[str, str]:
+    # 研究子话题并生成草稿章节标题，不依赖其他子话题的结果，可以并发执行
+    # 每个子话题都以初始研究的上下文为起点，因此研究结果与子话题的完成顺序无关
+    async def _research_subtopic(self, subtopic: Dict, semaphore: asyncio.Semaphore, index: int = 0) -> tuple:
+        current_subtopic_task = subtopic.get("task")
+        async with semaphore, self.pipeline.timed(f"subtopic_research:{index}"):
+            subtopic_assistant = GPTResearcher(
+                query=current_subtopic_task,
+                report_type="subtopic_report",
+                report_source=self.report_source,
+                websocket=self.websocket,
+                headers=self.headers,
+                parent_query=self.query,
+                subtopics=self.subtopics,
+                # 每个子话题使用自己的URL集合，撰写时再按顺序合并
+                visited_urls=set(self.global_urls),
+                agent=self.gpt_researcher.agent,
+                role=self.gpt_researcher.role,
+                tone=self.tone,
+            )
+
+            subtopic_assistant.context = list(dict.fromkeys(self.global_context))
+            await subtopic_assistant.conduct_research()
+
+            draft_section_titles = await subtopic_assistant.get_draft_section_titles(current_subtopic_task)
+
+        return subtopic_assistant, draft_section_titles
+
+    # 获取子话题报告，依赖之前已撰写的章节和标题，因此按顺序执行
+    async def _get_subtopic_report(
+        self, subtopic: Dict, subtopic_assistant: GPTResearcher, draft_section_titles: Any
+    ) -> Dict[str, str]:
         current_subtopic_task = subtopic.get("task")
-        subtopic_assistant = GPTResearcher(
-            query=current_subtopic_task,
-            report_type="subtopic_report",
-            report_source=self.report_source,
-            websocket=self.websocket,
-            headers=self.headers,
-            parent_query=self.query,
-            subtopics=self.subtopics,
-            visited_urls=self.global_urls,
-            agent=self.gpt_researcher.agent,
-            role=self.gpt_researcher.role,
-            tone=self.tone,
-        )
-
-        subtopic_assistant.context = list(set(self.global_context))
-        await subtopic_assistant.conduct_research()
-
-        draft_section_titles = await subtopic_assistant.get_draft_section_titles(current_subtopic_task)
 
         if not isinstance(draft_section_titles, str):
             draft_section_titles = str(draft_section_titles)
@@ -125,7 +195,6 @@ class DetailedReport:
         subtopic_report = await subtopic_assistant.write_report(self.existing_headers, relevant_contents)
 
         self.global_written_sections.extend(self.gpt_researcher.extract_sections(subtopic_report))
-        self.global_context = list(set(subtopic_assistant.context))
         self.global_urls.update(subtopic_assistant.visited_urls)
 
         self.existing_headers.append({
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from colorama import Fore, Style
+
+
+# 按依赖关系执行异步阶段的执行器：每个阶段在其依赖全部完成后立即开始，互不依赖的阶段并发执行
+class StageGraph:
+    def __init__(self):
+        self._stages: Dict[str, Tuple[Callable[..., Awaitable[Any]], Tuple[str, ...]]] = {}
+        self._tasks: Dict[str, asyncio.Future] = {}
+        self._started: Optional[float] = None
+        # 每个阶段相对于开始时间的起止时间（秒）
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    # 添加阶段，func 以依赖阶段的结果作为参数被调用，依赖必须先于该阶段添加
+    def add(self, name: str, func: Callable[..., Awaitable[Any]], *deps: str) -> None:
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dep}")
+        self._stages[name] = (func, deps)
+
+    # 记录代码块的耗时，也可用于阶段内部的子步骤
+    @asynccontextmanager
+    async def timed(self, name: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            self.timings[name] = {
+                "start": round(start - (self._started or start), 3),
+                "end": round(end - (self._started or start), 3),
+                "duration": round(end - start, 3),
+            }
+
+    # 等待某个阶段完成并返回其结果，供阶段内部按需等待其他阶段（流水线）
+    async def wait(self, name: str) -> Any:
+        return await asyncio.shield(self._tasks[name])
+
+    async def _run_stage(self, name: str) -> Any:
+        func, deps = self._stages[name]
+        results = [await asyncio.shield(self._tasks[dep]) for dep in deps]
+        async with self.timed(name):
+            return await func(*results)
+
+    # 运行所有阶段，返回各阶段的结果；任一阶段失败时取消其余阶段
+    async def run(self) -> Dict[str, Any]:
+        self._started = time.monotonic()
+        for name in self._stages:
+            self._tasks[name] = asyncio.ensure_future(self._run_stage(name))
+        try:
+            await asyncio.gather(*self._tasks.values())
+        finally:
+            for task in self._tasks.values():
+                if not task.done():
+                    task.cancel()
+        return {name: task.result() for name, task in self._tasks.items()}
+
+
+# 暂存报告内容的WebSocket代理：并发撰写的章节先缓存，轮到它时再按顺序发送，日志照常转发
+class BufferedWebSocket:
+    def __init__(self, websocket: Any = None):
+        self.websocket = websocket
+        self._buffer: List[Dict[str, Any]] = []
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        if data.get("type") == "report":
+            self._buffer.append(data)
+        elif self.websocket is not None:
+            await self.websocket.send_json(data)
+
+    async def flush(self) -> None:
+        buffer, self._buffer = self._buffer, []
+        for data in buffer:
+            if self.websocket is not None:
+                await self.websocket.send_json(data)
+            else:
+                print(f"{Fore.GREEN}{data.get('output')}{Style.RESET_ALL}")
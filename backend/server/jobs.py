@@ -0,0 +1,216 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+
+class JobQueueFull(Exception):
+    """队列已满或租户排队的任务过多时拒绝新任务"""
+
+
+class Job:
+    """
+    一次研究任务：保存参数、状态和全部输出事件。
+    任务本身充当研究代码的websocket，输出按顺序编号后放入所有订阅连接的发送队列，断线重连后可从任意位置继续接收。
+    研究从不等待客户端，缓慢或卡住的连接只会拖慢它自己的发送队列。
+    """
+
+    def __init__(self, tenant: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.tenant = tenant
+        self.params = params
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.report: Optional[str] = None
+        # 报告完成后基于该报告的聊天代理，每个任务一个
+        self.chat_agent = None
+        self.events: List[Dict[str, Any]] = []
+        # 订阅连接的发送队列，元素为JSON文本
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_requested = False
+        # 来自客户端的回复，例如多代理任务中的人类反馈
+        self._replies: asyncio.Queue = asyncio.Queue()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        """记录事件并放入所有订阅连接的发送队列，不等待发送完成"""
+        event = {**data, "job_id": self.id, "seq": len(self.events)}
+        self.events.append(event)
+        message = json.dumps(event)
+        for queue in self.subscribers:
+            queue.put_nowait(message)
+
+    async def receive_text(self) -> str:
+        """等待客户端的下一条回复"""
+        return await self._replies.get()
+
+    def put_reply(self, text: str) -> None:
+        self._replies.put_nowait(text)
+
+    def attach(self, queue: asyncio.Queue, last_seq: int = -1) -> None:
+        """将连接的发送队列订阅到任务输出，先补发 last_seq 之后的全部事件"""
+        # 补发和订阅之间没有await，不会漏掉或重复事件
+        for event in self.events[max(last_seq + 1, 0):]:
+            queue.put_nowait(json.dumps(event))
+        self.subscribers.add(queue)
+
+    def detach(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    研究任务的队列和工作池。
+    最多 max_workers 个任务同时运行，每个租户最多同时运行 max_jobs_per_tenant 个，
+    其余任务排队；队列已满时拒绝新任务（背压）。结束的任务保留 retention 秒以便重连后恢复。
+    """
+
+    def __init__(
+        self,
+        runner: Optional[Callable[[Job], Awaitable[Any]]] = None,
+        max_workers: int = 4,
+        max_queued: int = 32,
+        max_jobs_per_tenant: int = 2,
+        max_queued_per_tenant: int = 8,
+        retention: int = 3600,
+    ):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_jobs_per_tenant = max_jobs_per_tenant
+        self.max_queued_per_tenant = max_queued_per_tenant
+        self.retention = retention
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Deque[Job] = deque()
+        self._running: Dict[str, int] = {}
+        self._workers: List[asyncio.Task] = []
+        self._condition: Optional[asyncio.Condition] = None
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        return self.jobs.get(job_id) if job_id else None
+
+    async def submit(self, tenant: str, params: Dict[str, Any]) -> Job:
+        """将任务加入队列，队列已满时抛出 JobQueueFull"""
+        self._purge()
+        if len(self._queue) >= self.max_queued:
+            raise JobQueueFull("服务器繁忙，请稍后重试")
+        if sum(1 for job in self._queue if job.tenant == tenant) >= self.max_queued_per_tenant:
+            raise JobQueueFull("排队的任务过多，请等待已提交的任务完成")
+
+        job = Job(tenant, params)
+        self.jobs[job.id] = job
+        self._queue.append(job)
+        self._start_workers()
+        await job.send_json({"type": "job", "status": "queued", "position": len(self._queue)})
+        async with self._condition:
+            self._condition.notify_all()
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """取消排队中或运行中的任务"""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        if job in self._queue:
+            self._queue.remove(job)
+            await self._finish(job, "cancelled")
+            await self._send_positions()
+        elif job.task is not None:
+            job.cancel_requested = True
+            job.task.cancel()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "running": sum(self._running.values()),
+            "running_per_tenant": dict(self._running),
+            "workers": self.max_workers,
+        }
+
+    def _start_workers(self) -> None:
+        # asyncio原语绑定到首次使用时的事件循环，因此延迟到第一个任务时创建
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.max_workers:
+            self._workers.append(asyncio.create_task(self._work()))
+
+    def _next_job(self) -> Optional[Job]:
+        # 按提交顺序选择第一个所属租户未达到并发上限的任务，其他租户不会被阻塞
+        for job in self._queue:
+            if self._running.get(job.tenant, 0) < self.max_jobs_per_tenant:
+                return job
+        return None
+
+    async def _work(self) -> None:
+        while True:
+            async with self._condition:
+                job = self._next_job()
+                while job is None:
+                    await self._condition.wait()
+                    job = self._next_job()
+                self._queue.remove(job)
+                self._running[job.tenant] = self._running.get(job.tenant, 0) + 1
+
+            try:
+                await self._send_positions()
+                await self._run(job)
+            finally:
+                self._running[job.tenant] -= 1
+                if not self._running[job.tenant]:
+                    del self._running[job.tenant]
+                async with self._condition:
+                    self._condition.notify_all()
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        await job.send_json({"type": "job", "status": "running"})
+        job.task = asyncio.create_task(self.runner(job))
+        try:
+            await job.task
+            await self._finish(job, "done")
+        except asyncio.CancelledError:
+            # 只有用户取消任务时才吞掉异常，工作协程本身被取消时继续向上抛出
+            if not job.cancel_requested:
+                raise
+            await self._finish(job, "cancelled")
+        except Exception as e:
+            job.error = str(e)
+            await self._finish(job, "failed")
+
+    async def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        await job.send_json({"type": "job", "status": status, "output": job.error})
+
+    async def _send_positions(self) -> None:
+        for position, job in enumerate(list(self._queue), start=1):
+            await job.send_json({"type": "job", "status": "queued", "position": position})
+
+    def _purge(self) -> None:
+        """删除结束超过 retention 秒的任务"""
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished and job.finished_at and now - job.finished_at > self.retention:
+                del self.jobs[job_id]
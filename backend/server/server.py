@@ -4,10 +4,12 @@ from typing import Dict, List
 
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, File, UploadFile, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
+from backend.server.jobs import JobManager
 from backend.server.websocket_manager import WebSocketManager
 from backend.server.server_utils import (
     get_config_dict,
@@ -49,8 +51,15 @@ app.mount("/site", StaticFiles(directory="./frontend"), name="site")
 app.mount("/static", StaticFiles(directory="./frontend/static"), name="static")
 templates = Jinja2Templates(directory="./frontend")
 
-# WebSocket管理器
-manager = WebSocketManager()
+# WebSocket管理器，研究任务在有界的工作池中排队运行。
+# 租户默认按客户端地址区分，部署在反向代理之后时需设置 TENANT_HEADER，见 get_tenant
+manager = WebSocketManager(JobManager(
+    max_workers=int(os.getenv("MAX_JOB_WORKERS", 4)),
+    max_queued=int(os.getenv("MAX_QUEUED_JOBS", 32)),
+    max_jobs_per_tenant=int(os.getenv("MAX_JOBS_PER_TENANT", 2)),
+    max_queued_per_tenant=int(os.getenv("MAX_QUEUED_JOBS_PER_TENANT", 8)),
+    retention=int(os.getenv("JOB_RETENTION", 3600)),
+))
 
 # 中间件
 app.add_middleware(
@@ -88,6 +97,19 @@ async def list_files():
     return {"files": files}
 
 
+@app.get("/jobs/")
+async def list_jobs():
+    return manager.jobs.stats()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = manager.jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"message": "任务不存在或已过期"})
+    return job.summary()
+
+
 @app.post("/api/multi_agents")
 async def run_multi_agents():
     return await execute_multi_agents(manager)
@@ -1,15 +1,15 @@
 import json
 import os
 import re
-import time
 import shutil
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from fastapi.responses import JSONResponse
 
 from gpt_researcher.actions import stream_output
 from gpt_researcher.document.document import DocumentLoader
 # 添加这个导入
 from backend.utils import write_md_to_pdf, write_md_to_word, write_text_to_md
+from backend.server.jobs import JobQueueFull
 from multi_agents.main import run_research_task
 
 
@@ -17,7 +17,16 @@ from multi_agents.main import run_research_task
 def sanitize_filename(filename: str) -> str:
     return re.sub(r"[^\w\s-]", "", filename).strip()
 
-# 处理启动命令，生成报告并发送文件路径
+# 获取连接所属的租户，用于 MAX_JOBS_PER_TENANT 等限制。
+# 默认按客户端地址区分，客户端无法自行选择租户；但经过反向代理时所有用户的地址相同，会共用一个租户。
+# 此时应让代理在认证后设置请求头（并删除客户端传来的同名头），再通过 TENANT_HEADER 指定该请求头的名称。
+def get_tenant(websocket) -> str:
+    tenant_header = os.getenv("TENANT_HEADER")
+    if tenant_header and websocket.headers.get(tenant_header):
+        return websocket.headers[tenant_header]
+    return websocket.client.host if websocket.client else ""
+
+# 处理启动命令，将研究任务加入队列；报告和文件由工作池中的任务生成并推送
 async def handle_start_command(websocket, data: str, manager):
     json_data = json.loads(data[6:])
     task, report_type, source_urls, tone, headers, report_source = extract_command_data(
@@ -27,20 +36,42 @@ async def handle_start_command(websocket, data: str, manager):
         print("错误：缺少任务或报告类型")
         return
 
-    sanitized_filename = sanitize_filename(f"task_{int(time.time())}_{task}")
-
-    report = await manager.start_streaming(
-        task, report_type, report_source, source_urls, tone, websocket, headers
-    )
-    report = str(report)
-    file_paths = await generate_report_files(report, sanitized_filename)
-    await send_file_paths(websocket, file_paths)
-
-# 处理人类反馈
-async def handle_human_feedback(data: str):
-    feedback_data = json.loads(data[14:])  # 移除 "human_feedback" 前缀
-    print(f"收到人类反馈：{feedback_data}")
-    # TODO: 添加逻辑将反馈转发给适当的代理或更新研究状态
+    try:
+        await manager.submit_job(
+            task, report_type, report_source, source_urls, tone, websocket, headers, get_tenant(websocket)
+        )
+    except JobQueueFull as e:
+        await websocket.send_json({"type": "job", "status": "rejected", "output": str(e)})
+
+# 处理恢复命令，重连后从 last_seq 之后继续接收任务输出
+# 查找属于该连接租户的任务，其他租户的任务与不存在的任务一样处理
+def get_tenant_job(websocket, job_id: Optional[str], manager):
+    job = manager.jobs.get(job_id)
+    if job is None or job.tenant != get_tenant(websocket):
+        return None
+    return job
+
+async def handle_resume(websocket, data: str, manager):
+    json_data = json.loads(data[6:])
+    job = get_tenant_job(websocket, json_data.get("job_id"), manager)
+    if job is None:
+        await websocket.send_json({"type": "job", "status": "unknown", "output": "任务不存在或已过期"})
+        return
+    await manager.attach(job, websocket, int(json_data.get("last_seq", -1)))
+
+# 处理取消命令
+async def handle_cancel(websocket, data: str, manager):
+    json_data = json.loads(data[6:] or "{}")
+    job = get_tenant_job(websocket, json_data.get("job_id") or manager.connection_jobs.get(websocket), manager)
+    if job is None or not await manager.jobs.cancel(job.id):
+        await websocket.send_json({"type": "job", "status": "unknown", "output": "任务不存在或已结束"})
+
+# 处理人类反馈，转交给该连接正在运行的任务
+async def handle_human_feedback(websocket, data: str, manager):
+    feedback = data[14:].strip()  # 移除 "human_feedback" 前缀
+    print(f"收到人类反馈：{feedback}")
+    if not manager.reply(feedback, websocket):
+        print("错误：没有等待反馈的任务")
 
 # 处理聊天消息
 async def handle_chat(websocket, data: str, manager):
@@ -55,10 +86,6 @@ async def generate_report_files(report: str, filename: str) -> Dict[str, str]:
     md_path = await write_text_to_md(report, filename)
     return {"pdf": pdf_path, "docx": docx_path, "md": md_path}
 
-# 发送文件路径
-async def send_file_paths(websocket, file_paths: Dict[str, str]):
-    await websocket.send_json({"type": "path", "output": file_paths})
-
 # 获取配置字典
 def get_config_dict(
     langchain_api_key: str, openai_api_key: str, tavily_api_key: str,
@@ -126,7 +153,11 @@ async def handle_websocket_communication(websocket, manager):
         if data.startswith("start"):
             await handle_start_command(websocket, data, manager)
         elif data.startswith("human_feedback"):
-            await handle_human_feedback(data)
+            await handle_human_feedback(websocket, data, manager)
+        elif data.startswith("resume"):
+            await handle_resume(websocket, data, manager)
+        elif data.startswith("cancel"):
+            await handle_cancel(websocket, data, manager)
         elif data.startswith("chat"):
             await handle_chat(websocket, data, manager)
         else:
@@ -1,6 +1,7 @@
 import asyncio
 import datetime
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional
 
 from fastapi import WebSocket
 
@@ -11,16 +12,24 @@ from gpt_researcher.utils.enum import ReportType, Tone
 from multi_agents.main import run_research_task
 from gpt_researcher.actions import stream_output  # 导入 stream_output
 
+from backend.server.jobs import Job, JobManager
+from backend.server.server_utils import generate_report_files, sanitize_filename
+
 
 class WebSocketManager:
     """管理WebSocket连接"""
 
-    def __init__(self):
+    def __init__(self, job_manager: Optional[JobManager] = None):
         """初始化WebSocketManager类"""
         self.active_connections: List[WebSocket] = []
         self.sender_tasks: Dict[WebSocket, asyncio.Task] = {}
         self.message_queues: Dict[WebSocket, asyncio.Queue] = {}
-        self.chat_agent = None
+        # 研究任务在工作池中运行，不再阻塞各自的WebSocket连接
+        self.jobs = job_manager or JobManager()
+        if self.jobs.runner is None:
+            self.jobs.runner = self.run_job
+        # 每个连接最近提交或恢复的任务，聊天和人类反馈发往该任务
+        self.connection_jobs: Dict[WebSocket, str] = {}
 
     async def start_sender(self, websocket: WebSocket):
         """启动发送者任务"""
@@ -51,30 +60,77 @@ class WebSocketManager:
 
     async def disconnect(self, websocket: WebSocket):
         """断开WebSocket连接"""
+        queue = self.message_queues.get(websocket)
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             self.sender_tasks[websocket].cancel()
             await self.message_queues[websocket].put(None)
             del self.sender_tasks[websocket]
             del self.message_queues[websocket]
+        # 断开后任务继续运行，输出保留在任务中等待重连
+        job = self.jobs.get(self.connection_jobs.pop(websocket, None))
+        if job and queue:
+            job.detach(queue)
+
+    async def submit_job(self, task, report_type, report_source, source_urls, tone, websocket, headers=None, tenant="") -> Job:
+        """提交研究任务并订阅其输出，队列已满时抛出 JobQueueFull"""
+        job = await self.jobs.submit(tenant, {
+            "task": task,
+            "report_type": report_type,
+            "report_source": report_source,
+            "source_urls": source_urls,
+            "tone": tone,
+            "headers": headers,
+        })
+        await self.attach(job, websocket)
+        return job
+
+    async def attach(self, job: Job, websocket: WebSocket, last_seq: int = -1) -> None:
+        """将连接订阅到任务，补发 last_seq 之后的输出；输出经由该连接的发送队列发出"""
+        queue = self.message_queues.get(websocket)
+        if queue is None:
+            return
+        previous = self.jobs.get(self.connection_jobs.get(websocket))
+        if previous and previous is not job:
+            previous.detach(queue)
+        self.connection_jobs[websocket] = job.id
+        job.attach(queue, last_seq)
 
-    async def start_streaming(self, task, report_type, report_source, source_urls, tone, websocket, headers=None):
-        """开始流式传输输出"""
-        tone = Tone[tone]
+    async def run_job(self, job: Job):
+        """在工作池中运行任务：生成报告和文件，并为该任务创建聊天代理"""
+        params = job.params
+        tone = Tone[params["tone"]]
         # 在此处添加自定义的JSON配置文件路径
         config_path = "default"
-        report = await run_agent(task, report_type, report_source, source_urls, tone, websocket, headers=headers, config_path=config_path)
-        # 每次编写新报告时创建新的聊天代理
-        self.chat_agent = ChatAgentWithMemory(report, config_path, headers)
-        return report
+        report = await run_agent(
+            params["task"], params["report_type"], params["report_source"], params["source_urls"], tone, job,
+            headers=params["headers"], config_path=config_path
+        )
+        job.report = str(report)
+        sanitized_filename = sanitize_filename(f"task_{int(time.time())}_{params['task']}")
+        file_paths = await generate_report_files(job.report, sanitized_filename)
+        await job.send_json({"type": "path", "output": file_paths})
+        # 每个任务有自己的聊天代理，不同连接之间互不影响
+        # 创建时会同步嵌入报告，放到线程中执行以免阻塞事件循环
+        job.chat_agent = await asyncio.to_thread(ChatAgentWithMemory, job.report, config_path, params["headers"])
+        return job.report
 
     async def chat(self, message, websocket):
         """基于消息差异与代理聊天"""
-        if self.chat_agent:
-            await self.chat_agent.chat(message, websocket)
+        job = self.jobs.get(self.connection_jobs.get(websocket))
+        if job and job.chat_agent:
+            await job.chat_agent.chat(message, websocket)
         else:
             await websocket.send_json({"type": "chat", "content": "知识库为空，请先运行研究以获取知识"})
 
+    def reply(self, text: str, websocket: WebSocket) -> bool:
+        """将客户端的回复（如人类反馈）转交给该连接的任务"""
+        job = self.jobs.get(self.connection_jobs.get(websocket))
+        if job is None or job.finished:
+            return False
+        job.put_reply(text)
+        return True
+
 async def run_agent(task, report_type, report_source, source_urls, tone: Tone, websocket, headers=None, config_path=""):
     """运行代理"""
     start_time = datetime.datetime.now()
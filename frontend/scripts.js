@@ -32,10 +32,16 @@ const GPTResearcher = (() => {
       output: '🤔 Thinking about research questions for the task...',
     })
 
+    currentJob = null
+    lastSeq = -1
     listenToSockEvents()
   }
 
-  const listenToSockEvents = () => {
+  // 当前研究任务及已收到的最后一条输出，连接意外断开后据此恢复
+  let currentJob = null
+  let lastSeq = -1
+
+  const listenToSockEvents = (resume = false) => {
     const { protocol, host, pathname } = window.location
     const ws_uri = `${
       protocol === 'https:' ? 'wss:' : 'ws:'
@@ -46,7 +52,13 @@ const GPTResearcher = (() => {
     socket.onmessage = (event) => {
       const data = JSON.parse(event.data)
       console.log("Received message:", data);  // Debug log
-      if (data.type === 'logs') {
+      if (data.job_id) {
+        currentJob = data.job_id
+        lastSeq = Math.max(lastSeq, data.seq)
+      }
+      if (data.type === 'job') {
+        updateJobStatus(data)
+      } else if (data.type === 'logs') {
         addAgentResponse(data)
       } else if (data.type === 'images') {
       console.log("Received images:", data);  // Debug log
@@ -59,7 +71,18 @@ const GPTResearcher = (() => {
       }
     }
 
+    socket.onclose = (event) => {
+      // 任务仍在运行时自动重连，服务器会补发断开期间的输出
+      if (currentJob && !event.wasClean) {
+        setTimeout(() => listenToSockEvents(true), 1000)
+      }
+    }
+
     socket.onopen = (event) => {
+      if (resume) {
+        socket.send(`resume ${JSON.stringify({ job_id: currentJob, last_seq: lastSeq })}`)
+        return
+      }
       const task = document.querySelector('input[name="task"]').value
       const report_type = document.querySelector(
         'select[name="report_type"]'
@@ -88,6 +111,17 @@ const GPTResearcher = (() => {
     }
   }
 
+  const updateJobStatus = (data) => {
+    if (data.status === 'queued') {
+      addAgentResponse({ output: `⏳ Research queued, position ${data.position}...` })
+    } else if (data.status === 'rejected' || data.status === 'failed' || data.status === 'unknown') {
+      addAgentResponse({ output: `⚠️ ${data.output}` })
+      currentJob = null
+    } else if (data.status === 'done' || data.status === 'cancelled') {
+      currentJob = null
+    }
+  }
+
   const addAgentResponse = (data) => {
     const output = document.getElementById('output')
     output.innerHTML += '<div class="agent_response">' + data.output + '</div>'
@@ -2,6 +2,9 @@ import json
 import re
 import json_repair
 from ..utils.llm import create_chat_completion
+from ..utils.llm_cache import get_llm_cache
+from ..utils.llm_retry import get_retry_policy
+from ..utils.scheduler import get_scheduler
 from ..prompts import auto_agent_instructions
 
 async def choose_agent(
@@ -33,6 +36,9 @@ async def choose_agent(
             temperature=0.15,
             llm_provider=cfg.smart_llm_provider,
             llm_kwargs=cfg.llm_kwargs,
+            cache=get_llm_cache(cfg),
+            retry=get_retry_policy(cfg),
+            scheduler=get_scheduler(cfg),
             cost_callback=cost_callback,
         )
 
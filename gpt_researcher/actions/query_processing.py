@@ -1,25 +1,43 @@
+import asyncio
 import json_repair
 from ..utils.llm import create_chat_completion
+from ..utils.llm_cache import get_llm_cache
+from ..utils.llm_retry import get_retry_policy
+from ..utils.scheduler import get_scheduler
 from ..prompts import generate_search_queries_prompt
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional
 from ..config import Config
+from ..retrievers.cache import SearchCache
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def get_search_results(query: str, retriever: Any) -> List[Dict[str, Any]]:
+async def get_search_results(query: str, retriever: Any, cache: Optional[SearchCache] = None) -> List[Dict[str, Any]]:
     """
     Get web search results for a given query.
     
     Args:
         query: The search query
         retriever: The retriever instance
+        cache: Optional search result cache
     
     Returns:
         A list of search results
     """
     search_retriever = retriever(query)
-    return search_retriever.search()
+    if cache:
+        cached_results = await asyncio.to_thread(cache.get, search_retriever, query, None)
+        if cached_results is not None:
+            return cached_results
+
+    if hasattr(search_retriever, "asearch"):
+        results = await search_retriever.asearch()
+    else:
+        results = await asyncio.to_thread(search_retriever.search)
+
+    if cache:
+        await asyncio.to_thread(cache.set, search_retriever, query, None, results)
+    return results
 
 async def generate_sub_queries(
     query: str,
@@ -60,6 +78,9 @@ async def generate_sub_queries(
             llm_provider=cfg.strategic_llm_provider,
             max_tokens=None,
             llm_kwargs=cfg.llm_kwargs,
+            cache=get_llm_cache(cfg),
+            retry=get_retry_policy(cfg),
+            scheduler=get_scheduler(cfg),
             cost_callback=cost_callback,
         )
     except Exception as e:
@@ -71,6 +92,9 @@ async def generate_sub_queries(
             max_tokens=cfg.smart_token_limit,
             llm_provider=cfg.smart_llm_provider,
             llm_kwargs=cfg.llm_kwargs,
+            cache=get_llm_cache(cfg),
+            retry=get_retry_policy(cfg),
+            scheduler=get_scheduler(cfg),
             cost_callback=cost_callback,
         )
 
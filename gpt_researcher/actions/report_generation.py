@@ -1,7 +1,11 @@
 import asyncio
 from typing import List, Dict, Any
 from ..config.config import Config
+from ..context.packing import pack_context
 from ..utils.llm import create_chat_completion
+from ..utils.llm_cache import get_llm_cache
+from ..utils.llm_retry import get_retry_policy
+from ..utils.scheduler import get_scheduler
 from ..utils.logger import get_formatted_logger
 from ..prompts import (
     generate_report_introduction,
@@ -10,6 +14,7 @@ from ..prompts import (
     get_prompt_by_report_type,
 )
 from ..utils.enum import Tone
+from .utils import stream_output
 
 logger = get_formatted_logger()
 
@@ -50,6 +55,9 @@ async def write_report_introduction(
             websocket=websocket,
             max_tokens=config.smart_token_limit,
             llm_kwargs=config.llm_kwargs,
+            cache=get_llm_cache(config),
+            retry=get_retry_policy(config),
+            scheduler=get_scheduler(config),
             cost_callback=cost_callback,
         )
         return introduction
@@ -93,6 +101,9 @@ async def write_conclusion(
             websocket=websocket,
             max_tokens=config.smart_token_limit,
             llm_kwargs=config.llm_kwargs,
+            cache=get_llm_cache(config),
+            retry=get_retry_policy(config),
+            scheduler=get_scheduler(config),
             cost_callback=cost_callback,
         )
         return conclusion
@@ -136,6 +147,9 @@ async def summarize_url(
             websocket=websocket,
             max_tokens=config.smart_token_limit,
             llm_kwargs=config.llm_kwargs,
+            cache=get_llm_cache(config),
+            retry=get_retry_policy(config),
+            scheduler=get_scheduler(config),
             cost_callback=cost_callback,
         )
         return summary
@@ -181,6 +195,9 @@ async def generate_draft_section_titles(
             websocket=None,
             max_tokens=config.smart_token_limit,
             llm_kwargs=config.llm_kwargs,
+            cache=get_llm_cache(config),
+            retry=get_retry_policy(config),
+            scheduler=get_scheduler(config),
             cost_callback=cost_callback,
         )
         return section_titles.split("\n")
@@ -226,6 +243,19 @@ async def generate_report(
     generate_prompt = get_prompt_by_report_type(report_type)
     report = ""
 
+    # Counting the tokens of a large context takes a while, keep it off the event loop
+    context, packing = await asyncio.to_thread(pack_context, context, cfg.report_context_token_limit)
+    if packing["dropped_chunks"] or packing["truncated"]:
+        await stream_output(
+            "logs",
+            "context_packed",
+            f"📦 Fitted the context into {packing['tokens']}/{packing['budget']} tokens: kept "
+            f"{packing['kept_chunks']} of {packing['chunks']} chunks from {len(packing['sources'])} sources",
+            websocket,
+            True,
+            packing,
+        )
+
     if report_type == "subtopic_report":
         content = f"{generate_prompt(query, existing_headers, relevant_written_contents, main_topic, context, report_format=cfg.report_format, tone=tone, total_words=cfg.total_words)}"
     else:
@@ -243,6 +273,9 @@ async def generate_report(
             websocket=websocket,
             max_tokens=cfg.smart_token_limit,
             llm_kwargs=cfg.llm_kwargs,
+            cache=get_llm_cache(cfg),
+            retry=get_retry_policy(cfg),
+            scheduler=get_scheduler(cfg),
             cost_callback=cost_callback,
         )
     except Exception as e:
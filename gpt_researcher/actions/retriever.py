@@ -1,5 +1,12 @@
-from typing import List, Type
+import asyncio
+from itertools import zip_longest
+from typing import Any, Dict, List, Optional, Type
 from ..config.config import Config
+from ..retrievers.cache import SearchCache
+from ..scraper.utils import normalize_url
+from ..utils.logger import get_formatted_logger
+
+logger = get_formatted_logger()
 
 def get_retriever(retriever):
     """
@@ -106,4 +113,78 @@ def get_retrievers(headers, cfg):
 def get_default_retriever(retriever):
     from gpt_researcher.retrievers import TavilySearch
 
-    return TavilySearch
\ No newline at end of file
+    return TavilySearch
+
+
+async def search_with_retriever(
+    retriever_class, query: str, max_results: int, timeout: float, cache: Optional[SearchCache] = None
+) -> List[Dict[str, Any]]:
+    """
+    Searches `query` with a single retriever, giving up after `timeout` seconds, or after the
+    request timeout of the retriever if that is longer. Results are served from and stored in
+    `cache` when one is given.
+
+    Returns:
+        list: The search results, or an empty list if the retriever failed or timed out.
+    """
+    name = getattr(retriever_class, "__name__", str(retriever_class))
+    try:
+        retriever = retriever_class(query)
+        if cache:
+            cached_results = await asyncio.to_thread(cache.get, retriever, query, max_results)
+            if cached_results is not None:
+                return cached_results
+
+        if hasattr(retriever, "asearch"):
+            search = retriever.asearch(max_results=max_results)
+        else:
+            search = asyncio.to_thread(retriever.search, max_results=max_results)
+        timeout = max(timeout, getattr(retriever_class, "timeout", 0))
+        results = await asyncio.wait_for(search, timeout=timeout) or []
+
+        if cache:
+            await asyncio.to_thread(cache.set, retriever, query, max_results, results)
+        return results
+    except asyncio.TimeoutError:
+        logger.warning(f"Retriever {name} timed out after {timeout}s for query: {query}")
+    except Exception as e:
+        logger.error(f"Retriever {name} failed for query {query}: {e}")
+    return []
+
+
+def merge_search_results(results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Interleaves the results of several retrievers by rank (the first result of every retriever,
+    then the second, ...) and drops results whose normalized URL was already seen.
+
+    Args:
+        results: The search results of every retriever, each in rank order.
+
+    Returns:
+        list: The merged search results.
+    """
+    merged = []
+    seen = set()
+    for rank in zip_longest(*results):
+        for result in rank:
+            if not result or not result.get("href"):
+                continue
+            key = normalize_url(result["href"])
+            if key not in seen:
+                seen.add(key)
+                merged.append(result)
+    return merged
+
+
+async def search_with_retrievers(
+    query: str, retrievers: List[Type], max_results: int, timeout: float, cache: Optional[SearchCache] = None
+) -> List[Dict[str, Any]]:
+    """
+    Searches `query` with all retrievers concurrently and merges their results. Retrievers that
+    fail or do not answer within `timeout` seconds are skipped, so a slow provider only costs
+    its own results.
+    """
+    results = await asyncio.gather(
+        *[search_with_retriever(retriever, query, max_results, timeout, cache) for retriever in retrievers]
+    )
+    return merge_search_results(results)
@@ -1,12 +1,15 @@
 from typing import List, Dict, Any, Tuple
 from colorama import Fore, Style
 from ..scraper import Scraper
+from ..scraper.cache import get_scrape_cache
+from ..scraper.browser.pool import configure_browser_pool
 from ..config.config import Config
 from ..utils.logger import get_formatted_logger
+from ..utils.workers import get_worker_pool
 
 logger = get_formatted_logger()
 
-def scrape_urls(urls, cfg=None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+async def scrape_urls(urls, cfg=None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     Scrapes the urls
     Args:
@@ -26,8 +29,21 @@ def scrape_urls(urls, cfg=None) -> Tuple[List[Dict[str, Any]], List[Dict[str, An
     )
 
     try:
-        scraper = Scraper(urls, user_agent, cfg.scraper)
-        scraped_data = scraper.run()
+        if cfg.scraper == "browser":
+            configure_browser_pool(cfg.browser_pool_size, cfg.browser_max_pages)
+        worker_pool = get_worker_pool(cfg.max_scraper_workers, cfg.max_scraper_workers_per_host)
+        scraper = Scraper(
+            urls,
+            user_agent,
+            cfg.scraper,
+            worker_pool=worker_pool,
+            cache=get_scrape_cache(cfg),
+            max_bytes=cfg.scraper_max_size * 1024 * 1024,
+            pdf_max_pages=cfg.pdf_max_pages,
+            pdf_max_chars=cfg.pdf_max_chars,
+            parser_processes=cfg.parser_processes,
+        )
+        scraped_data = await scraper.run()
         for item in scraped_data:
             if 'image_urls' in item:
                 images.extend([img for img in item['image_urls']])
@@ -1,8 +1,12 @@
-from typing import Optional, List, Dict, Any, Set
+import asyncio
+import inspect
+from typing import Optional, List, Dict, Any, Set, Callable, AsyncIterator, Tuple
 import json
 
 from .config import Config
-from .memory import Memory
+from .memory import Memory, get_embedding_cache
+from .utils.costs import cost_phase, get_cost_phase
+from .utils.scheduler import Priority, get_scheduler, priority
 from .utils.enum import ReportSource, ReportType, Tone
 from .llm_provider import GenericLLMProvider
 from .vector_store import VectorStoreWrapper
@@ -48,6 +52,7 @@ class GPTResearcher:
         context=[],
         headers: dict = None,
         max_subtopics: int = 5,
+        context_callback: Optional[Callable] = None,
     ):
         self.query = query
         self.report_type = report_type
@@ -75,9 +80,18 @@ class GPTResearcher:
         self.context = context
         self.headers = headers or {}
         self.research_costs = 0.0
+        self.costs_by_phase: Dict[str, float] = {}  # Costs per research phase, e.g. research or report
+        self.costs_by_model: Dict[str, float] = {}  # Costs per LLM or embedding model
+        self.context_callback = context_callback  # Called with (sub_query, context) as each sub query finishes
+        self._context_queues: List[asyncio.Queue] = []
         self.retrievers = get_retrievers(self.headers, self.cfg)
         self.memory = Memory(
-            self.cfg.embedding_provider, self.cfg.embedding_model, **self.cfg.embedding_kwargs
+            self.cfg.embedding_provider,
+            self.cfg.embedding_model,
+            cache=get_embedding_cache(self.cfg),
+            cost_callback=self.add_costs,
+            scheduler=get_scheduler(self.cfg),
+            **self.cfg.embedding_kwargs
         )
 
         # Initialize components
@@ -89,35 +103,71 @@ class GPTResearcher:
 
     async def conduct_research(self):
         if not (self.agent and self.role):
-            self.agent, self.role = await choose_agent(
-                query=self.query,
-                cfg=self.cfg,
-                parent_query=self.parent_query,
-                cost_callback=self.add_costs,
-                headers=self.headers,
-            )
-
-        self.context = await self.research_conductor.conduct_research()
+            with cost_phase("agent_selection"):
+                self.agent, self.role = await choose_agent(
+                    query=self.query,
+                    cfg=self.cfg,
+                    parent_query=self.parent_query,
+                    cost_callback=self.add_costs,
+                    headers=self.headers,
+                )
+
+        with cost_phase("research"):
+            self.context = await self.research_conductor.conduct_research()
         return self.context
 
+    async def stream_research(self) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Conducts the research and yields (sub_query, context) pairs as soon as each sub query
+        finishes, so that callers can act on early results instead of waiting for the slowest one.
+        Once the generator is exhausted the full context is available as `self.context`.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._context_queues.append(queue)
+        task = asyncio.create_task(self.conduct_research())
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+            await task
+        finally:
+            self._context_queues.remove(queue)
+            if not task.done():
+                task.cancel()
+
+    async def add_sub_query_context(self, sub_query: str, context: Any) -> None:
+        """Hands the context of a finished sub query to the context callback and the active streams."""
+        if self.context_callback:
+            result = self.context_callback(sub_query, context)
+            if inspect.isawaitable(result):
+                await result
+        for queue in self._context_queues:
+            queue.put_nowait((sub_query, context))
+
     async def write_report(self, existing_headers: list = [], relevant_written_contents: list = [], ext_context=None) -> str:
-        return await self.report_generator.write_report(
-            existing_headers,
-            relevant_written_contents,
-            ext_context or self.context
-        )
+        # Writing the report yields to interactive requests of other sessions
+        with cost_phase("report"), priority(Priority.BACKGROUND):
+            return await self.report_generator.write_report(
+                existing_headers,
+                relevant_written_contents,
+                ext_context or self.context
+            )
 
     async def write_report_conclusion(self, report_body: str) -> str:
-        return await self.report_generator.write_report_conclusion(report_body)
+        with cost_phase("conclusion"), priority(Priority.BACKGROUND):
+            return await self.report_generator.write_report_conclusion(report_body)
 
-    async def write_introduction(self):
-        return await self.report_generator.write_introduction()
+    async def write_introduction(self, websocket=None):
+        with cost_phase("introduction"), priority(Priority.BACKGROUND):
+            return await self.report_generator.write_introduction(websocket)
 
     async def get_subtopics(self):
-        return await self.report_generator.get_subtopics()
+        with cost_phase("subtopics"):
+            return await self.report_generator.get_subtopics()
 
     async def get_draft_section_titles(self, current_subtopic: str):
-        return await self.report_generator.get_draft_section_titles(current_subtopic)
+        with cost_phase("draft_section_titles"):
+            return await self.report_generator.get_draft_section_titles(current_subtopic)
 
     async def get_similar_written_contents_by_draft_section_titles(
         self,
@@ -126,12 +176,13 @@ class GPTResearcher:
         written_contents: List[Dict],
         max_results: int = 10
     ) -> List[str]:
-        return await self.context_manager.get_similar_written_contents_by_draft_section_titles(
-            current_subtopic,
-            draft_section_titles,
-            written_contents,
-            max_results
-        )
+        with cost_phase("written_content_search"):
+            return await self.context_manager.get_similar_written_contents_by_draft_section_titles(
+                current_subtopic,
+                draft_section_titles,
+                written_contents,
+                max_results
+            )
 
     # Utility methods
     def get_research_images(self, top_k=10) -> List[Dict[str, Any]]:
@@ -167,10 +218,22 @@ class GPTResearcher:
     def get_costs(self) -> float:
         return self.research_costs
 
+    def get_cost_breakdown(self) -> Dict[str, Any]:
+        """Returns the total costs and their breakdown by research phase and by model."""
+        return {
+            "total": self.research_costs,
+            "by_phase": dict(self.costs_by_phase),
+            "by_model": dict(self.costs_by_model),
+        }
+
     def set_verbose(self, verbose: bool):
         self.verbose = verbose
 
-    def add_costs(self, cost: float) -> None:
+    def add_costs(self, cost: float, model: Optional[str] = None) -> None:
         if not isinstance(cost, (float, int)):
             raise ValueError("Cost must be an integer or float")
         self.research_costs += cost
+        phase = get_cost_phase()
+        self.costs_by_phase[phase] = self.costs_by_phase.get(phase, 0.0) + cost
+        model = model or "unknown"
+        self.costs_by_model[model] = self.costs_by_model.get(model, 0.0) + cost
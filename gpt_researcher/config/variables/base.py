@@ -13,10 +13,15 @@ class BaseConfig(TypedDict):
     SMART_TOKEN_LIMIT: int
     BROWSE_CHUNK_MAX_LENGTH: int
     SUMMARY_TOKEN_LIMIT: int
+    REPORT_CONTEXT_TOKEN_LIMIT: int
     TEMPERATURE: float
     LLM_TEMPERATURE: float
     USER_AGENT: str
     MAX_SEARCH_RESULTS_PER_QUERY: int
+    RETRIEVER_TIMEOUT: int
+    SEARCH_CACHE: str
+    SEARCH_CACHE_TTL: int
+    SEARCH_CACHE_MAX_SIZE: int
     MEMORY_BACKEND: str
     TOTAL_WORDS: int
     REPORT_FORMAT: str
@@ -24,6 +29,40 @@ class BaseConfig(TypedDict):
     MAX_ITERATIONS: int
     AGENT_ROLE: Union[str, None]
     SCRAPER: str
+    MAX_SCRAPER_WORKERS: int
+    MAX_SCRAPER_WORKERS_PER_HOST: int
+    SCRAPER_MAX_SIZE: int
+    PDF_MAX_PAGES: int
+    PDF_MAX_CHARS: int
+    PARSER_PROCESSES: int
+    DEDUPLICATE_CONTENT: bool
+    DEDUPLICATION_THRESHOLD: float
+    BROWSER_POOL_SIZE: int
+    BROWSER_MAX_PAGES: int
+    CACHE_DIR: str
+    SCRAPE_CACHE: bool
+    SCRAPE_CACHE_TTL: int
+    SCRAPE_CACHE_MAX_SIZE: int
+    EMBEDDING_CACHE: bool
+    EMBEDDING_CACHE_MAX_SIZE: int
+    LLM_CACHE: str
+    LLM_CACHE_TTL: int
+    LLM_CACHE_MAX_SIZE: int
+    LLM_CACHE_MAX_ENTRIES: int
+    LLM_CACHE_BYPASS: bool
+    LLM_CACHE_MAX_TEMPERATURE: float
+    LLM_MAX_RETRIES: int
+    LLM_BACKOFF_FACTOR: float
+    LLM_DEADLINE: int
+    LLM_HEDGE: bool
+    LLM_FALLBACK_TO_FAST: bool
+    LLM_MAX_CONCURRENCY: int
+    LLM_RPM: int
+    LLM_TPM: int
+    EMBEDDING_MAX_CONCURRENCY: int
+    EMBEDDING_RPM: int
+    EMBEDDING_TPM: int
     MAX_SUBTOPICS: int
+    MAX_SUBTOPIC_RESEARCH_WORKERS: int
     REPORT_SOURCE: Union[str, None]
     DOC_PATH: str
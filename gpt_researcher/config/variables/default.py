@@ -12,17 +12,56 @@ DEFAULT_CONFIG: BaseConfig = {
     "BROWSE_CHUNK_MAX_LENGTH": 8192,
     "CURATE_SOURCES": False,
     "SUMMARY_TOKEN_LIMIT": 700,
+    "REPORT_CONTEXT_TOKEN_LIMIT": 40000,
     "TEMPERATURE": 0.4,
     "LLM_TEMPERATURE": 0.55,
     "USER_AGENT": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36 Edg/119.0.0.0",
     "MAX_SEARCH_RESULTS_PER_QUERY": 5,
+    "RETRIEVER_TIMEOUT": 10,
+    "SEARCH_CACHE": "none",
+    "SEARCH_CACHE_TTL": 86400,
+    "SEARCH_CACHE_MAX_SIZE": 64,
     "MEMORY_BACKEND": "local",
     "TOTAL_WORDS": 1000,
     "REPORT_FORMAT": "APA",
     "MAX_ITERATIONS": 4,
     "AGENT_ROLE": None,
     "SCRAPER": "bs",
+    "MAX_SCRAPER_WORKERS": 20,
+    "MAX_SCRAPER_WORKERS_PER_HOST": 4,
+    "SCRAPER_MAX_SIZE": 10,
+    "PDF_MAX_PAGES": 50,
+    "PDF_MAX_CHARS": 150000,
+    "PARSER_PROCESSES": 2,
+    "DEDUPLICATE_CONTENT": True,
+    "DEDUPLICATION_THRESHOLD": 0.8,
+    "BROWSER_POOL_SIZE": 2,
+    "BROWSER_MAX_PAGES": 50,
+    "CACHE_DIR": "~/.cache/gpt-researcher",
+    "SCRAPE_CACHE": False,
+    "SCRAPE_CACHE_TTL": 86400,
+    "SCRAPE_CACHE_MAX_SIZE": 512,
+    "EMBEDDING_CACHE": False,
+    "EMBEDDING_CACHE_MAX_SIZE": 256,
+    "LLM_CACHE": "none",
+    "LLM_CACHE_TTL": 604800,
+    "LLM_CACHE_MAX_SIZE": 128,
+    "LLM_CACHE_MAX_ENTRIES": 10000,
+    "LLM_CACHE_BYPASS": False,
+    "LLM_CACHE_MAX_TEMPERATURE": 0.5,
+    "LLM_MAX_RETRIES": 2,
+    "LLM_BACKOFF_FACTOR": 1.0,
+    "LLM_DEADLINE": 600,
+    "LLM_HEDGE": False,
+    "LLM_FALLBACK_TO_FAST": False,
+    "LLM_MAX_CONCURRENCY": 16,
+    "LLM_RPM": 0,
+    "LLM_TPM": 0,
+    "EMBEDDING_MAX_CONCURRENCY": 8,
+    "EMBEDDING_RPM": 0,
+    "EMBEDDING_TPM": 0,
     "MAX_SUBTOPICS": 3,
+    "MAX_SUBTOPIC_RESEARCH_WORKERS": 3,
     "REPORT_SOURCE": "web",
     "DOC_PATH": "./my-docs"
 }
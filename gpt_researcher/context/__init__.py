@@ -1,4 +1,6 @@
 from .compression import ContextCompressor
+from .index import ChunkIndex
+from .packing import pack_context
 from .retriever import SearchAPIRetriever
 
-__all__ = ['ContextCompressor', 'SearchAPIRetriever']
+__all__ = ['ContextCompressor', 'ChunkIndex', 'SearchAPIRetriever', 'pack_context']
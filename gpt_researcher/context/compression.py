@@ -1,15 +1,7 @@
 import os
-import asyncio
 from typing import Optional
-from .retriever import SearchAPIRetriever, SectionRetriever
-from langchain.retrievers import (
-    ContextualCompressionRetriever,
-)
-from langchain.retrievers.document_compressors import (
-    DocumentCompressorPipeline,
-    EmbeddingsFilter,
-)
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.schema import Document
+from .index import ChunkIndex
 from ..vector_store import VectorStoreWrapper
 from ..utils.costs import estimate_embedding_cost
 from ..memory.embeddings import OPENAI_EMBEDDING_MODEL
@@ -36,70 +28,80 @@ class VectorstoreCompressor:
 
 
 class ContextCompressor:
-    def __init__(self, documents, embeddings, max_results=5, **kwargs):
+    def __init__(self, documents, embeddings, max_results=5, index: Optional[ChunkIndex] = None, **kwargs):
         self.max_results = max_results
         self.documents = documents
         self.kwargs = kwargs
         self.embeddings = embeddings
-        self.similarity_threshold = os.environ.get("SIMILARITY_THRESHOLD", 0.35)
-
-    def __get_contextual_retriever(self):
-        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        relevance_filter = EmbeddingsFilter(embeddings=self.embeddings,
-                                            similarity_threshold=self.similarity_threshold)
-        pipeline_compressor = DocumentCompressorPipeline(
-            transformers=[splitter, relevance_filter]
-        )
-        base_retriever = SearchAPIRetriever(
-            pages=self.documents
-        )
-        contextual_retriever = ContextualCompressionRetriever(
-            base_compressor=pipeline_compressor, base_retriever=base_retriever
-        )
-        return contextual_retriever
+        self.index = index if index is not None else ChunkIndex(embeddings)
+        self.similarity_threshold = float(os.environ.get("SIMILARITY_THRESHOLD", 0.35))
+
+    def __get_documents(self):
+        return [
+            Document(
+                page_content=page.get("raw_content", ""),
+                metadata={
+                    "title": page.get("title", ""),
+                    "source": page.get("url", ""),
+                    # Duplicates of the page dropped by the deduplication, cited along with it
+                    "merged_urls": ", ".join(page.get("merged_urls", [])),
+                },
+            )
+            for page in self.documents
+        ]
 
     def __pretty_print_docs(self, docs, top_n):
         return f"\n".join(f"Source: {d.metadata.get('source')}\n"
-                          f"Title: {d.metadata.get('title')}\n"
+                          + (f"Also published at: {d.metadata['merged_urls']}\n" if d.metadata.get("merged_urls") else "")
+                          + f"Title: {d.metadata.get('title')}\n"
                           f"Content: {d.page_content}\n"
                           for i, d in enumerate(docs) if i < top_n)
 
     async def async_get_context(self, query, max_results=5, cost_callback=None):
-        compressed_docs = self.__get_contextual_retriever()
-        if cost_callback:
-            cost_callback(estimate_embedding_cost(model=OPENAI_EMBEDDING_MODEL, docs=self.documents))
-        relevant_docs = await asyncio.to_thread(compressed_docs.invoke, query)
-        return self.__pretty_print_docs(relevant_docs, max_results)
+        contexts = await self.async_get_contexts([query], max_results, cost_callback)
+        return contexts[0]
+
+    async def async_get_contexts(self, queries, max_results=5, cost_callback=None):
+        """Ranks the documents against all queries at once and returns the context of every query."""
+        document_ids, embedded_texts = await self.index.aadd_documents(self.__get_documents())
+        # Embeddings that account for their own costs only charge the texts the model really embedded
+        if cost_callback and not getattr(self.embeddings, "cost_callback", None):
+            cost_callback(estimate_embedding_cost(model=OPENAI_EMBEDDING_MODEL, docs=embedded_texts + queries))
+        candidates = [sum(document_ids, [])] * len(queries)
+        relevant_docs = await self.index.asearch(queries, max_results, self.similarity_threshold, candidates)
+        return [self.__pretty_print_docs(docs, max_results) for docs in relevant_docs]
 
 
 class WrittenContentCompressor:
-    def __init__(self, documents, embeddings, similarity_threshold, **kwargs):
+    def __init__(self, documents, embeddings, similarity_threshold, index: Optional[ChunkIndex] = None, **kwargs):
         self.documents = documents
         self.kwargs = kwargs
         self.embeddings = embeddings
+        self.index = index if index is not None else ChunkIndex(embeddings)
         self.similarity_threshold = similarity_threshold
 
-    def __get_contextual_retriever(self):
-        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        relevance_filter = EmbeddingsFilter(embeddings=self.embeddings,
-                                            similarity_threshold=self.similarity_threshold)
-        pipeline_compressor = DocumentCompressorPipeline(
-            transformers=[splitter, relevance_filter]
-        )
-        base_retriever = SectionRetriever(
-            sections=self.documents
-        )
-        contextual_retriever = ContextualCompressionRetriever(
-            base_compressor=pipeline_compressor, base_retriever=base_retriever
-        )
-        return contextual_retriever
+    def __get_documents(self):
+        return [
+            Document(
+                page_content=section.get("written_content", ""),
+                metadata={"section_title": section.get("section_title", "")},
+            )
+            for section in self.documents
+        ]
 
     def __pretty_docs_list(self, docs, top_n):
         return [f"Title: {d.metadata.get('section_title')}\nContent: {d.page_content}\n" for i, d in enumerate(docs) if i < top_n]
 
     async def async_get_context(self, query, max_results=5, cost_callback=None):
-        compressed_docs = self.__get_contextual_retriever()
-        if cost_callback:
-            cost_callback(estimate_embedding_cost(model=OPENAI_EMBEDDING_MODEL, docs=self.documents))
-        relevant_docs = await asyncio.to_thread(compressed_docs.invoke, query)
-        return self.__pretty_docs_list(relevant_docs, max_results)
+        contexts = await self.async_get_contexts([query], max_results, cost_callback)
+        return contexts[0]
+
+    async def async_get_contexts(self, queries, max_results=5, cost_callback=None):
+        """Ranks the written sections against all queries at once and returns the matches of every query."""
+        document_ids, embedded_texts = await self.index.aadd_documents(self.__get_documents())
+        # Embeddings that account for their own costs only charge the texts the model really embedded
+        if cost_callback and not getattr(self.embeddings, "cost_callback", None):
+            cost_callback(estimate_embedding_cost(model=OPENAI_EMBEDDING_MODEL, docs=embedded_texts + queries))
+        candidates = [sum(document_ids, [])] * len(queries)
+        relevant_docs = await self.index.asearch(queries, max_results, self.similarity_threshold, candidates)
+        return [self.__pretty_docs_list(docs, max_results) for docs in relevant_docs]
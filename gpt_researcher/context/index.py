@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+
+class ChunkIndex:
+    """
+    In-process similarity index over the chunks of every document seen in a research session.
+
+    Chunk embeddings are L2-normalized and stored in one contiguous float32 matrix, so that any
+    number of queries are scored against all chunks with a single matrix multiplication and the
+    top-k chunks of each query are selected with `argpartition` instead of a full sort.
+    Documents and chunks are only split and embedded the first time they are added.
+    """
+
+    def __init__(self, embeddings, chunk_size: int = 1000, chunk_overlap: int = 100):
+        self.embeddings = embeddings
+        self.splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.chunks: List[Document] = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        self._chunk_ids: Dict[str, int] = {}
+        self._document_ids: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _hash(*parts: str) -> str:
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _append(self, vectors: np.ndarray) -> None:
+        """Appends rows to the matrix, growing its capacity geometrically."""
+        needed = self._size + len(vectors)
+        if self._matrix.shape[0] < needed:
+            capacity = max(needed, 2 * self._matrix.shape[0], 256)
+            matrix = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            if self._size:
+                matrix[:self._size] = self._matrix[:self._size]
+            self._matrix = matrix
+        self._matrix[self._size:needed] = vectors
+        self._size = needed
+
+    async def aadd_documents(self, documents: Sequence[Document]) -> Tuple[List[List[int]], List[str]]:
+        """
+        Splits, embeds and indexes the documents not seen before.
+
+        Returns the chunk ids of every document, in order, and the texts that were newly embedded.
+        """
+        keys = [self._hash(doc.metadata.get("source", ""), doc.page_content) for doc in documents]
+        new_documents = {key: doc for key, doc in zip(keys, documents) if key not in self._document_ids}
+
+        new_chunks: Dict[str, Document] = {}
+        chunks_by_document: Dict[str, List[str]] = {}
+        if new_documents:
+            splits = await asyncio.to_thread(
+                lambda: [self.splitter.split_documents([doc]) for doc in new_documents.values()]
+            )
+            for key, chunks in zip(new_documents, splits):
+                chunks_by_document[key] = []
+                for chunk in chunks:
+                    chunk_key = self._hash(chunk.metadata.get("source", ""), chunk.page_content)
+                    chunks_by_document[key].append(chunk_key)
+                    if chunk_key not in self._chunk_ids:
+                        new_chunks.setdefault(chunk_key, chunk)
+
+        texts = [chunk.page_content for chunk in new_chunks.values()]
+        if texts:
+            vectors = self._normalize(await self.embeddings.aembed_documents(texts))
+            # Another call may have indexed some of the chunks while we were embedding
+            chunk_keys = list(new_chunks)
+            rows = [i for i, key in enumerate(chunk_keys) if key not in self._chunk_ids]
+            for i in rows:
+                self._chunk_ids[chunk_keys[i]] = len(self.chunks)
+                self.chunks.append(new_chunks[chunk_keys[i]])
+            self._append(vectors[rows])
+
+        for key, chunk_keys in chunks_by_document.items():
+            self._document_ids[key] = [self._chunk_ids[chunk_key] for chunk_key in chunk_keys]
+
+        return [self._document_ids[key] for key in keys], texts
+
+    async def asearch(
+        self,
+        queries: List[str],
+        k: int,
+        similarity_threshold: Optional[float] = None,
+        candidates: Optional[List[List[int]]] = None,
+    ) -> List[List[Document]]:
+        """
+        Returns the `k` most similar chunks of every query, most similar first.
+
+        Args:
+            queries: The queries to rank the chunks against.
+            k: The maximum number of chunks to return per query.
+            similarity_threshold: Minimum cosine similarity of a returned chunk.
+            candidates: Optionally, for every query the chunk ids it may be matched against.
+        """
+        if not queries:
+            return []
+        if not self._size or k <= 0:
+            return [[] for _ in queries]
+
+        vectors = await asyncio.gather(*(self.embeddings.aembed_query(query) for query in queries))
+        scores = self._normalize(vectors) @ self._matrix[:self._size].T
+
+        if candidates is not None:
+            mask = np.full(scores.shape, -np.inf, dtype=np.float32)
+            for i, ids in enumerate(candidates):
+                mask[i, ids] = 0.0
+            scores += mask
+
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        threshold = -np.inf if similarity_threshold is None else float(similarity_threshold)
+        return [
+            [self.chunks[i] for i, score in zip(row, row_scores) if score > -np.inf and score >= threshold]
+            for row, row_scores in zip(top, top_scores)
+        ]
@@ -0,0 +1,95 @@
+import re
+from typing import Any, Dict, List, Tuple, Union
+
+from ..utils.tokens import count_tokens, count_tokens_batch, truncate_to_tokens
+
+# Every chunk of compressed context starts with the source it was taken from
+_CHUNK_START = re.compile(r"\n(?=Source: )")
+_SOURCE = re.compile(r"^Source: (.*)$", re.MULTILINE)
+
+
+def _split_chunks(context: str) -> List[str]:
+    return [chunk for chunk in _CHUNK_START.split(context) if chunk.strip()]
+
+
+def _get_source(chunk: str) -> str:
+    match = _SOURCE.search(chunk)
+    return match.group(1).strip() if match else ""
+
+
+def pack_context(
+    context: Union[str, List[str]], max_tokens: int
+) -> Tuple[Union[str, List[str]], Dict[str, Any]]:
+    """
+    Fits the research context into a budget of `max_tokens` tokens.
+
+    The context is either a string or a list of strings, one per sub-query, made of chunks
+    that each start with their `Source:` line and are ordered most relevant first. Chunks
+    are taken by rank across all sub-queries, so the best chunks of every sub-query come
+    before the second-best of any, and a chunk is only ever kept or dropped whole, so the
+    source it is cited with is never cut off. Exact duplicate chunks are kept once. If not
+    even the top chunk fits, it is truncated to the budget.
+
+    Returns:
+        The packed context, in the shape and order of `context`, and a report of the
+        packing decisions: the budget, the tokens used, the number of chunks kept and
+        dropped and the sources kept and dropped entirely.
+    """
+    if isinstance(context, str):
+        contexts = [context]
+    elif isinstance(context, (list, tuple, set)):
+        contexts = [str(c) for c in context]
+    else:
+        contexts = [str(context)] if context else []
+    chunks_by_context = [_split_chunks(c) for c in contexts]
+    total_chunks = sum(len(chunks) for chunks in chunks_by_context)
+
+    ranked = [
+        (index, rank, chunks[rank])
+        for rank in range(max(map(len, chunks_by_context), default=0))
+        for index, chunks in enumerate(chunks_by_context)
+        if rank < len(chunks)
+    ]
+
+    unique: Dict[str, Tuple[int, int]] = {}
+    for index, rank, chunk in ranked:
+        unique.setdefault(chunk, (index, rank))
+    counts = count_tokens_batch(list(unique))
+
+    kept: Dict[Tuple[int, int], str] = {}
+    tokens = 0
+    truncated = False
+    for (chunk, (index, rank)), count in zip(unique.items(), counts):
+        # Chunks are joined with a newline, about one token
+        chunk_tokens = count + 1
+        if tokens + chunk_tokens <= max_tokens:
+            kept[(index, rank)] = chunk
+            tokens += chunk_tokens
+
+    if not kept and ranked and max_tokens > 0:
+        index, rank, chunk = ranked[0]
+        kept[(index, rank)] = truncate_to_tokens(chunk, max_tokens - 1)
+        tokens = count_tokens(kept[(index, rank)]) + 1
+        truncated = True
+
+    packed = [
+        "\n".join(kept[(index, rank)] for rank in range(len(chunks)) if (index, rank) in kept)
+        for index, chunks in enumerate(chunks_by_context)
+    ]
+
+    kept_sources = dict.fromkeys(source for source in map(_get_source, kept.values()) if source)
+    all_sources = dict.fromkeys(source for source in (_get_source(chunk) for _, _, chunk in ranked) if source)
+    report = {
+        "budget": max_tokens,
+        "tokens": tokens,
+        "chunks": total_chunks,
+        "kept_chunks": len(kept),
+        "dropped_chunks": total_chunks - len(kept),
+        "truncated": truncated,
+        "sources": list(kept_sources),
+        "dropped_sources": [source for source in all_sources if source not in kept_sources],
+    }
+
+    if isinstance(context, str):
+        return packed[0] if packed else "", report
+    return [c for c in packed if c], report
@@ -1,5 +1,8 @@
 from .generic import GenericLLMProvider
+from .registry import get_llm_client, get_llm_client_stats
 
 __all__ = [
     "GenericLLMProvider",
+    "get_llm_client",
+    "get_llm_client_stats",
 ]
@@ -24,6 +24,9 @@ class GenericLLMProvider:
 
     def __init__(self, llm):
         self.llm = llm
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
 
     @classmethod
     def from_provider(cls, provider: str, **kwargs: Any):
@@ -111,14 +114,31 @@ class GenericLLMProvider:
 
 
     async def get_chat_response(self, messages, stream, websocket=None):
-        if not stream:
-            # Getting output from the model chain using ainvoke for asynchronous invoking
-            output = await self.llm.ainvoke(messages)
-
-            return output.content
-
-        else:
-            return await self.stream_response(messages, websocket)
+        self._start_request()
+        try:
+            if not stream:
+                # Getting output from the model chain using ainvoke for asynchronous invoking
+                output = await self.llm.ainvoke(messages)
+
+                return output.content
+
+            else:
+                return await self.stream_response(messages, websocket)
+        finally:
+            self.in_flight -= 1
+
+    def _start_request(self) -> None:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def stats(self) -> dict:
+        """Returns the number of requests made with the client and how many were in flight at once."""
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+        }
 
     async def stream_response(self, messages, websocket=None):
         paragraph = ""
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from .generic import GenericLLMProvider
+from ..utils.http_client import MAX_CONNECTIONS, MAX_KEEPALIVE_CONNECTIONS
+
+# Providers whose LangChain clients accept the httpx clients they send their requests with
+HTTPX_PROVIDERS = {"openai", "azure_openai"}
+# Timeout of LLM requests, which take much longer than page downloads
+LLM_TIMEOUT = 600
+# Providers whose LangChain clients retry failed requests themselves. Their retries are
+# turned off so that `RetryPolicy` is the only retry layer and backs off outside the
+# scheduler's slots
+SDK_RETRY_PROVIDERS = {
+    "openai", "azure_openai", "anthropic", "mistralai", "groq", "together", "fireworks",
+    "google_genai", "google_vertexai",
+}
+
+# Clients are bound to the event loop their connections were opened in, clients created
+# outside of an event loop are only used for blocking calls
+_async_clients = weakref.WeakKeyDictionary()
+_sync_clients: Dict[str, GenericLLMProvider] = {}
+# The httpx clients of every provider, shared by its clients of all models and parameters
+_async_http_clients = weakref.WeakKeyDictionary()
+_sync_http_clients: Dict[str, Tuple[httpx.Client, httpx.AsyncClient]] = {}
+_lock = threading.Lock()
+
+
+def _get_key(provider: str, kwargs: Dict[str, Any]) -> str:
+    return json.dumps([provider, kwargs], sort_keys=True, default=repr)
+
+
+def _get_http_clients(provider: str, loop: Optional[asyncio.AbstractEventLoop]) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Returns the connection pools of `provider` for the event loop. Called with the lock held."""
+    clients = _sync_http_clients if loop is None else _async_http_clients.setdefault(loop, {})
+    if provider not in clients:
+        limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+        clients[provider] = (
+            httpx.Client(limits=limits, timeout=LLM_TIMEOUT),
+            httpx.AsyncClient(limits=limits, timeout=LLM_TIMEOUT),
+        )
+    return clients[provider]
+
+
+def _create_client(provider: str, kwargs: Dict[str, Any], loop: Optional[asyncio.AbstractEventLoop]) -> GenericLLMProvider:
+    if provider in SDK_RETRY_PROVIDERS:
+        kwargs = {"max_retries": 0, **kwargs}
+    if provider not in HTTPX_PROVIDERS or "http_client" in kwargs or "http_async_client" in kwargs:
+        return GenericLLMProvider.from_provider(provider, **kwargs)
+
+    http_client, http_async_client = _get_http_clients(provider, loop)
+    return GenericLLMProvider.from_provider(
+        provider,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **kwargs,
+    )
+
+
+def get_llm_client(provider: str, **kwargs: Any) -> GenericLLMProvider:
+    """
+    Returns the process-wide client of `provider` for the given model and parameters, creating
+    it on first use. The client is reused by every later call with the same parameters, and
+    all clients of a provider share one pool of keep-alive connections, so LLM calls skip the
+    TCP and TLS handshakes and the construction of the provider SDK client.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    key = _get_key(provider, kwargs)
+    with _lock:
+        clients = _sync_clients if loop is None else _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = _create_client(provider, kwargs, loop)
+            clients[key] = client
+        return client
+
+
+def get_llm_client_stats() -> Dict[str, Any]:
+    """
+    Returns the request statistics of every client of the current event loop, keyed by the
+    provider and model. Requests waiting for the concurrency limit of their provider are
+    reported by the scheduler, see `Scheduler.stats`.
+    """
+    try:
+        clients = _async_clients.get(asyncio.get_running_loop(), {})
+    except RuntimeError:
+        clients = _sync_clients
+
+    stats: Dict[str, Any] = {}
+    with _lock:
+        for key, client in clients.items():
+            provider, kwargs = json.loads(key)
+            name = f"{provider}:{kwargs.get('model') or kwargs.get('model_name') or ''}"
+            stats.setdefault(name, []).append(client.stats())
+    return {
+        name: {field: _combine(field, [s[field] for s in entries]) for field in entries[0]}
+        for name, entries in stats.items()
+    }
+
+
+def _combine(field: str, values: list) -> int:
+    if field == "peak_in_flight":
+        return max(values)
+    return sum(values)
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import os
+from array import array
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from ..utils.cache import SQLiteCache
+from ..utils.costs import estimate_embedding_cost, report_cost
+from ..utils.scheduler import Scheduler, in_event_loop
+from ..utils.tokens import count_tokens_batch, get_encoding_name_for_model
+
+_embedding_caches: Dict[str, Optional[SQLiteCache]] = {}
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that embeds every distinct text only once.
+
+    Vectors are keyed by the hash of the embedding model and the text. They are kept in
+    memory for the lifetime of the wrapper and, when a `SQLiteCache` is given, persisted
+    on disk so they survive across research sessions. Texts missing from both are sent
+    to the underlying model in large batches, and only those are charged to `cost_callback`.
+    With a `scheduler`, every batch waits for a slot within the limits of the provider.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        namespace: str,
+        cache: Optional[SQLiteCache] = None,
+        batch_size: int = 512,
+        model: str = "",
+        cost_callback: Optional[Callable] = None,
+        scheduler: Optional[Scheduler] = None,
+    ):
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.cache = cache
+        self.batch_size = batch_size
+        self.model = model
+        self.cost_callback = cost_callback
+        self.scheduler = scheduler
+        self._vectors: Dict[str, List[float]] = {}
+
+    def _key(self, text: str, kind: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{kind}\0{text}".encode()).hexdigest()
+
+    def _lookup(self, texts: List[str], kind: str) -> Tuple[List[str], Dict[str, List[float]], List[list]]:
+        """
+        Resolves `texts` against the memory and disk caches. Returns the key of every text,
+        the vectors found so far and the batches of (key, text) pairs still to be embedded.
+        """
+        keys = [self._key(text, kind) for text in texts]
+        found = {key: self._vectors[key] for key in keys if key in self._vectors}
+
+        if self.cache is not None:
+            unresolved = [key for key in dict.fromkeys(keys) if key not in found]
+            for key, value in self.cache.get_many(unresolved).items():
+                vector = array("f", value).tolist()
+                self._vectors[key] = vector
+                found[key] = vector
+
+        # Identical texts are only embedded once
+        missing = list({key: text for key, text in zip(keys, texts) if key not in found}.items())
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        return keys, found, batches
+
+    def _store(self, batch: List[tuple], vectors: List[List[float]], found: Dict[str, List[float]]) -> None:
+        if self.cost_callback:
+            report_cost(self.cost_callback, estimate_embedding_cost(self.model, [text for _, text in batch]), self.model)
+        items = {}
+        for (key, _), vector in zip(batch, vectors):
+            self._vectors[key] = found[key] = vector
+            items[key] = array("f", vector).tobytes()
+        if self.cache is not None:
+            self.cache.set_many(items)
+
+    def _count_tokens(self, texts: List[str]) -> int:
+        return sum(count_tokens_batch(texts, get_encoding_name_for_model(self.model)))
+
+    def _embed_sync(self, texts: List[str], embed: Callable) -> Any:
+        # Blocking callers on the event loop thread can't wait for a slot without deadlocking
+        # the loop, so they bypass the limits; the async methods should be used there instead
+        if self.scheduler is None or in_event_loop():
+            return embed()
+        provider = self.namespace.split(":", 1)[0]
+        with self.scheduler.limit_sync("embedding", provider, tokens=self._count_tokens(texts)):
+            return embed()
+
+    async def _embed_async(self, texts: List[str], embed: Callable) -> Any:
+        if self.scheduler is None:
+            return await embed()
+        provider = self.namespace.split(":", 1)[0]
+        async with self.scheduler.limit("embedding", provider, tokens=self._count_tokens(texts)):
+            return await embed()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, batches = self._lookup(texts, "document")
+        for batch in batches:
+            batch_texts = [text for _, text in batch]
+            vectors = self._embed_sync(batch_texts, partial(self.embeddings.embed_documents, batch_texts))
+            self._store(batch, vectors, found)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, batches = self._lookup([text], "query")
+        if batches:
+            self._store(batches[0], [self._embed_sync([text], partial(self.embeddings.embed_query, text))], found)
+        return found[keys[0]]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, batches = await asyncio.to_thread(self._lookup, texts, "document")
+        batch_texts = [[text for _, text in batch] for batch in batches]
+        results = await asyncio.gather(
+            *(self._embed_async(texts, partial(self.embeddings.aembed_documents, texts)) for texts in batch_texts)
+        )
+        for batch, vectors in zip(batches, results):
+            await asyncio.to_thread(self._store, batch, vectors, found)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, batches = await asyncio.to_thread(self._lookup, [text], "query")
+        if batches:
+            vector = await self._embed_async([text], partial(self.embeddings.aembed_query, text))
+            await asyncio.to_thread(self._store, batches[0], [vector], found)
+        return found[keys[0]]
+
+
+def get_embedding_cache(cfg) -> Optional[SQLiteCache]:
+    """
+    Returns the process-wide on-disk embedding cache configured by `cfg`, or None if
+    embedding caching is disabled or the cache could not be opened.
+    """
+    if not cfg or not cfg.embedding_cache:
+        return None
+
+    path = os.path.join(os.path.expanduser(cfg.cache_dir), "embeddings.sqlite")
+    if path not in _embedding_caches:
+        try:
+            _embedding_caches[path] = SQLiteCache(path, max_size=cfg.embedding_cache_max_size * 1024 * 1024)
+        except Exception as e:
+            print(f"Failed to open embedding cache at {path}: {e}. Embedding without cache.")
+            _embedding_caches[path] = None
+    return _embedding_caches[path]
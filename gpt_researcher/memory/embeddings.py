@@ -1,5 +1,10 @@
+import json
 import os
-from typing import Any
+from typing import Any, Callable, Dict, Optional
+
+from .embedding_cache import CachedEmbeddings
+from ..utils.cache import SQLiteCache
+from ..utils.scheduler import Scheduler
 
 OPENAI_EMBEDDING_MODEL = os.environ.get(
     "OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"
@@ -21,9 +26,43 @@ _SUPPORTED_PROVIDERS = {
     "custom",
 }
 
+# Environment variables holding the endpoint a provider embeds with
+_ENDPOINT_VARIABLES = {
+    "custom": "OPENAI_BASE_URL",
+    "azure_openai": "AZURE_OPENAI_ENDPOINT",
+    "ollama": "OLLAMA_BASE_URL",
+}
+
+
+def get_cache_namespace(embedding_provider: str, model: str, embedding_kwargs: Dict[str, Any]) -> str:
+    """
+    The namespace of the cached vectors of an embedding model. Besides the provider and model
+    it covers the endpoint and the kwargs like `dimensions` that change the vectors, but not
+    the credentials, so that different deployments or dimensions never share vectors.
+    """
+    settings = {
+        key: value for key, value in embedding_kwargs.items()
+        if not any(secret in key.lower() for secret in ("key", "token", "secret", "password"))
+    }
+    endpoint = os.getenv(_ENDPOINT_VARIABLES.get(embedding_provider, ""))
+    if endpoint:
+        settings["endpoint"] = endpoint
+    namespace = f"{embedding_provider}:{model}"
+    if settings:
+        namespace += ":" + json.dumps(settings, sort_keys=True, default=repr)
+    return namespace
+
 
 class Memory:
-    def __init__(self, embedding_provider: str, model: str, **embdding_kwargs: Any):
+    def __init__(
+        self,
+        embedding_provider: str,
+        model: str,
+        cache: Optional[SQLiteCache] = None,
+        cost_callback: Optional[Callable] = None,
+        scheduler: Optional[Scheduler] = None,
+        **embdding_kwargs: Any,
+    ):
         _embeddings = None
         match embedding_provider:
             case "custom":
@@ -105,7 +144,15 @@ class Memory:
             case _:
                 raise Exception("Embedding not found.")
 
-        self._embeddings = _embeddings
+        # Every text is embedded once per session, and once ever when a disk cache is given
+        self._embeddings = CachedEmbeddings(
+            _embeddings,
+            namespace=get_cache_namespace(embedding_provider, model, embdding_kwargs),
+            cache=cache,
+            model=model,
+            cost_callback=cost_callback,
+            scheduler=scheduler,
+        )
 
     def get_embeddings(self):
         return self._embeddings
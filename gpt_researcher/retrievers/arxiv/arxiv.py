@@ -5,12 +5,16 @@ class ArxivSearch:
     """
     Arxiv API Retriever
     """
+    search_cache_ttl = 7 * 24 * 3600
+
     def __init__(self, query, sort='Relevance'):
         self.arxiv = arxiv
         self.query = query
         assert sort in ['Relevance', 'SubmittedDate'], "Invalid sort criterion"
         self.sort = arxiv.SortCriterion.SubmittedDate if sort == 'SubmittedDate' else arxiv.SortCriterion.Relevance
-        
+
+    def get_search_params(self):
+        return {"sort": self.sort.name}
 
     def search(self, max_results=5):
         """
@@ -0,0 +1,113 @@
+import abc
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..utils.http_client import close_async_client, get_async_client
+from ..utils.logger import get_formatted_logger
+
+logger = get_formatted_logger()
+
+
+class AsyncRetriever(abc.ABC):
+    """
+    Base class for the retrievers that search over HTTP.
+
+    Requests go through the pooled async client shared by the whole event loop, so repeated
+    searches reuse kept-alive connections. Every retriever gets the same timeout and retry
+    policy: connection errors and retryable statuses are retried with exponential backoff
+    and jitter. When a provider rate limits us, its Retry-After is honoured by every
+    instance of the retriever until it expires.
+
+    Subclasses implement `asearch`; `search` is kept as a blocking wrapper around it.
+    """
+
+    timeout: float = 10
+    max_retries: int = 2
+    backoff_factor: float = 0.5
+    retry_statuses = {429, 500, 502, 503, 504}
+
+    # Per retriever class, monotonic time until which the provider asked us to back off
+    _rate_limited_until: Dict[type, float] = {}
+
+    @abc.abstractmethod
+    async def asearch(self, max_results: int = 7) -> Optional[List[Dict[str, Any]]]:
+        """
+        Searches the provider and returns its results.
+        """
+
+    def get_search_params(self) -> Dict[str, Any]:
+        """
+        The settings besides the query and the number of results that change what a search
+        returns, e.g. a topic or the search engine used. They are part of the search cache key.
+        """
+        return {}
+
+    def search(self, *args, **kwargs) -> Optional[List[Dict[str, Any]]]:
+        """
+        Blocking wrapper around `asearch` for synchronous callers.
+        """
+        async def run():
+            try:
+                return await self.asearch(*args, **kwargs)
+            finally:
+                await close_async_client()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(run())
+        # Called from inside an event loop, so the search needs a loop of its own
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, run()).result()
+
+    def _get_retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return max(0.0, float(retry_after))
+                except ValueError:
+                    try:
+                        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                    except (TypeError, ValueError):
+                        pass
+        return self.backoff_factor * 2 ** attempt + random.uniform(0, self.backoff_factor)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request with the shared client, retrying transient failures.
+
+        Returns:
+            httpx.Response: The last response received. Callers check its status themselves.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        client = get_async_client()
+        retriever = type(self)
+
+        for attempt in range(self.max_retries + 1):
+            wait = self._rate_limited_until.get(retriever, 0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._get_retry_delay(attempt)
+                logger.debug(f"{retriever.__name__} request failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                if response.status_code not in self.retry_statuses or attempt == self.max_retries:
+                    return response
+                delay = self._get_retry_delay(attempt, response)
+                if response.status_code == 429:
+                    self._rate_limited_until[retriever] = time.monotonic() + delay
+                logger.debug(f"{retriever.__name__} returned {response.status_code}, retrying in {delay:.1f}s")
+
+            await asyncio.sleep(delay)
@@ -2,12 +2,13 @@
 
 # libraries
 import os
-import requests
 import json
 import logging
 
+from ..base import AsyncRetriever
 
-class BingSearch():
+
+class BingSearch(AsyncRetriever):
     """
     Bing Search Retriever
     """
@@ -35,7 +36,7 @@ class BingSearch():
                 "Bing API key not found. Please set the BING_API_KEY environment variable.")
         return api_key
 
-    def search(self, max_results=7) -> list[dict[str]]:
+    async def asearch(self, max_results=7) -> list[dict[str]]:
         """
         Searches the query
         Returns:
@@ -61,7 +62,7 @@ class BingSearch():
             "safeSearch": "Strict"
         }
 
-        resp = requests.get(url, headers=headers, params=params)
+        resp = await self._request("GET", url, headers=headers, params=params)
 
         # Preprocess the results
         if resp is None:
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Union
+
+from ..utils.cache import MemoryCache, SQLiteCache
+
+_search_caches: Dict[tuple, Optional["SearchCache"]] = {}
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes a search query so that trivially different spellings share a cache entry."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class SearchCache:
+    """
+    Cache of retriever search results, keyed by the retriever and its search parameters
+    (see `AsyncRetriever.get_search_params`), the normalized query and the number of
+    requested results. Retrievers are passed as the instance that runs the search.
+
+    Entries live for the configured TTL unless the retriever sets its own `search_cache_ttl`,
+    e.g. academic indexes whose results change slowly. Failed or empty searches are not cached.
+    Hits and misses are counted per retriever, by the cache and by each of its sessions.
+    """
+
+    def __init__(self, backend: Union[MemoryCache, SQLiteCache], ttl: int = 86400, parent: Optional["SearchCache"] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self.parent = parent
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    @staticmethod
+    def get_name(retriever) -> str:
+        return getattr(retriever, "__name__", type(retriever).__name__)
+
+    @staticmethod
+    def get_params(retriever) -> Dict[str, Any]:
+        get_search_params = getattr(retriever, "get_search_params", None)
+        return get_search_params() if get_search_params else {}
+
+    def get_key(self, retriever, query: str, max_results: int) -> str:
+        key = json.dumps(
+            [self.get_name(retriever), self.get_params(retriever), normalize_query(query), max_results],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get_ttl(self, retriever) -> int:
+        return getattr(retriever, "search_cache_ttl", None) or self.ttl
+
+    def get(self, retriever, query: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+        """Returns the cached results of the search, or None on a miss."""
+        value = self.backend.get(self.get_key(retriever, query, max_results))
+        self._count(self.get_name(retriever), "hits" if value is not None else "misses")
+        return json.loads(value) if value is not None else None
+
+    def _count(self, name: str, outcome: str) -> None:
+        with self._lock:
+            self._stats[name][outcome] += 1
+        if self.parent is not None:
+            self.parent._count(name, outcome)
+
+    def session(self) -> "SearchCache":
+        """
+        Returns a view of the cache sharing its entries but counting its own hits and misses,
+        so that a research run reports its own statistics on a server running several at once.
+        """
+        return SearchCache(self.backend, ttl=self.ttl, parent=self)
+
+    def set(self, retriever, query: str, max_results: int, results: Optional[List[Dict[str, Any]]]) -> None:
+        if not results:
+            return
+        self.backend.set(
+            self.get_key(retriever, query, max_results),
+            json.dumps(results).encode(),
+            ttl=self.get_ttl(retriever),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the overall and per retriever hit/miss counts."""
+        with self._lock:
+            retrievers = {name: dict(counts) for name, counts in self._stats.items()}
+        hits = sum(counts["hits"] for counts in retrievers.values())
+        misses = sum(counts["misses"] for counts in retrievers.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "retrievers": retrievers,
+        }
+
+
+def get_search_cache(cfg) -> Optional[SearchCache]:
+    """
+    Returns the process-wide search cache configured by `cfg`, or None if search caching
+    is disabled or the on-disk cache could not be opened.
+    """
+    backend = (getattr(cfg, "search_cache", None) or "none").lower() if cfg else "none"
+    if backend not in ("memory", "disk"):
+        return None
+
+    path = os.path.join(os.path.expanduser(cfg.cache_dir), "search_cache.sqlite")
+    key = (backend, path if backend == "disk" else None, cfg.search_cache_ttl)
+    if key not in _search_caches:
+        try:
+            if backend == "disk":
+                store = SQLiteCache(path, max_size=cfg.search_cache_max_size * 1024 * 1024)
+            else:
+                store = MemoryCache()
+            _search_caches[key] = SearchCache(store, ttl=cfg.search_cache_ttl)
+        except Exception as e:
+            print(f"Failed to open search cache at {path}: {e}. Searching without cache.")
+            _search_caches[key] = None
+    return _search_caches[key]
@@ -1,9 +1,11 @@
 from typing import Any, Dict, List, Optional
-import requests
+import httpx
 import os
 
+from ..base import AsyncRetriever
 
-class CustomRetriever:
+
+class CustomRetriever(AsyncRetriever):
     """
     Custom API Retriever
     """
@@ -26,7 +28,10 @@ class CustomRetriever:
             if key.startswith('RETRIEVER_ARG_')
         }
 
-    def search(self, max_results: int = 5) -> Optional[List[Dict[str, Any]]]:
+    def get_search_params(self) -> Dict[str, Any]:
+        return {"endpoint": self.endpoint, "params": self.params}
+
+    async def asearch(self, max_results: int = 5) -> Optional[List[Dict[str, Any]]]:
         """
         Performs the search using the custom retriever endpoint.
 
@@ -44,9 +49,9 @@ class CustomRetriever:
             ]
         """
         try:
-            response = requests.get(self.endpoint, params={**self.params, 'query': self.query})
+            response = await self._request("GET", self.endpoint, params={**self.params, 'query': self.query})
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Failed to retrieve search results: {e}")
             return None
\ No newline at end of file
@@ -2,11 +2,12 @@
 
 # libraries
 import os
-import requests
 import json
 
+from ..base import AsyncRetriever
 
-class GoogleSearch:
+
+class GoogleSearch(AsyncRetriever):
     """
     Tavily API Retriever
     """
@@ -49,7 +50,11 @@ class GoogleSearch:
                             "You can get a key at https://developers.google.com/custom-search/v1/overview")
         return api_key
 
-    def search(self, max_results=7):
+    def get_search_params(self):
+        # The custom search engine decides which sites are searched
+        return {"cx_key": self.cx_key}
+
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -57,8 +62,9 @@ class GoogleSearch:
         """
         """Useful for general internet search queries using the Google API."""
         print("Searching with query {0}...".format(self.query))
-        url = f"https://www.googleapis.com/customsearch/v1?key={self.api_key}&cx={self.cx_key}&q={self.query}&start=1"
-        resp = requests.get(url)
+        url = "https://www.googleapis.com/customsearch/v1"
+        params = {"key": self.api_key, "cx": self.cx_key, "q": self.query, "start": 1}
+        resp = await self._request("GET", url, params=params)
 
         if resp is None:
             return
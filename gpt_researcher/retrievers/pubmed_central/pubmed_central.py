@@ -1,14 +1,19 @@
+import asyncio
+import io
 import os
 import xml.etree.ElementTree as ET
 
-import requests
+from ..base import AsyncRetriever
 
 
-class PubMedCentralSearch:
+class PubMedCentralSearch(AsyncRetriever):
     """
     PubMed Central API Retriever
     """
 
+    search_cache_ttl = 7 * 24 * 3600
+    fetch_batch_size = 200
+
     def __init__(self, query):
         """
         Initializes the PubMedCentralSearch object.
@@ -35,7 +40,7 @@ class PubMedCentralSearch:
             )
         return api_key
 
-    def search(self, max_results=10):
+    async def asearch(self, max_results=10):
         """
         Searches the query using the PubMed Central API.
         Args:
@@ -53,7 +58,7 @@ class PubMedCentralSearch:
             "retmode": "json",
             "sort": "relevance"
         }
-        response = requests.get(base_url, params=params)
+        response = await self._request("GET", base_url, params=params)
 
         if response.status_code != 200:
             raise Exception(
@@ -63,25 +68,38 @@ class PubMedCentralSearch:
         results = response.json()
         ids = results["esearchresult"]["idlist"]
 
+        # Fetch every article in a few batched requests and parse each batch in a single pass
+        batches = [ids[i:i + self.fetch_batch_size] for i in range(0, len(ids), self.fetch_batch_size)]
+        xml_contents = await asyncio.gather(*(self.fetch(batch) for batch in batches))
+        parsed_batches = await asyncio.gather(
+            *(asyncio.to_thread(self.parse_articles, xml_content) for xml_content in xml_contents)
+        )
+
+        articles = {}
+        for batch, parsed in zip(batches, parsed_batches):
+            for position, (article_id, article_data) in enumerate(parsed):
+                # Fall back to the request order if the article does not state its PMC id
+                article_id = article_id or (batch[position] if position < len(batch) else None)
+                if article_id:
+                    articles.setdefault(article_id, article_data)
+
         search_response = []
         for article_id in ids:
-            xml_content = self.fetch([article_id])
-            if self.has_body_content(xml_content):
-                article_data = self.parse_xml(xml_content)
-                if article_data:
-                    search_response.append(
-                        {
-                            "href": f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{article_id}/",
-                            "body": f"{article_data['title']}\n\n{article_data['abstract']}\n\n{article_data['body'][:500]}...",
-                        }
-                    )
+            article_data = articles.get(article_id)
+            if article_data and article_data["has_body"]:
+                search_response.append(
+                    {
+                        "href": f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{article_id}/",
+                        "body": f"{article_data['title']}\n\n{article_data['abstract']}\n\n{article_data['body'][:500]}...",
+                    }
+                )
 
             if len(search_response) >= max_results:
                 break
 
         return search_response
 
-    def fetch(self, ids):
+    async def fetch(self, ids):
         """
         Fetches the full text content for given article IDs.
         Args:
@@ -90,66 +108,63 @@ class PubMedCentralSearch:
             XML content of the articles.
         """
         base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-        params = {
+        data = {
             "db": "pmc",
             "id": ",".join(ids),
             "retmode": "xml",
             "api_key": self.api_key,
         }
-        response = requests.get(base_url, params=params)
+        # POST keeps long id lists out of the URL
+        response = await self._request("POST", base_url, data=data)
 
         if response.status_code != 200:
             raise Exception(
                 f"Failed to retrieve data: {response.status_code} - {response.text}"
             )
 
-        return response.text
+        return response.content
 
-    def has_body_content(self, xml_content):
+    def parse_articles(self, xml_content):
         """
-        Checks if the XML content has a body section.
+        Parses a batch of articles in a single streaming pass.
         Args:
-            xml_content: XML content of the article.
+            xml_content: XML content of the articles.
         Returns:
-            Boolean indicating presence of body content.
+            List of (PMC id, article data) tuples, in document order. The article data is
+            the dictionary returned by `parse_xml` plus a `has_body` flag.
         """
-        root = ET.fromstring(xml_content)
-        ns = {
-            "mml": "http://www.w3.org/1998/Math/MathML",
-            "xlink": "http://www.w3.org/1999/xlink",
-        }
-        article = root.find("article", ns)
-        if article is None:
-            return False
-
-        body_elem = article.find(".//body", namespaces=ns)
-        if body_elem is not None:
-            return True
-        else:
-            for sec in article.findall(".//sec", namespaces=ns):
-                for p in sec.findall(".//p", namespaces=ns):
-                    if p.text:
-                        return True
-        return False
-
-    def parse_xml(self, xml_content):
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode()
+
+        articles = []
+        depth = 0
+        for event, elem in ET.iterparse(io.BytesIO(xml_content), events=("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            # Articles are the direct children of the root element
+            if elem.tag == "article" and depth == 1:
+                articles.append((self._get_article_id(elem), self._parse_article(elem)))
+                elem.clear()
+        return articles
+
+    @staticmethod
+    def _get_article_id(article):
+        for article_id in article.iterfind(".//article-meta/article-id"):
+            if article_id.get("pub-id-type") in ("pmc", "pmcid") and article_id.text:
+                return article_id.text.strip().removeprefix("PMC")
+        return None
+
+    def _parse_article(self, article):
         """
-        Parses the XML content to extract title, abstract, and body.
-        Args:
-            xml_content: XML content of the article.
-        Returns:
-            Dictionary containing title, abstract, and body text.
+        Extracts the title, abstract and body of an article element and whether it has body content.
         """
-        root = ET.fromstring(xml_content)
         ns = {
             "mml": "http://www.w3.org/1998/Math/MathML",
             "xlink": "http://www.w3.org/1999/xlink",
         }
 
-        article = root.find("article", ns)
-        if article is None:
-            return None
-
         title = article.findtext(
             ".//title-group/article-title", default="", namespaces=ns
         )
@@ -171,4 +186,34 @@ class PubMedCentralSearch:
                     if p.text:
                         body.append(p.text.strip())
 
-        return {"title": title, "abstract": abstract_text, "body": "\n".join(body)}
+        return {
+            "title": title,
+            "abstract": abstract_text,
+            "body": "\n".join(body),
+            "has_body": body_elem is not None or bool(body),
+        }
+
+    def has_body_content(self, xml_content):
+        """
+        Checks if the XML content has a body section.
+        Args:
+            xml_content: XML content of the article.
+        Returns:
+            Boolean indicating presence of body content.
+        """
+        articles = self.parse_articles(xml_content)
+        return bool(articles) and articles[0][1]["has_body"]
+
+    def parse_xml(self, xml_content):
+        """
+        Parses the XML content to extract title, abstract, and body.
+        Args:
+            xml_content: XML content of the article.
+        Returns:
+            Dictionary containing title, abstract, and body text.
+        """
+        articles = self.parse_articles(xml_content)
+        if not articles:
+            return None
+        article_data = articles[0][1]
+        return {"title": article_data["title"], "abstract": article_data["abstract"], "body": article_data["body"]}
@@ -2,14 +2,17 @@
 
 # libraries
 import os
-import requests
 import urllib.parse
 
+from ..base import AsyncRetriever
 
-class SearchApiSearch():
+
+class SearchApiSearch(AsyncRetriever):
     """
     SearchApi Retriever
     """
+    timeout = 20
+
     def __init__(self, query):
         """
         Initializes the SearchApiSearch object
@@ -32,7 +35,7 @@ class SearchApiSearch():
                             "You can get a key at https://www.searchapi.io/")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -58,7 +61,7 @@ class SearchApiSearch():
         search_response = []
 
         try:
-            response = requests.get(encoded_url, headers=headers, timeout=20)
+            response = await self._request("GET", encoded_url, headers=headers)
             if response.status_code == 200:
                 search_results = response.json()
                 if search_results:
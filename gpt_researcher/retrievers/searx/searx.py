@@ -1,11 +1,13 @@
 import os
 import json
-import requests
+import httpx
 from typing import List, Dict
 from urllib.parse import urljoin
 
+from ..base import AsyncRetriever
 
-class SearxSearch():
+
+class SearxSearch(AsyncRetriever):
     """
     SearxNG API Retriever
     """
@@ -35,7 +37,10 @@ class SearxSearch():
                 "You can find public instances at https://searx.space/"
             )
 
-    def search(self, max_results: int = 10) -> List[Dict[str, str]]:
+    def get_search_params(self):
+        return {"base_url": self.base_url}
+
+    async def asearch(self, max_results: int = 10) -> List[Dict[str, str]]:
         """
         Searches the query using SearxNG API
         Args:
@@ -53,7 +58,8 @@ class SearxSearch():
         }
 
         try:
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 search_url,
                 params=params,
                 headers={'Accept': 'application/json'}
@@ -71,7 +77,7 @@ class SearxSearch():
 
             return search_response
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"Error querying SearxNG: {str(e)}")
         except json.JSONDecodeError:
             raise Exception("Error parsing SearxNG response")
@@ -1,13 +1,16 @@
 from typing import Dict, List
 
-import requests
+import httpx
 
+from ..base import AsyncRetriever
 
-class SemanticScholarSearch:
+
+class SemanticScholarSearch(AsyncRetriever):
     """
     Semantic Scholar API Retriever
     """
 
+    search_cache_ttl = 7 * 24 * 3600
     BASE_URL = "https://api.semanticscholar.org/graph/v1/paper/search"
     VALID_SORT_CRITERIA = ["relevance", "citationCount", "publicationDate"]
 
@@ -22,7 +25,10 @@ class SemanticScholarSearch:
         assert sort in self.VALID_SORT_CRITERIA, "Invalid sort criterion"
         self.sort = sort.lower()
 
-    def search(self, max_results: int = 20) -> List[Dict[str, str]]:
+    def get_search_params(self):
+        return {"sort": self.sort}
+
+    async def asearch(self, max_results: int = 20) -> List[Dict[str, str]]:
         """
         Perform the search on Semantic Scholar and return results.
 
@@ -37,9 +43,9 @@ class SemanticScholarSearch:
         }
 
         try:
-            response = requests.get(self.BASE_URL, params=params)
+            response = await self._request("GET", self.BASE_URL, params=params)
             response.raise_for_status()
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"An error occurred while accessing Semantic Scholar API: {e}")
             return []
 
@@ -2,11 +2,12 @@
 
 # libraries
 import os
-import requests
 import urllib.parse
 
+from ..base import AsyncRetriever
 
-class SerpApiSearch():
+
+class SerpApiSearch(AsyncRetriever):
     """
     SerpApi Retriever
     """
@@ -32,7 +33,7 @@ class SerpApiSearch():
                             "You can get a key at https://serpapi.com/")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -50,7 +51,7 @@ class SerpApiSearch():
         encoded_url = url + "?" + urllib.parse.urlencode(params)
         search_response = []
         try:
-            response = requests.get(encoded_url, timeout=10)
+            response = await self._request("GET", encoded_url)
             if response.status_code == 200:
                 search_results = response.json()
                 if search_results:
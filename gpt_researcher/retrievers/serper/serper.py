@@ -2,11 +2,12 @@
 
 # libraries
 import os
-import requests
 import json
 
+from ..base import AsyncRetriever
 
-class SerperSearch():
+
+class SerperSearch(AsyncRetriever):
     """
     Google Serper Retriever
     """
@@ -32,7 +33,7 @@ class SerperSearch():
                             "You can get a key at https://serper.dev/")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -51,7 +52,7 @@ class SerperSearch():
         }
         data = json.dumps({"q": self.query, "num": max_results})
 
-        resp = requests.request("POST", url, timeout=10, headers=headers, data=data)
+        resp = await self._request("POST", url, headers=headers, content=data)
 
         # Preprocess the results
         if resp is None:
@@ -3,15 +3,18 @@
 # libraries
 import os
 from typing import Literal, Sequence, Optional
-import requests
-import json
 
+from ..base import AsyncRetriever
 
-class TavilySearch():
+
+class TavilySearch(AsyncRetriever):
     """
     Tavily API Retriever
     """
 
+    # Advanced searches often take longer than the default timeout of the other retrievers
+    timeout: float = 100
+
     def __init__(self, query, headers=None, topic="general"):
         """
         Initializes the TavilySearch object
@@ -42,7 +45,10 @@ class TavilySearch():
                     "Tavily API key not found. Please set the TAVILY_API_KEY environment variable.")
         return api_key
 
-    def _search(self,
+    def get_search_params(self):
+        return {"topic": self.topic}
+
+    async def _search(self,
                 query: str,
                 search_depth: Literal["basic", "advanced"] = "basic",
                 topic: str = "general",
@@ -74,8 +80,7 @@ class TavilySearch():
             "use_cache": use_cache,
         }
 
-        response = requests.post(self.base_url, data=json.dumps(
-            data), headers=self.headers, timeout=100)
+        response = await self._request("POST", self.base_url, json=data, headers=self.headers)
 
         if response.status_code == 200:
             return response.json()
@@ -83,7 +88,7 @@ class TavilySearch():
             # Raises a HTTPError if the HTTP request returned an unsuccessful status code
             response.raise_for_status()
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -91,7 +96,7 @@ class TavilySearch():
         """
         try:
             # Search the query
-            results = self._search(
+            results = await self._search(
                 self.query, search_depth="basic", max_results=max_results, topic=self.topic)
             sources = results.get("results", [])
             if not sources:
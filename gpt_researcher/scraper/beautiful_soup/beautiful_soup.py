@@ -1,74 +1,92 @@
+import asyncio
+
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
-from ..utils import get_relevant_images, extract_title
+from ..cache import get_cache_validators
+from ..extraction import extract_page, extract_text, parse_html
+from ..fetch import DEFAULT_MAX_BYTES, FetchedPage, fetch, fetch_async
+from ..pymupdf.pymupdf import PyMuPDFScraper
+from ...utils.workers import run_in_process
+
+# Smaller pages are parsed in the calling thread, where it is cheaper than sending them to a process
+MIN_PROCESS_PARSE_SIZE = 32 * 1024
 
 class BeautifulSoupScraper:
 
+    # Bytes of a page read at most, larger pages are truncated
+    max_bytes = DEFAULT_MAX_BYTES
+    # Number of processes parsing pages, 0 parses in the calling thread
+    parser_processes = 0
+    # Settings of the PDF scraper that linked PDFs are handed over to
+    pdf_max_pages = 0
+    pdf_max_chars = 0
+
     def __init__(self, link, session=None):
         self.link = link
         self.session = session
+        self.validators = {}
 
     def scrape(self):
         """
-        This function scrapes content from a webpage by making a GET request, parsing the HTML using
-        BeautifulSoup, and extracting script and style elements before returning the cleaned content.
-        
+        This function scrapes content from a webpage by making a GET request and parsing the HTML
+        with lxml in a single pass (`extract_page`), which drops scripts, styles and boilerplate
+        blocks while it collects the text, the relevant images and the title.
+
         Returns:
-          The `scrape` method is returning the cleaned and extracted content from the webpage specified
-        by the `self.link` attribute. The method fetches the webpage content, removes script and style
-        tags, extracts the text content, and returns the cleaned content as a string. If any exception
-        occurs during the process, an error message is printed and an empty string is returned.
+          A tuple of the cleaned text content, the relevant image urls and the title of the webpage
+        specified by the `self.link` attribute. PDFs are handed over to PyMuPDF, see `parse_page`.
+        If any exception occurs during the process, an error message is printed and an empty
+        result is returned.
         """
         try:
-            response = self.session.get(self.link, timeout=4)
-            soup = BeautifulSoup(
-                response.content, "lxml", from_encoding=response.encoding
-            )
-
-            for script_or_style in soup(["script", "style"]):
-                script_or_style.extract()
-
-            raw_content = self.get_content_from_url(soup)
-            lines = (line.strip() for line in raw_content.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            content = "\n".join(chunk for chunk in chunks if chunk)
-
-            image_urls = get_relevant_images(soup, self.link)
-            
-            # Extract the title using the utility function
-            title = extract_title(soup)
-
-            return content, image_urls, title
+            page = fetch(self.session, self.link, max_bytes=self.max_bytes)
+            return self.parse_page(page)
 
         except Exception as e:
             print("Error! : " + str(e))
             return "", [], ""
 
-    def get_content_from_url(self, soup: BeautifulSoup) -> str:
-        """Get the relevant text from the soup with improved filtering"""
-        text_elements = []
-        tags = ["h1", "h2", "h3", "h4", "h5", "p", "li", "div", "span"]
-
-        for element in soup.find_all(tags):
-            # Skip empty elements
-            if not element.text.strip():
-                continue
-
-            # Skip elements with very short text (likely buttons or links)
-            if len(element.text.split()) < 3:
-                continue
+    async def scrape_async(self):
+        """
+        Async variant of `scrape`. The page is fetched with the shared pooled HTTP client
+        and parsed off the event loop, so a slow page never blocks other research sessions.
+        """
+        try:
+            headers = {"User-Agent": self.session.headers.get("User-Agent")} if self.session else None
+            page = await fetch_async(self.link, headers=headers, max_bytes=self.max_bytes)
+            return await asyncio.to_thread(self.parse_page, page)
 
-            # Check if the element is likely to be navigation or a menu
-            parent_classes = element.parent.get('class', [])
-            if any(cls in ['nav', 'menu', 'sidebar', 'footer'] for cls in parent_classes):
-                continue
+        except Exception as e:
+            print("Error! : " + str(e))
+            return "", [], ""
 
-            # Remove excess whitespace and join lines
-            cleaned_text = ' '.join(element.text.split())
+    def parse_page(self, page: FetchedPage) -> tuple:
+        """
+        Parses a fetched page according to what it turned out to be. PDFs are handed over to
+        PyMuPDF, binaries and media yield no content.
+        """
+        self.validators = get_cache_validators(page.headers)
+        if page.kind == "pdf":
+            pdf_scraper = PyMuPDFScraper(self.link, self.session)
+            pdf_scraper.pdf_max_pages = self.pdf_max_pages
+            pdf_scraper.pdf_max_chars = self.pdf_max_chars
+            pdf_scraper.parser_processes = self.parser_processes
+            return pdf_scraper.parse(page.content)
+        if page.kind != "html":
+            return "", [], ""
+        return self.parse(page.content)
 
-            # Add the cleaned text to our list of elements
-            text_elements.append(cleaned_text)
+    def parse(self, html, encoding=None) -> tuple:
+        """
+        Parses the raw HTML of the page into its cleaned text content, relevant images and title.
+        Larger pages are parsed on the parser processes, so that pages scraped concurrently
+        are parsed in parallel rather than one at a time under the GIL.
+        """
+        if len(html) < MIN_PROCESS_PARSE_SIZE:
+            return extract_page(html, self.link, encoding)
+        return run_in_process(self.parser_processes, extract_page, html, self.link, encoding)
 
-        # Join all text elements with newlines
-        return '\n\n'.join(text_elements)
+    def get_content_from_url(self, soup: BeautifulSoup) -> str:
+        """Get the relevant text from the soup with improved filtering"""
+        return extract_text(parse_html(str(soup)))
@@ -1,27 +1,61 @@
 from __future__ import annotations
 
 import traceback
-import pickle
-from pathlib import Path
 from sys import platform
 import time
-import random
-import string
-import os
 
 from bs4 import BeautifulSoup
 
 from .processing.scrape_skills import (scrape_pdf_with_pymupdf,
                                        scrape_pdf_with_arxiv)
+from .pool import get_browser_pool
 
 from urllib.parse import urljoin
 
-FILE_DIR = Path(__file__).parent.parent
-
+from ..extraction import extract_text, parse_html
 from ..utils import get_relevant_images, extract_title
 
+# Entries of the resource timing buffer. Browsers stop recording resources after 250 by
+# default, after which a busy page would look idle to WAIT_FOR_IDLE_SCRIPT
+RESOURCE_TIMING_BUFFER_SIZE = 10000
+
+# Resolves once the page finished loading, fetched no new resources and did not mutate its DOM
+# for `quietMs`, or once `budgetMs` elapsed. Resolves to whether the page actually settled.
+WAIT_FOR_IDLE_SCRIPT = """
+const [quietMs, budgetMs, bufferSize, done] = arguments;
+performance.setResourceTimingBufferSize(bufferSize);
+const start = performance.now();
+let lastChange = start;
+let lastResources = performance.getEntriesByType('resource').length;
+const observer = new MutationObserver(() => { lastChange = performance.now(); });
+observer.observe(document, {childList: true, subtree: true, characterData: true});
+(function check() {
+    const now = performance.now();
+    const resources = performance.getEntriesByType('resource').length;
+    if (resources !== lastResources) {
+        lastResources = resources;
+        lastChange = now;
+    }
+    const idle = document.readyState === 'complete' && now - lastChange >= quietMs;
+    if (idle || now - start >= budgetMs) {
+        observer.disconnect();
+        done(idle);
+    } else {
+        setTimeout(check, 50);
+    }
+})();
+"""
+
 
 class BrowserScraper:
+    # Total time a page may take to load and scroll, in seconds
+    page_budget = 15
+    # How long the page has to stay free of network and DOM activity to count as loaded
+    quiet_period = 0.5
+    # Infinite scroll stops after this many scrolls, or once a scroll adds less new text
+    max_scrolls = 10
+    min_new_text = 200
+
     def __init__(self, url: str, session=None):
         self.url = url
         self.session = session
@@ -33,7 +67,6 @@ class BrowserScraper:
         self.driver = None
         self.use_browser_cookies = False
         self._import_selenium()  # Import only if used to avoid unnecessary dependencies
-        self.cookie_filename = f"{self._generate_random_string(8)}.pkl"
 
     def scrape(self) -> tuple:
         if not self.url:
@@ -41,12 +74,10 @@ class BrowserScraper:
             return "A URL was not specified, cancelling request to browse website.", [], ""
 
         try:
-            self.setup_driver()
-            self._visit_google_and_save_cookies()
-            self._load_saved_cookies()
-            self._add_header()
-
-            text, image_urls, title = self.scrape_text_with_selenium()
+            # Borrow a warm browser from the shared pool, the page is scraped in a fresh tab
+            with get_browser_pool(self.driver_settings, self.create_driver).page() as driver:
+                self.driver = driver
+                text, image_urls, title = self.scrape_text_with_selenium()
             return text, image_urls, title
         except Exception as e:
             print(f"An error occurred during scraping: {str(e)}")
@@ -54,9 +85,7 @@ class BrowserScraper:
             print(traceback.format_exc())
             return f"An error occurred: {str(e)}\n\nStack trace:\n{traceback.format_exc()}", [], ""
         finally:
-            if self.driver:
-                self.driver.quit()
-            self._cleanup_cookie_file()
+            self.driver = None
 
     def _import_selenium(self):
         try:
@@ -80,7 +109,16 @@ class BrowserScraper:
             raise ImportError(
                 "Selenium is required but not installed. See error message above for installation instructions.") from e
 
+    @property
+    def driver_settings(self) -> tuple:
+        """The settings `create_driver` starts a browser with, scrapers sharing them share browsers."""
+        return self.selenium_web_browser, self.headless, self.user_agent, self.use_browser_cookies
+
     def setup_driver(self) -> None:
+        self.driver = self.create_driver()
+
+    def create_driver(self, slot: int = 0):
+        """Starts a new browser. `slot` tells apart the browsers running at the same time."""
         # print(f"Setting up {self.selenium_web_browser} driver...")
 
         options_available = {
@@ -97,38 +135,33 @@ class BrowserScraper:
 
         try:
             if self.selenium_web_browser == "firefox":
-                self.driver = webdriver.Firefox(options=options)
+                driver = webdriver.Firefox(options=options)
             elif self.selenium_web_browser == "safari":
-                self.driver = webdriver.Safari(options=options)
+                driver = webdriver.Safari(options=options)
             else:  # chrome
                 if platform == "linux" or platform == "linux2":
                     options.add_argument("--disable-dev-shm-usage")
-                    options.add_argument("--remote-debugging-port=9222")
+                    options.add_argument(f"--remote-debugging-port={9222 + slot}")
                 options.add_argument("--no-sandbox")
                 options.add_experimental_option("prefs", {"download_restrictions": 3})
-                self.driver = webdriver.Chrome(options=options)
+                driver = webdriver.Chrome(options=options)
+                # Raise the buffer before the page's own requests can fill it
+                driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                    "source": f"performance.setResourceTimingBufferSize({RESOURCE_TIMING_BUFFER_SIZE});"
+                })
 
             if self.use_browser_cookies:
-                self._load_browser_cookies()
+                self._load_browser_cookies(driver)
 
             # print(f"{self.selenium_web_browser.capitalize()} driver set up successfully.")
+            return driver
         except Exception as e:
             print(f"Failed to set up {self.selenium_web_browser} driver: {str(e)}")
             print("Full stack trace:")
             print(traceback.format_exc())
             raise
 
-    def _load_saved_cookies(self):
-        """Load saved cookies before visiting the target URL"""
-        cookie_file = Path(self.cookie_filename)
-        if cookie_file.exists():
-            cookies = pickle.load(open(self.cookie_filename, "rb"))
-            for cookie in cookies:
-                self.driver.add_cookie(cookie)
-        else:
-            print("No saved cookies found.")
-
-    def _load_browser_cookies(self):
+    def _load_browser_cookies(self, driver):
         """Load cookies directly from the browser"""
         try:
             import browser_cookie3
@@ -145,22 +178,7 @@ class BrowserScraper:
             return
 
         for cookie in cookies:
-            self.driver.add_cookie({'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain})
-
-    def _cleanup_cookie_file(self):
-        """Remove the cookie file"""
-        cookie_file = Path(self.cookie_filename)
-        if cookie_file.exists():
-            try:
-                os.remove(self.cookie_filename)
-            except Exception as e:
-                print(f"Failed to remove cookie file: {str(e)}")
-        else:
-            print("No cookie file found to remove.")
-
-    def _generate_random_string(self, length):
-        """Generate a random string of specified length"""
-        return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+            driver.add_cookie({'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain})
 
     def _get_domain(self):
         """Extract domain from URL"""
@@ -169,35 +187,21 @@ class BrowserScraper:
         domain = urlparse(self.url).netloc
         return domain[4:] if domain.startswith('www.') else domain
 
-    def _visit_google_and_save_cookies(self):
-        """Visit Google and save cookies before navigating to the target URL"""
-        try:
-            self.driver.get("https://www.google.com")
-            time.sleep(2)  # Wait for cookies to be set
-
-            # Save cookies to a file
-            cookies = self.driver.get_cookies()
-            pickle.dump(cookies, open(self.cookie_filename, "wb"))
-
-            # print("Google cookies saved successfully.")
-        except Exception as e:
-            print(f"Failed to visit Google and save cookies: {str(e)}")
-            print("Full stack trace:")
-            print(traceback.format_exc())
-
     def scrape_text_with_selenium(self) -> tuple:
-        self.driver.get(self.url)
-
+        deadline = time.monotonic() + self.page_budget
+        self.driver.set_page_load_timeout(self.page_budget)
         try:
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-        except TimeoutException as e:
+            self.driver.get(self.url)
+        except TimeoutException:
+            # Scrape whatever loaded within the budget
+            self.driver.execute_script("window.stop();")
+
+        if not self.driver.find_elements(By.TAG_NAME, "body"):
             print("Timed out waiting for page to load")
-            print(f"Full stack trace:\n{traceback.format_exc()}")
             return "Page load timed out", [], ""
 
-        self._scroll_to_bottom()
+        self._wait_until_idle(deadline)
+        self._scroll_to_bottom(deadline)
 
         if self.url.endswith(".pdf"):
             text = scrape_pdf_with_pymupdf(self.url)
@@ -208,14 +212,11 @@ class BrowserScraper:
             return text, [], ""
         else:
             page_source = self.driver.execute_script("return document.body.outerHTML;")
-            soup = BeautifulSoup(page_source, "html.parser")
+            root = parse_html(page_source)
 
-            for script in soup(["script", "style"]):
-                script.extract()
-
-            text = self.get_text(soup)
-            image_urls = get_relevant_images(soup, self.url)
-            title = extract_title(soup)
+            text = extract_text(root)
+            image_urls = get_relevant_images(root, self.url) if root is not None else []
+            title = extract_title(root) if root is not None else ""
 
         lines = (line.strip() for line in text.splitlines())
         chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
@@ -224,49 +225,42 @@ class BrowserScraper:
 
     def get_text(self, soup: BeautifulSoup) -> str:
         """Get the relevant text from the soup with improved filtering"""
-        text_elements = []
-        tags = ["h1", "h2", "h3", "h4", "h5", "p", "li", "div", "span"]
-
-        for element in soup.find_all(tags):
-            # Skip empty elements
-            if not element.text.strip():
-                continue
-
-            # Skip elements with very short text (likely buttons or links)
-            if len(element.text.split()) < 3:
-                continue
-
-            # Check if the element is likely to be navigation or a menu
-            parent_classes = element.parent.get('class', [])
-            if any(cls in ['nav', 'menu', 'sidebar', 'footer'] for cls in parent_classes):
-                continue
-
-            # Remove excess whitespace and join lines
-            cleaned_text = ' '.join(element.text.split())
-
-            # Add the cleaned text to our list of elements
-            text_elements.append(cleaned_text)
-
-        # Join all text elements with newlines
-        return '\n\n'.join(text_elements)
+        return extract_text(parse_html(str(soup)))
+
+    def _wait_until_idle(self, deadline: float) -> bool:
+        """Wait until the page is quiet on the network and the DOM, or until the deadline"""
+        budget = deadline - time.monotonic()
+        if budget <= 0:
+            return False
+        self.driver.set_script_timeout(budget + 1)
+        try:
+            return bool(self.driver.execute_async_script(
+                WAIT_FOR_IDLE_SCRIPT, int(self.quiet_period * 1000), int(budget * 1000), RESOURCE_TIMING_BUFFER_SIZE
+            ))
+        except TimeoutException:
+            return False
 
-    def _scroll_to_bottom(self):
+    def _scroll_to_bottom(self, deadline: float | None = None):
         """Scroll to the bottom of the page to load all content"""
+        if deadline is None:
+            deadline = time.monotonic() + self.page_budget
         last_height = self.driver.execute_script("return document.body.scrollHeight")
-        while True:
+        last_text_length = self.driver.execute_script("return document.body.innerText.length")
+        for _ in range(self.max_scrolls):
+            if time.monotonic() >= deadline:
+                break
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Wait for content to load
+            self._wait_until_idle(deadline)  # Wait for content to load
             new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
+            new_text_length = self.driver.execute_script("return document.body.innerText.length")
+            # Stop once scrolling no longer loads a meaningful amount of text
+            if new_height == last_height or new_text_length - last_text_length < self.min_new_text:
                 break
             last_height = new_height
+            last_text_length = new_text_length
 
     def _scroll_to_percentage(self, ratio: float) -> None:
         """Scroll to a percentage of the page"""
         if ratio < 0 or ratio > 1:
             raise ValueError("Percentage should be between 0 and 1")
         self.driver.execute_script(f"window.scrollTo(0, document.body.scrollHeight * {ratio});")
-
-    def _add_header(self) -> None:
-        """Add a header to the website"""
-        self.driver.execute_script(open(f"{FILE_DIR}/browser/js/overlay.js", "r").read())
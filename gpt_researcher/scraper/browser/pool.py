@@ -0,0 +1,150 @@
+import atexit
+import threading
+import traceback
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, List
+
+
+class PooledBrowser:
+    """A warm browser process owned by a `BrowserPool`, together with its usage count."""
+
+    def __init__(self, driver, slot: int):
+        self.driver = driver
+        self.slot = slot
+        self.pages = 0
+        self.base_handle = driver.current_window_handle
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Failed to quit browser: {str(e)}")
+
+
+class BrowserPool:
+    """
+    Keeps up to `size` warm browsers alive across pages and research runs.
+
+    Every scrape borrows an idle browser and gets a fresh tab in it, which is closed once
+    the page is scraped. Browsers are recycled after serving `max_pages` pages, or right
+    away if a scrape crashed them, so that leaks and broken sessions do not accumulate.
+    Browsers are started lazily, and callers block while all of them are busy.
+    """
+
+    def __init__(self, driver_factory: Callable[[int], object], size: int = 2, max_pages: int = 50):
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self._idle: List[PooledBrowser] = []
+        self._free_slots = list(range(self.size))
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _acquire(self) -> PooledBrowser:
+        with self._condition:
+            while not self._idle and not self._free_slots and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            slot = self._free_slots.pop()
+
+        try:
+            return PooledBrowser(self.driver_factory(slot), slot)
+        except Exception:
+            self._release_slot(slot)
+            raise
+
+    def _release_slot(self, slot: int) -> None:
+        with self._condition:
+            self._free_slots.append(slot)
+            self._condition.notify()
+
+    def _release(self, browser: PooledBrowser, broken: bool) -> None:
+        browser.pages += 1
+        if broken or self._closed or browser.pages >= self.max_pages:
+            browser.quit()
+            self._release_slot(browser.slot)
+            return
+        with self._condition:
+            self._idle.append(browser)
+            self._condition.notify()
+
+    @contextmanager
+    def page(self):
+        """
+        Borrows a browser with a fresh tab for the duration of the block and yields its driver.
+        """
+        browser = self._acquire()
+        driver = browser.driver
+        broken = False
+        try:
+            try:
+                driver.switch_to.new_window("tab")
+            except Exception:
+                # Not every driver supports tabs, fall back to the main window
+                pass
+            yield driver
+        except Exception:
+            broken = self._is_crashed(driver)
+            raise
+        finally:
+            try:
+                if driver.current_window_handle != browser.base_handle:
+                    driver.close()
+                    driver.switch_to.window(browser.base_handle)
+            except Exception:
+                broken = True
+            self._release(browser, broken)
+
+    @staticmethod
+    def _is_crashed(driver) -> bool:
+        try:
+            driver.current_window_handle
+            return False
+        except Exception:
+            return True
+
+    def close(self) -> None:
+        """Quits all idle browsers. Browsers in use are quit as soon as they are released."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for browser in idle:
+            browser.quit()
+
+
+_browser_pools: Dict[Hashable, BrowserPool] = {}
+_browser_pool_lock = threading.Lock()
+_browser_pool_settings = {"size": 2, "max_pages": 50}
+
+
+def configure_browser_pool(size: int, max_pages: int) -> None:
+    """Sets the size and recycling limit of the browser pools started from now on."""
+    with _browser_pool_lock:
+        _browser_pool_settings.update(size=size, max_pages=max_pages)
+
+
+def get_browser_pool(key: Hashable, driver_factory: Callable[[int], object]) -> BrowserPool:
+    """
+    Returns the process-wide browser pool for `key`, creating it with `driver_factory` on first use.
+
+    `key` must cover every setting `driver_factory` starts its browsers with, so that scrapers
+    with different settings never share browsers.
+    """
+    with _browser_pool_lock:
+        if key not in _browser_pools:
+            if not _browser_pools:
+                atexit.register(_close_browser_pools)
+            _browser_pools[key] = BrowserPool(driver_factory, **_browser_pool_settings)
+        return _browser_pools[key]
+
+
+def _close_browser_pools() -> None:
+    for pool in list(_browser_pools.values()):
+        try:
+            pool.close()
+        except Exception:
+            print(traceback.format_exc())
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+
+from .utils import normalize_url
+from ..utils.cache import SQLiteCache
+
+_scrape_caches: Dict[str, Optional["ScrapeCache"]] = {}
+
+
+def get_cache_validators(headers) -> Dict[str, Any]:
+    """
+    Extract the HTTP validators and freshness lifetime of a response from its headers.
+    """
+    validators = {}
+    if not headers:
+        return validators
+
+    if headers.get("ETag"):
+        validators["etag"] = headers.get("ETag")
+    if headers.get("Last-Modified"):
+        validators["last_modified"] = headers.get("Last-Modified")
+
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if "no-store" in cache_control:
+        validators["no_store"] = True
+    max_age = re.search(r"max-age=(\d+)", cache_control)
+    if max_age:
+        validators["max_age"] = int(max_age.group(1))
+
+    return validators
+
+
+class ScrapeCache:
+    """
+    On-disk cache of scraped pages, keyed by the hash of their normalized URL.
+
+    Stores the extracted content, title and image urls of every page together with its
+    ETag / Last-Modified validators, so that stale entries can be revalidated with a
+    conditional request instead of being downloaded and parsed again.
+    """
+
+    def __init__(self, path: str, ttl: int = 86400, max_size: int = 512 * 1024 * 1024):
+        self.ttl = ttl
+        self.cache = SQLiteCache(path, max_size=max_size)
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached scrape of `url`, if any. The returned dict has a `stale` flag set
+        when the entry expired and has to be revalidated before being used.
+        """
+        entry = self.cache.get_entry(self.get_key(url))
+        if entry is None:
+            return None
+
+        data = json.loads(entry["value"])
+        data["stale"] = entry["expired"]
+        return data
+
+    def get_ttl(self, validators: Dict[str, Any]) -> int:
+        """The configured TTL, or the page's own max-age when it is shorter and the page can be revalidated."""
+        if "max_age" in validators and ("etag" in validators or "last_modified" in validators):
+            return min(self.ttl, validators["max_age"])
+        return self.ttl
+
+    def set(self, url: str, content: str, image_urls: list, title: str, validators: Optional[Dict] = None) -> None:
+        """
+        Caches a scraped page. The entry lives for the configured TTL, or for the page's own
+        max-age when it is shorter and the page can be revalidated.
+        """
+        validators = validators or {}
+        if validators.get("no_store"):
+            return
+
+        data = {
+            "url": url,
+            "raw_content": content,
+            "image_urls": image_urls,
+            "title": title,
+            "etag": validators.get("etag"),
+            "last_modified": validators.get("last_modified"),
+        }
+        self.cache.set(self.get_key(url), json.dumps(data).encode(), ttl=self.get_ttl(validators))
+
+    def refresh(self, url: str, validators: Optional[Dict] = None) -> None:
+        """
+        Marks a stale entry as fresh again after the origin confirmed it did not change.
+        The validators and max-age of the 304 response replace the stored ones, so the entry
+        lives as long as the origin now allows.
+        """
+        validators = validators or {}
+        key = self.get_key(url)
+        entry = self.cache.get_entry(key)
+        if entry is None or validators.get("no_store"):
+            return
+
+        data = json.loads(entry["value"])
+        for name in ("etag", "last_modified"):
+            data[name] = validators.get(name) or data.get(name)
+        freshness = {name: data[name] for name in ("etag", "last_modified") if data[name]}
+        if "max_age" in validators:
+            freshness["max_age"] = validators["max_age"]
+        self.cache.set(key, json.dumps(data).encode(), ttl=self.get_ttl(freshness))
+
+
+def get_scrape_cache(cfg) -> Optional[ScrapeCache]:
+    """
+    Returns the process-wide scrape cache configured by `cfg`, or None if scrape caching
+    is disabled or the cache could not be opened.
+    """
+    if not cfg or not cfg.scrape_cache:
+        return None
+
+    path = os.path.join(os.path.expanduser(cfg.cache_dir), "scrape_cache.sqlite")
+    if path not in _scrape_caches:
+        try:
+            _scrape_caches[path] = ScrapeCache(
+                path,
+                ttl=cfg.scrape_cache_ttl,
+                max_size=cfg.scrape_cache_max_size * 1024 * 1024,
+            )
+        except Exception as e:
+            print(f"Failed to open scrape cache at {path}: {e}. Scraping without cache.")
+            _scrape_caches[path] = None
+    return _scrape_caches[path]
@@ -0,0 +1,142 @@
+import hashlib
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import numpy as np
+
+from .utils import normalize_url
+
+# Host prefixes that only select a mobile or AMP rendering of a page
+MOBILE_HOST_PREFIXES = ("www.", "amp.", "m.", "mobile.")
+# Query parameters that only select the AMP rendering of a page when set to "amp"
+AMP_QUERY_KEYS = ("outputtype", "output", "format")
+
+_WORD = re.compile(r"\w+")
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def _is_amp_flag(key: str, value: str) -> bool:
+    key = key.lower()
+    return key == "amp" or (key in AMP_QUERY_KEYS and value.lower() == "amp")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonicalizes a URL beyond `normalize_url` so that mirrors of the same page on http and
+    https, on www/mobile/AMP hosts and under an /amp path or query compare equal.
+    """
+    parsed = urlparse(normalize_url(url))
+    netloc = parsed.netloc
+    for prefix in MOBILE_HOST_PREFIXES:
+        if netloc.startswith(prefix):
+            netloc = netloc[len(prefix):]
+            break
+    path = re.sub(r"(/amp|\.amp)(\.html?)?$", "", parsed.path) or "/"
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not _is_amp_flag(key, value)
+    ]
+    return urlunparse(("", netloc, path, parsed.params, urlencode(query), ""))
+
+
+class ContentDeduplicator:
+    """
+    Drops scraped pages that duplicate a page already kept by the deduplicator.
+
+    Pages are duplicates when their canonical URLs match, when their normalized text is
+    identical, or when the MinHash signatures of their word shingles estimate a Jaccard
+    similarity of at least `threshold`. Candidate pairs are found with locality-sensitive
+    hashing over bands of the signatures, so every page is only compared with the few
+    pages sharing a band with it. Of every cluster the first page kept is the
+    representative, and the URLs of its duplicates are recorded in its `merged_urls`
+    so that they can still be cited.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16, shingle_size: int = 5):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, 0xFFFFFFFF, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 0xFFFFFFFF, size=num_perm, dtype=np.uint64)
+
+        self._pages: List[Dict[str, Any]] = []
+        self._signatures: List[Optional[np.ndarray]] = []
+        self._urls: Dict[str, int] = {}
+        self._hashes: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def _signature(self, words: List[str]) -> Optional[np.ndarray]:
+        """The MinHash signature of the word shingles of a page, None if it is too short."""
+        if len(words) < self.shingle_size:
+            return None
+        shingles = {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # Universal hashing, the products wrap around which is fine for hashing
+        return ((np.outer(self._a, hashes) + self._b[:, None]) & _MAX_HASH).min(axis=1)
+
+    def _find_near_duplicate(self, signature: np.ndarray) -> Optional[int]:
+        best, best_similarity = None, self.threshold
+        for band in range(self.bands):
+            key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for index in self._buckets.get(key, []):
+                similarity = float(np.mean(self._signatures[index] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = index, similarity
+        return best
+
+    def _find_duplicate(self, url_key: str, text_hash: str, signature: Optional[np.ndarray]) -> Optional[int]:
+        if url_key in self._urls:
+            return self._urls[url_key]
+        if text_hash in self._hashes:
+            return self._hashes[text_hash]
+        if signature is not None:
+            return self._find_near_duplicate(signature)
+        return None
+
+    def _add(self, page: Dict[str, Any], url_key: str, text_hash: str, signature: Optional[np.ndarray]) -> None:
+        index = len(self._pages)
+        self._pages.append(page)
+        self._signatures.append(signature)
+        self._urls[url_key] = index
+        self._hashes[text_hash] = index
+        if signature is not None:
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                self._buckets.setdefault(key, []).append(index)
+
+    def deduplicate(self, pages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Returns the pages that do not duplicate a page seen before, in their original order,
+        and the number of pages dropped. Within the batch the longest page of a cluster is kept.
+        """
+        candidates = []
+        for position, page in enumerate(pages):
+            words = _WORD.findall((page.get("raw_content") or "").lower())
+            text_hash = hashlib.sha256(" ".join(words).encode()).hexdigest()
+            candidates.append((position, page, canonical_url(page.get("url", "")), text_hash, words))
+
+        kept = []
+        for position, page, url_key, text_hash, words in sorted(candidates, key=lambda c: -len(c[4])):
+            signature = self._signature(words)
+            duplicate_of = self._find_duplicate(url_key, text_hash, signature)
+            if duplicate_of is None:
+                self._add(page, url_key, text_hash, signature)
+                kept.append((position, page))
+            else:
+                # Later variants of the duplicate are merged into the same representative
+                self._urls.setdefault(url_key, duplicate_of)
+                self._hashes.setdefault(text_hash, duplicate_of)
+                representative = self._pages[duplicate_of]
+                merged_urls = representative.setdefault("merged_urls", [])
+                for url in [page.get("url")] + page.get("merged_urls", []):
+                    if url and url != representative.get("url") and url not in merged_urls:
+                        merged_urls.append(url)
+
+        kept.sort(key=lambda item: item[0])
+        return [page for _, page in kept], len(pages) - len(kept)
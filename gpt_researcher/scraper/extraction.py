@@ -0,0 +1,153 @@
+from typing import List, Optional, Tuple, Union
+
+import lxml.html
+from lxml import etree
+
+from .utils import extract_title, get_relevant_images
+
+# Elements whose content is never part of the readable text of a page
+SKIPPED_TAGS = {
+    "head", "title", "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "object", "embed", "select", "button", "nav", "footer", "aside",
+}
+
+# Class or id tokens of navigation, menus and other page chrome, matched exactly so that
+# layout classes like "has-sidebar" or "no-sidebar" don't prune the whole page
+BOILERPLATE_TOKENS = {"nav", "navbar", "navigation", "menu", "sidebar", "footer", "breadcrumb", "breadcrumbs"}
+
+# Elements that contain the content of the page and are never pruned, whatever their classes
+CONTENT_TAGS = {"html", "body", "main", "article"}
+
+# Elements that start and end a block of text
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "body", "caption", "dd", "details", "dialog", "div",
+    "dl", "dt", "fieldset", "figcaption", "figure", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hgroup", "hr", "html", "li", "main", "ol", "p", "pre", "section", "summary", "table",
+    "tbody", "tfoot", "thead", "tr", "ul",
+}
+
+# Elements whose text is separated from its neighbours without starting a new block
+CELL_TAGS = {"td", "th"}
+
+# Elements that break the line within their block
+LINE_BREAK_TAGS = {"br"}
+
+
+def parse_html(html: Union[str, bytes], encoding: Optional[str] = None) -> Optional[etree._Element]:
+    """
+    Parses an HTML document or fragment with lxml. Returns None when there is nothing to parse.
+    """
+    if isinstance(html, str):
+        html, encoding = html.encode("utf-8"), "utf-8"
+    if not html or not html.strip():
+        return None
+    # huge_tree lifts libxml2's default nesting limit, which silently truncates deep DOMs
+    try:
+        parser = lxml.html.HTMLParser(encoding=encoding, remove_comments=True, huge_tree=True)
+        return lxml.html.document_fromstring(html, parser=parser)
+    except (etree.ParserError, LookupError, ValueError):
+        # Unknown or wrong encoding, let lxml detect it instead
+        try:
+            parser = lxml.html.HTMLParser(remove_comments=True, huge_tree=True)
+            return lxml.html.document_fromstring(html, parser=parser)
+        except (etree.ParserError, ValueError):
+            return None
+
+
+def is_boilerplate(element: etree._Element) -> bool:
+    """Whether the element is navigation, a menu, a footer or other non-content markup."""
+    if element.tag in SKIPPED_TAGS:
+        return True
+    if element.tag in CONTENT_TAGS:
+        return False
+    if element.get("role") in ("navigation", "menu", "menubar", "contentinfo"):
+        return True
+    for attribute in ("class", "id"):
+        value = element.get(attribute)
+        if value and not BOILERPLATE_TOKENS.isdisjoint(value.lower().split()):
+            return True
+    return False
+
+
+def extract_text(root: Optional[etree._Element], min_words: int = 3) -> str:
+    """
+    Extracts the readable text of a page in a single walk over its tree.
+
+    Every text node is visited exactly once, so nested containers never repeat their
+    content. Block-level elements split the text into blocks, which are returned
+    separated by blank lines, line breaks split a block into lines, and boilerplate
+    subtrees are pruned as soon as they are reached. Blocks shorter than `min_words`
+    words (buttons, stray links) are dropped.
+    """
+    if root is None:
+        return ""
+
+    blocks: List[str] = []
+    lines: List[str] = []
+    parts: List[str] = []
+
+    def end_line():
+        if parts:
+            line = " ".join("".join(parts).split())
+            parts.clear()
+            if line:
+                lines.append(line)
+
+    def end_block():
+        end_line()
+        if lines:
+            # The whole block counts, so the lines of a paragraph are kept together
+            if sum(len(line.split()) for line in lines) >= min_words:
+                blocks.append("\n".join(lines))
+            lines.clear()
+
+    # Iterative depth-first walk, deep DOMs would otherwise hit the recursion limit
+    stack = [(root, False)]
+    while stack:
+        element, closing = stack.pop()
+        tag = element.tag if isinstance(element.tag, str) else None
+
+        if closing:
+            if tag in BLOCK_TAGS:
+                end_block()
+            elif tag in CELL_TAGS:
+                parts.append(" ")
+            elif tag in LINE_BREAK_TAGS:
+                end_line()
+        elif tag is None or is_boilerplate(element):
+            # Pruned subtrees still separate the text around them
+            if tag is not None:
+                end_block()
+        else:
+            if tag in BLOCK_TAGS:
+                end_block()
+            if element.text:
+                parts.append(element.text)
+            stack.append((element, True))
+            stack.extend((child, False) for child in reversed(element))
+            continue
+
+        if element.tail and element is not root:
+            parts.append(element.tail)
+
+    end_block()
+    return "\n\n".join(blocks)
+
+
+def extract_page(html: Union[str, bytes], url: str, encoding: Optional[str] = None) -> Tuple[str, list, str]:
+    """
+    Parses a page into its cleaned text content, relevant images and title.
+
+    Only these compact results leave the function, never the parsed tree, so that it can
+    run in a parser process and send back little more than the text.
+    """
+    root = parse_html(html, encoding)
+    if root is None:
+        return "", [], ""
+
+    raw_content = extract_text(root)
+    lines = (line.strip() for line in raw_content.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    content = "\n".join(chunk for chunk in chunks if chunk)
+
+    return content, get_relevant_images(root, url), extract_title(root)
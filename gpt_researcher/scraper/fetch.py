@@ -0,0 +1,193 @@
+import codecs
+import re
+from typing import Mapping, Optional, Union
+
+import requests
+
+from ..utils.http_client import get_async_client
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Number of leading bytes looked at to tell what a response really is
+SNIFF_SIZE = 1024
+
+HTML_TYPES = {"text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml"}
+PDF_TYPES = {"application/pdf", "application/x-pdf"}
+BINARY_PREFIXES = ("image/", "audio/", "video/", "font/", "model/")
+BINARY_TYPES = {
+    "application/octet-stream", "application/zip", "application/gzip", "application/x-gzip",
+    "application/x-tar", "application/x-7z-compressed", "application/vnd.rar", "application/x-rar-compressed",
+    "application/x-msdownload", "application/vnd.ms-excel", "application/msword", "application/vnd.ms-powerpoint",
+    "application/wasm", "application/x-shockwave-flash",
+}
+# Leading bytes of common binary, archive and media formats
+MAGIC_NUMBERS = (
+    b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"BM", b"II*\x00", b"MM\x00*", b"PK\x03\x04", b"\x1f\x8b",
+    b"BZh", b"\xfd7zXZ", b"7z\xbc\xaf", b"Rar!", b"RIFF", b"ID3", b"\xff\xfb", b"OggS", b"fLaC",
+    b"\x1aE\xdf\xa3", b"\x7fELF", b"MZ", b"wOFF", b"wOF2", b"\xd0\xcf\x11\xe0",
+)
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+
+
+class FetchedPage:
+    """
+    The outcome of fetching a link: what it turned out to be and its (possibly truncated) body.
+
+    `kind` is "html" for pages and plain text, whose `content` is the decoded text, "pdf"
+    for PDF documents, whose `content` is the raw bytes, or "skipped" for binaries, media
+    and documents too large to be used, whose `content` is None.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        kind: str,
+        content: Union[str, bytes, None] = None,
+        truncated: bool = False,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.kind = kind
+        self.content = content
+        self.truncated = truncated
+
+
+def sniff_kind(content_type: str, head: bytes) -> str:
+    """Tells from the Content-Type header and the first bytes of a body whether it is html, pdf or skipped."""
+    if head.lstrip()[:5] == b"%PDF-" or content_type in PDF_TYPES:
+        return "pdf"
+    if content_type.startswith(BINARY_PREFIXES) or content_type in BINARY_TYPES:
+        return "skipped"
+    if content_type in HTML_TYPES:
+        return "html"
+    # Missing or unusual type, trust the bytes
+    if head.startswith(MAGIC_NUMBERS) or head[4:8] == b"ftyp" or b"\x00" in head:
+        return "skipped"
+    return "html"
+
+
+class _BodyReader:
+    """
+    Consumes a response body chunk by chunk, deciding what it is as soon as its first
+    bytes arrive and never holding more than `max_bytes` of it.
+
+    HTML is decoded incrementally with the charset of the Content-Type header or of the
+    page's meta tag, falling back to UTF-8. Pages are truncated at the limit, PDFs and
+    unwanted content are dropped.
+    """
+
+    def __init__(self, headers: Mapping[str, str], max_bytes: int):
+        self.max_bytes = max_bytes
+        content_type = headers.get("Content-Type") or ""
+        media_type, _, params = content_type.partition(";")
+        self.content_type = media_type.strip().lower()
+        charset = re.search(r"charset\s*=\s*[\"']?([\w.:-]+)", params, re.IGNORECASE)
+        self.charset = charset.group(1) if charset else None
+        try:
+            self.length = int(headers.get("Content-Length"))
+        except (TypeError, ValueError):
+            self.length = None
+
+        self.kind = None
+        self.truncated = False
+        self._head = b""
+        self._size = 0
+        self._parts = []
+        self._decoder = None
+
+        # Declared binaries, and PDFs too large to be read whole, are skipped without reading the body
+        if self.content_type in PDF_TYPES:
+            if self.length is not None and self.length > max_bytes:
+                self.kind = "skipped"
+        elif self.content_type != "application/octet-stream" and sniff_kind(self.content_type, b"") == "skipped":
+            # Generic binaries are still sniffed, as PDFs are often served as such
+            self.kind = "skipped"
+
+    def _start(self, head: bytes) -> None:
+        self.kind = sniff_kind(self.content_type, head)
+        if self.kind == "html":
+            charset = self.charset
+            if charset is None:
+                meta = _META_CHARSET.search(head)
+                charset = meta.group(1).decode("ascii", "ignore") if meta else "utf-8"
+            try:
+                decoder = codecs.getincrementaldecoder(charset)
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")
+            self._decoder = decoder(errors="replace")
+        if self.kind != "skipped":
+            self._append(head)
+
+    def _append(self, data: bytes) -> None:
+        remaining = self.max_bytes - self._size
+        if len(data) > remaining:
+            data = data[:remaining]
+            self.truncated = True
+        self._size += len(data)
+        if self.kind == "html":
+            self._parts.append(self._decoder.decode(data))
+        else:
+            self._parts.append(data)
+
+    def feed(self, chunk: bytes) -> bool:
+        """Adds the next chunk of the body. Returns False once no more of it should be read."""
+        if self.kind is None:
+            self._head += chunk
+            if len(self._head) < SNIFF_SIZE:
+                return True
+            head, self._head = self._head, b""
+            self._start(head)
+        elif self.kind != "skipped":
+            self._append(chunk)
+
+        if self.kind == "pdf" and self.truncated:
+            # A truncated PDF cannot be parsed
+            self.kind = "skipped"
+            self._parts = []
+        return self.kind != "skipped" and not self.truncated
+
+    def result(self, url: str, status_code: int, headers: Mapping[str, str]) -> FetchedPage:
+        if self.kind is None:
+            self._start(self._head)
+        if self.kind == "skipped":
+            return FetchedPage(url, status_code, headers, "skipped")
+        if self.kind == "html":
+            content = "".join(self._parts) + self._decoder.decode(b"", final=True)
+        else:
+            content = b"".join(self._parts)
+        return FetchedPage(url, status_code, headers, self.kind, content, self.truncated)
+
+
+def fetch(session: requests.Session, url: str, max_bytes: int = DEFAULT_MAX_BYTES, timeout: float = 4) -> FetchedPage:
+    """
+    Streams `url` with a blocking requests session, reading at most `max_bytes` of its body.
+    """
+    with session.get(url, timeout=timeout, stream=True) as response:
+        reader = _BodyReader(response.headers, max_bytes)
+        if reader.kind is None:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if not reader.feed(chunk):
+                    break
+        return reader.result(response.url, response.status_code, response.headers)
+
+
+async def fetch_async(
+    url: str,
+    headers: Optional[Mapping[str, str]] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    timeout: float = 4,
+) -> FetchedPage:
+    """
+    Streams `url` with the shared pooled async client, reading at most `max_bytes` of its body.
+    """
+    async with get_async_client().stream("GET", url, headers=headers, timeout=timeout) as response:
+        reader = _BodyReader(response.headers, max_bytes)
+        if reader.kind is None:
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                if not reader.feed(chunk):
+                    break
+        return reader.result(str(response.url), response.status_code, response.headers)
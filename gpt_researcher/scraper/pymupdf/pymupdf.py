@@ -1,21 +1,194 @@
-from langchain_community.document_loaders import PyMuPDFLoader
+import asyncio
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+try:
+    import pymupdf
+except ImportError:
+    # PyMuPDF releases before 1.24.3 only ship the `fitz` module
+    import fitz as pymupdf
+
+from ..fetch import DEFAULT_MAX_BYTES, fetch, fetch_async
+from ...utils.http_client import get_sync_session
+from ...utils.workers import get_process_pool, reset_process_pool
+
+# Documents with fewer pages are extracted in the calling process
+MIN_PARALLEL_PAGES = 8
+# Pages extracted by a single worker task
+PAGES_PER_TASK = 4
+
+_WHITESPACE = re.compile(r"[ \t\u00a0]+")
+_LINE_BREAK_HYPHEN = re.compile(r"(?<=[a-z])-\s*\n\s*(?=[a-z])")
+
+
+def _clean_block(text: str) -> str:
+    # PDF text blocks break lines at the layout width, rejoin them into one line
+    text = _LINE_BREAK_HYPHEN.sub("", text)
+    return _WHITESPACE.sub(" ", " ".join(line.strip() for line in text.splitlines())).strip()
+
+
+def extract_pages(data: bytes, start: int, stop: int) -> List[str]:
+    """
+    Extracts the clean text of pages `start` to `stop` of a PDF held in memory, one string
+    per page. Also runs in the worker processes, so it only takes and returns plain values.
+    """
+    flags = pymupdf.TEXT_PRESERVE_WHITESPACE | pymupdf.TEXT_DEHYPHENATE
+    pages = []
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        for number in range(start, min(stop, doc.page_count)):
+            blocks = doc[number].get_text("blocks", flags=flags, sort=True)
+            # Block type 1 are images
+            text = "\n".join(_clean_block(block[4]) for block in blocks if block[6] == 0)
+            pages.append(re.sub(r"\n{2,}", "\n", text).strip())
+    return pages
+
+
+def extract_shared_pages(name: str, size: int, start: int, stop: int) -> List[str]:
+    """
+    Variant of `extract_pages` for the worker processes, reading the PDF from the shared memory
+    block `name` so that the document is not pickled to the workers with every task.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        data = bytes(block.buf[:size])
+    finally:
+        block.close()
+    return extract_pages(data, start, stop)
+
+
+def extract_pdf(
+    data: bytes,
+    max_pages: int = 0,
+    max_chars: int = 0,
+    processes: int = 0,
+) -> Tuple[str, str]:
+    """
+    Extracts the text and title of a PDF held in memory.
+
+    Pages are extracted in order, in parallel across `processes` processes for larger documents, and
+    extraction stops after `max_pages` pages or once `max_chars` characters were extracted.
+    A limit of 0 disables it.
+
+    Returns:
+        Tuple[str, str]: The text of the extracted pages and the title of the document.
+    """
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        page_count = doc.page_count
+        title = ((doc.metadata or {}).get("title") or "").strip()
+    if max_pages > 0:
+        page_count = min(page_count, max_pages)
+
+    executor = get_process_pool(processes) if page_count >= MIN_PARALLEL_PAGES else None
+    if executor is None:
+        pages = _extract_sequentially(data, page_count, max_chars)
+    else:
+        try:
+            pages = _extract_in_parallel(data, page_count, max_chars, executor, processes)
+        except BrokenProcessPool:
+            reset_process_pool(executor)
+            raise
+
+    content = "\n\n".join(page for page in pages if page)
+    if max_chars > 0:
+        content = content[:max_chars]
+    if not title:
+        first_line = content.split("\n", 1)[0].strip()
+        title = first_line if len(first_line) <= 200 else ""
+    return content, title
+
+
+def _extract_sequentially(data: bytes, page_count: int, max_chars: int) -> List[str]:
+    pages = []
+    chars = 0
+    for start in range(0, page_count, PAGES_PER_TASK):
+        for page in extract_pages(data, start, min(start + PAGES_PER_TASK, page_count)):
+            pages.append(page)
+            chars += len(page)
+        if max_chars and chars >= max_chars:
+            break
+    return pages
+
+
+def _extract_in_parallel(
+    data: bytes, page_count: int, max_chars: int, executor: ProcessPoolExecutor, wave_size: int
+) -> List[str]:
+    """
+    Extracts the pages in waves of one task per worker, so that a character budget
+    stops the work after the wave in which it was reached. The document is copied once
+    into shared memory, which the tasks read it from.
+    """
+    ranges = [(start, min(start + PAGES_PER_TASK, page_count)) for start in range(0, page_count, PAGES_PER_TASK)]
+    pages = []
+    chars = 0
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        block.buf[:len(data)] = data
+        for i in range(0, len(ranges), wave_size):
+            futures = [
+                executor.submit(extract_shared_pages, block.name, len(data), start, stop)
+                for start, stop in ranges[i:i + wave_size]
+            ]
+            for future in futures:
+                for page in future.result():
+                    pages.append(page)
+                    chars += len(page)
+            if max_chars and chars >= max_chars:
+                break
+    finally:
+        block.close()
+        block.unlink()
+    return pages
 
 
 class PyMuPDFScraper:
 
+    # Bytes of a PDF downloaded at most, larger documents are skipped
+    max_bytes = DEFAULT_MAX_BYTES
+    # Extraction budget, 0 disables a limit
+    pdf_max_pages = 0
+    pdf_max_chars = 0
+    # Number of processes extracting the pages of a document, 0 extracts in the calling thread
+    parser_processes = 0
+
     def __init__(self, link, session=None):
         self.link = link
         self.session = session
 
-    def scrape(self) -> str:
+    def scrape(self) -> tuple:
         """
-        The `scrape` function uses PyMuPDFLoader to load a document from a given link and returns it as
-        a string.
-        
+        The `scrape` function downloads the PDF at the given link into memory and returns
+        its text content.
+
         Returns:
-          The `scrape` method is returning a string representation of the `doc` object, which is loaded
-        using PyMuPDFLoader from the provided link.
+          The `scrape` method returns a tuple of the text of the pages extracted from the PDF,
+        an empty list of image urls and the title of the document.
+        """
+        page = fetch(self.session or get_sync_session(), self.link, max_bytes=self.max_bytes)
+        if page.kind != "pdf":
+            return "", [], ""
+        return self.parse(page.content)
+
+    async def scrape_async(self) -> tuple:
+        """
+        Async variant of `scrape`, downloading with the shared pooled HTTP client.
+        """
+        headers = {"User-Agent": self.session.headers.get("User-Agent")} if self.session else None
+        page = await fetch_async(self.link, headers=headers, max_bytes=self.max_bytes)
+        if page.kind != "pdf":
+            return "", [], ""
+        return await asyncio.to_thread(self.parse, page.content)
+
+    def parse(self, data: bytes) -> tuple:
+        """
+        Extracts the text and title of a PDF that was already fetched, without writing it to disk.
         """
-        loader = PyMuPDFLoader(self.link)
-        doc = loader.load()
-        return str(doc)
+        content, title = extract_pdf(
+            data,
+            max_pages=self.pdf_max_pages,
+            max_chars=self.pdf_max_chars,
+            processes=self.parser_processes,
+        )
+        return content, [], title
@@ -1,7 +1,4 @@
-from concurrent.futures.thread import ThreadPoolExecutor
-from functools import partial
-
-import requests
+import asyncio
 
 from . import (
     ArxivScraper,
@@ -10,6 +7,10 @@ from . import (
     WebBaseLoaderScraper,
     BrowserScraper
 )
+from .cache import ScrapeCache, get_cache_validators
+from .fetch import DEFAULT_MAX_BYTES
+from ..utils.http_client import get_async_client, get_sync_session
+from ..utils.workers import WorkerPool, get_worker_pool
 
 
 class Scraper:
@@ -17,43 +18,119 @@ class Scraper:
     Scraper class to extract the content from the links
     """
 
-    def __init__(self, urls, user_agent, scraper):
+    def __init__(
+        self,
+        urls,
+        user_agent,
+        scraper,
+        worker_pool: WorkerPool | None = None,
+        cache: ScrapeCache | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        pdf_max_pages: int = 0,
+        pdf_max_chars: int = 0,
+        parser_processes: int = 0,
+    ):
         """
         Initialize the Scraper class.
         Args:
-            urls:
+            urls: The links to scrape
+            user_agent: The User-Agent header sent with every request
+            scraper: The default scraper key, e.g. "bs" or "browser"
+            worker_pool: The pool bounding concurrent scrapes. Defaults to the shared pool
+            cache: Optional scrape cache consulted before fetching a link
+            max_bytes: The maximum number of bytes read from a single response
+            pdf_max_pages: The maximum number of pages extracted from a PDF, 0 for no limit
+            pdf_max_chars: The maximum number of characters extracted from a PDF, 0 for no limit
+            parser_processes: The number of processes parsing documents, 0 parses in threads
         """
         self.urls = urls
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": user_agent})
+        self.session = get_sync_session(user_agent)
         self.scraper = scraper
+        self.worker_pool = worker_pool or get_worker_pool()
+        self.cache = cache
+        # Settings applied to the scrapers that support them
+        self.options = {
+            "max_bytes": max_bytes,
+            "pdf_max_pages": pdf_max_pages,
+            "pdf_max_chars": pdf_max_chars,
+            "parser_processes": parser_processes,
+        }
 
-    def run(self):
+    async def run(self):
         """
-        Extracts the content from the links
+        Extracts the content from the links concurrently without blocking the event loop
         """
-        partial_extract = partial(self.extract_data_from_url, session=self.session)
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            contents = executor.map(partial_extract, self.urls)
+        contents = await asyncio.gather(
+            *(self.extract_data_from_url(url, self.session) for url in self.urls)
+        )
         res = [content for content in contents if content["raw_content"] is not None]
         return res
 
-    def extract_data_from_url(self, link, session):
+    async def extract_data_from_url(self, link, session):
         """
-        Extracts the data from the link
+        Extracts the data from the link. Scrapers exposing a `scrape_async` coroutine are
+        awaited directly, blocking ones run on the worker pool's thread pool.
+        Cached pages are served from the scrape cache, after revalidation if they are stale.
         """
         try:
+            if self.cache:
+                cached = await asyncio.to_thread(self.cache.get, link)
+                if cached and (not cached["stale"] or await self.revalidate(link, cached)):
+                    return {
+                        "url": link,
+                        "raw_content": cached["raw_content"],
+                        "image_urls": cached["image_urls"],
+                        "title": cached["title"],
+                    }
+
             Scraper = self.get_scraper(link)
             scraper = Scraper(link, session)
-            content, image_urls, title = scraper.scrape()
+            for option, value in self.options.items():
+                if hasattr(scraper, option):
+                    setattr(scraper, option, value)
+            async with self.worker_pool.throttle(link):
+                if hasattr(scraper, "scrape_async"):
+                    content, image_urls, title = await scraper.scrape_async()
+                else:
+                    content, image_urls, title = await self.worker_pool.run_in_executor(scraper.scrape)
 
             if len(content) < 100:
                 return {"url": link, "raw_content": None, "image_urls": [], "title": ""}
-            
+
+            if self.cache:
+                validators = getattr(scraper, "validators", None)
+                await asyncio.to_thread(self.cache.set, link, content, image_urls, title, validators)
+
             return {"url": link, "raw_content": content, "image_urls": image_urls, "title": title}
         except Exception as e:
             return {"url": link, "raw_content": None, "image_urls": [], "title": ""}
 
+    async def revalidate(self, link, cached) -> bool:
+        """
+        Checks with a conditional request whether a stale cached page is still current.
+        Returns True (and renews the entry) if the origin answered 304 Not Modified.
+        """
+        headers = {"User-Agent": self.session.headers.get("User-Agent")}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        if len(headers) == 1:
+            return False
+
+        try:
+            async with self.worker_pool.throttle(link):
+                # The body is never read, only the status line matters
+                async with get_async_client().stream("GET", link, headers=headers, timeout=4) as response:
+                    not_modified = response.status_code == 304
+                    validators = get_cache_validators(response.headers)
+        except Exception:
+            return False
+
+        if not_modified:
+            await asyncio.to_thread(self.cache.refresh, link, validators)
+        return not_modified
+
     def get_scraper(self, link):
         """
         The function `get_scraper` determines the appropriate scraper class based on the provided link
@@ -1,15 +1,25 @@
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse, parse_qs
+from urllib.parse import urljoin, urlparse, parse_qs, parse_qsl, urlencode, urlunparse
 import logging
 import hashlib
 
-def get_relevant_images(soup: BeautifulSoup, url: str) -> list:
-    """Extract relevant images from the page"""
+def _find_images(soup) -> list:
+    """Returns the attributes of every img tag with a src, from a BeautifulSoup or lxml tree"""
+    if isinstance(soup, BeautifulSoup):
+        return [img.attrs for img in soup.find_all('img', src=True)]
+    # lxml keeps the class attribute as a string
+    return [
+        {**img.attrib, 'class': img.get('class', '').split()}
+        for img in soup.iter('img') if img.get('src')
+    ]
+
+def get_relevant_images(soup, url: str) -> list:
+    """Extract relevant images from the page, given as a BeautifulSoup or lxml tree"""
     image_urls = []
     
     try:
         # Find all img tags with src attribute
-        all_images = soup.find_all('img', src=True)
+        all_images = _find_images(soup)
         
         for img in all_images:
             img_src = urljoin(url, img['src'])
@@ -60,9 +70,12 @@ def parse_dimension(value: str) -> int:
         print(f"Error parsing dimension value {value}: {e}")
         return None
 
-def extract_title(soup: BeautifulSoup) -> str:
-    """Extract the title from the BeautifulSoup object"""
-    return soup.title.string if soup.title else ""
+def extract_title(soup) -> str:
+    """Extract the title from the BeautifulSoup object or lxml tree"""
+    if isinstance(soup, BeautifulSoup):
+        return soup.title.string if soup.title else ""
+    title = soup.find('.//title')
+    return title.text_content().strip() if title is not None else ""
 
 def get_image_hash(image_url: str) -> str:
     """Calculate a simple hash based on the image filename and essential query parameters"""
@@ -84,3 +97,34 @@ def get_image_hash(image_url: str) -> str:
     except Exception as e:
         logging.error(f"Error calculating image hash for {image_url}: {e}")
         return None
+
+
+TRACKING_QUERY_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid", "ref_src", "igshid"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so that trivially different spellings of the same page compare equal.
+    Lowercases the scheme and host, drops default ports, fragments, tracking parameters
+    and trailing slashes, and sorts the remaining query parameters.
+    """
+    try:
+        parsed = urlparse(url.strip())
+        scheme = parsed.scheme.lower()
+        netloc = parsed.netloc.lower()
+        if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+            netloc = netloc.rsplit(":", 1)[0]
+
+        path = parsed.path or "/"
+        if len(path) > 1:
+            path = path.rstrip("/")
+
+        query = sorted(
+            (key, value)
+            for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in TRACKING_QUERY_PARAMS
+        )
+        return urlunparse((scheme, netloc, path, parsed.params, urlencode(query), ""))
+    except Exception as e:
+        logging.error(f"Error normalizing url {url}: {e}")
+        return url
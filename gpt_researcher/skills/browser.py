@@ -2,6 +2,7 @@ from typing import List, Dict
 
 from ..actions.utils import stream_output
 from ..actions.web_scraping import scrape_urls
+from ..scraper.dedup import ContentDeduplicator
 from ..scraper.utils import get_image_hash  # Add this import
 
 
@@ -29,7 +30,22 @@ class BrowserManager:
                 self.researcher.websocket,
             )
 
-        scraped_content, images = scrape_urls(urls, self.researcher.cfg)
+        scraped_content, images = await scrape_urls(urls, self.researcher.cfg)
+        if self.researcher.cfg.deduplicate_content:
+            # Each batch is ranked against its own sub-query, so pages are only deduplicated within
+            # the batch, a page duplicating one of an earlier sub-query may still be relevant here
+            deduplicator = ContentDeduplicator(threshold=self.researcher.cfg.deduplication_threshold)
+            scraped_content, duplicates = deduplicator.deduplicate(scraped_content)
+            # The duplicates are still sources of the content, so they stay citable
+            for page in scraped_content:
+                self.researcher.visited_urls.update(page.get("merged_urls", []))
+            if duplicates and self.researcher.verbose:
+                await stream_output(
+                    "logs",
+                    "duplicate_content",
+                    f"♻️ Skipped {duplicates} pages duplicating content already gathered",
+                    self.researcher.websocket,
+                )
         self.researcher.add_research_sources(scraped_content)
         new_images = self.select_top_images(images, k=4)  # Select top 2 images
         self.researcher.add_research_images(new_images)
@@ -1,7 +1,7 @@
-import asyncio
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional
 
 from ..context.compression import ContextCompressor, WrittenContentCompressor, VectorstoreCompressor
+from ..context.index import ChunkIndex
 from ..actions.utils import stream_output
 
 
@@ -10,21 +10,30 @@ class ContextManager:
 
     def __init__(self, researcher):
         self.researcher = researcher
+        # Chunks are embedded once per session and shared by every query ranked against them
+        self.chunk_index = ChunkIndex(researcher.memory.get_embeddings())
+        self.written_content_index = ChunkIndex(researcher.memory.get_embeddings())
 
     async def get_similar_content_by_query(self, query, pages):
+        contents = await self.get_similar_content_by_queries([query], pages)
+        return contents[0]
+
+    async def get_similar_content_by_queries(self, queries: List[str], pages) -> List[str]:
+        """Ranks the pages against all queries in a single batch and returns the context of every query."""
         if self.researcher.verbose:
-            await stream_output(
-                "logs",
-                "fetching_query_content",
-                f"📚 Getting relevant content based on query: {query}...",
-                self.researcher.websocket,
-            )
+            for query in queries:
+                await stream_output(
+                    "logs",
+                    "fetching_query_content",
+                    f"📚 Getting relevant content based on query: {query}...",
+                    self.researcher.websocket,
+                )
 
         context_compressor = ContextCompressor(
-            documents=pages, embeddings=self.researcher.memory.get_embeddings()
+            documents=pages, embeddings=self.researcher.memory.get_embeddings(), index=self.chunk_index
         )
-        return await context_compressor.async_get_context(
-            query=query, max_results=10, cost_callback=self.researcher.add_costs
+        return await context_compressor.async_get_contexts(
+            queries=queries, max_results=10, cost_callback=self.researcher.add_costs
         )
         
     async def get_similar_content_by_query_with_vectorstore(self, query, filter): 
@@ -47,12 +56,9 @@ class ContextManager:
     ) -> List[str]:
         all_queries = [current_subtopic] + draft_section_titles
 
-        async def process_query(query: str) -> Set[str]:
-            return set(await self.__get_similar_written_contents_by_query(query, written_contents))
-
-        results = await asyncio.gather(*[process_query(query) for query in all_queries])
-        relevant_contents = set().union(*results)
-        relevant_contents = list(relevant_contents)[:max_results]
+        results = await self.__get_similar_written_contents_by_queries(all_queries, written_contents)
+        relevant_contents = list(dict.fromkeys(content for result in results for content in result))
+        relevant_contents = relevant_contents[:max_results]
 
         if relevant_contents and self.researcher.verbose:
             prettier_contents = "\n".join(relevant_contents)
@@ -62,25 +68,27 @@ class ContextManager:
 
         return relevant_contents
 
-    async def __get_similar_written_contents_by_query(self,
-                                                      query: str,
-                                                      written_contents: List[Dict],
-                                                      similarity_threshold: float = 0.5,
-                                                      max_results: int = 10
-                                                      ) -> List[str]:
+    async def __get_similar_written_contents_by_queries(self,
+                                                        queries: List[str],
+                                                        written_contents: List[Dict],
+                                                        similarity_threshold: float = 0.5,
+                                                        max_results: int = 10
+                                                        ) -> List[List[str]]:
         if self.researcher.verbose:
-            await stream_output(
-                "logs",
-                "fetching_relevant_written_content",
-                f"🔎 Getting relevant written content based on query: {query}...",
-                self.researcher.websocket,
-            )
+            for query in queries:
+                await stream_output(
+                    "logs",
+                    "fetching_relevant_written_content",
+                    f"🔎 Getting relevant written content based on query: {query}...",
+                    self.researcher.websocket,
+                )
 
         written_content_compressor = WrittenContentCompressor(
             documents=written_contents,
             embeddings=self.researcher.memory.get_embeddings(),
-            similarity_threshold=similarity_threshold
+            similarity_threshold=similarity_threshold,
+            index=self.written_content_index,
         )
-        return await written_content_compressor.async_get_context(
-            query=query, max_results=max_results, cost_callback=self.researcher.add_costs
+        return await written_content_compressor.async_get_contexts(
+            queries=queries, max_results=max_results, cost_callback=self.researcher.add_costs
         )
@@ -2,6 +2,9 @@ from typing import Dict, Optional, List
 import json
 from ..config.config import Config
 from ..utils.llm import create_chat_completion
+from ..utils.llm_cache import get_llm_cache
+from ..utils.llm_retry import get_retry_policy
+from ..utils.scheduler import get_scheduler
 from ..prompts import curate_sources as rank_sources_prompt
 from ..actions import stream_output
 
@@ -50,6 +53,9 @@ class SourceCurator:
                 max_tokens=8000,
                 llm_provider=self.researcher.cfg.smart_llm_provider,
                 llm_kwargs=self.researcher.cfg.llm_kwargs,
+                cache=get_llm_cache(self.researcher.cfg),
+                retry=get_retry_policy(self.researcher.cfg),
+                scheduler=get_scheduler(self.researcher.cfg),
                 cost_callback=self.researcher.add_costs,
             )
 
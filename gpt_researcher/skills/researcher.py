@@ -1,10 +1,11 @@
 import asyncio
-import random
 import json
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from ..actions.utils import stream_output
 from ..actions.query_processing import plan_research_outline, get_search_results
+from ..actions.retriever import search_with_retrievers
+from ..retrievers.cache import get_search_cache
 from ..document import DocumentLoader, LangChainDocumentLoader
 from ..utils.enum import ReportSource, ReportType, Tone
 
@@ -14,6 +15,14 @@ class ResearchConductor:
 
     def __init__(self, researcher):
         self.researcher = researcher
+        # Session of the search cache counting the hits and misses of the current research run
+        self.search_cache = None
+
+    def get_search_cache(self):
+        if self.search_cache is None:
+            search_cache = get_search_cache(self.researcher.cfg)
+            self.search_cache = search_cache.session() if search_cache else None
+        return self.search_cache
 
     async def plan_research(self, query):
         await stream_output(
@@ -23,7 +32,9 @@ class ResearchConductor:
             self.researcher.websocket,
         )
 
-        search_results = await get_search_results(query, self.researcher.retrievers[0])
+        search_results = await get_search_results(
+            query, self.researcher.retrievers[0], cache=self.get_search_cache()
+        )
 
         await stream_output(
             "logs",
@@ -48,6 +59,7 @@ class ResearchConductor:
         """
         # Reset visited_urls and source_urls at the start of each research task
         self.researcher.visited_urls.clear()
+        self.search_cache = None
         research_data = []
 
         if self.researcher.verbose:
@@ -121,7 +133,19 @@ class ResearchConductor:
                 "research_step_finalized",
                 f"Finalized research step.\n💸 Total Research Costs: ${self.researcher.get_costs()}",
                 self.researcher.websocket,
+                metadata=self.researcher.get_cost_breakdown(),
             )
+            search_cache = self.get_search_cache()
+            if search_cache:
+                stats = search_cache.stats()
+                await stream_output(
+                    "logs",
+                    "search_cache_stats",
+                    f"🗃️ Search cache: {stats['hits']} hits, {stats['misses']} misses",
+                    self.researcher.websocket,
+                    True,
+                    stats,
+                )
 
         return self.researcher.context
 
@@ -168,14 +192,9 @@ class ResearchConductor:
                 sub_queries,
             )
 
-        # Using asyncio.gather to process the sub_queries asynchronously
-        context = await asyncio.gather(
-            *[
-                self._process_sub_query_with_vectorstore(sub_query, filter)
-                for sub_query in sub_queries
-            ]
+        return await self._process_sub_queries_as_completed(
+            sub_queries, lambda sub_query: self._process_sub_query_with_vectorstore(sub_query, filter)
         )
-        return context
 
     async def _get_context_by_web_search(self, query, scraped_data: list = []):
         """
@@ -199,15 +218,91 @@ class ResearchConductor:
                 sub_queries,
             )
 
-        # Using asyncio.gather to process the sub_queries asynchronously
-        context = await asyncio.gather(
-            *[
-                self._process_sub_query(sub_query, scraped_data)
-                for sub_query in sub_queries
-            ]
+        if scraped_data:
+            # Every sub-query is ranked against the same documents, so they are ranked in one batch
+            context = await self._process_sub_queries(sub_queries, scraped_data)
+            for index, content in enumerate(context):
+                await self._publish_sub_query_context(sub_queries[index], content, index + 1, len(sub_queries))
+            return context
+
+        return await self._process_sub_queries_as_completed(
+            sub_queries, lambda sub_query: self._process_sub_query(sub_query, scraped_data)
         )
+
+    async def _process_sub_queries_as_completed(self, sub_queries: List[str], process):
+        """Processes the sub queries concurrently and publishes the context of each one as soon as it is ready.
+
+        Args:
+            sub_queries (List[str]): The sub-queries generated from the original query
+            process: Coroutine function gathering the context of a single sub query
+
+        Returns:
+            List[str]: The context gathered for every sub query, in sub query order
+        """
+        async def run(index: int, sub_query: str):
+            return index, await process(sub_query)
+
+        tasks = [asyncio.create_task(run(index, sub_query)) for index, sub_query in enumerate(sub_queries)]
+        context = [None] * len(sub_queries)
+        try:
+            for completed, next_result in enumerate(asyncio.as_completed(tasks), start=1):
+                index, content = await next_result
+                context[index] = content
+                await self._publish_sub_query_context(sub_queries[index], content, completed, len(sub_queries))
+        finally:
+            # Do not leave sub queries running if one of them failed
+            for task in tasks:
+                task.cancel()
         return context
 
+    async def _publish_sub_query_context(self, sub_query: str, content, completed: int, total: int):
+        """Streams the context of a finished sub query to the websocket and the researcher's listeners."""
+        if self.researcher.verbose:
+            await stream_output(
+                "logs",
+                "subquery_context_ready",
+                f"✅ Finished research for '{sub_query}' ({completed}/{total})",
+                self.researcher.websocket,
+                True,
+                {"sub_query": sub_query, "completed": completed, "total": total},
+            )
+        await self.researcher.add_sub_query_context(sub_query, content)
+
+    async def _process_sub_queries(self, sub_queries: List[str], scraped_data: list):
+        """Gathers the context of every sub query from the same scraped data at once.
+
+        Args:
+            sub_queries (List[str]): The sub-queries generated from the original query
+            scraped_data (list): Scraped data passed in
+
+        Returns:
+            List[str]: The context gathered for every sub query
+        """
+        if self.researcher.verbose:
+            for sub_query in sub_queries:
+                await stream_output(
+                    "logs",
+                    "running_subquery_research",
+                    f"\n🔍 Running research for '{sub_query}'...",
+                    self.researcher.websocket,
+                )
+
+        contents = await self.researcher.context_manager.get_similar_content_by_queries(sub_queries, scraped_data)
+
+        for sub_query, content in zip(sub_queries, contents):
+            if content and self.researcher.verbose:
+                await stream_output(
+                    "logs", "subquery_context_window", f"📃 {content}", self.researcher.websocket
+                )
+            elif self.researcher.verbose:
+                await stream_output(
+                    "logs",
+                    "subquery_context_not_found",
+                    f"🤷 No content found for '{sub_query}'...",
+                    self.researcher.websocket,
+                )
+        return contents
+
     async def _process_sub_query(self, sub_query: str, scraped_data: list = []):
         """Takes in a sub query and scrapes urls based on it and gathers context.
 
@@ -300,25 +395,17 @@ class ResearchConductor:
         return new_urls
 
     async def _search_relevant_source_urls(self, query):
-        new_search_urls = []
-
-        # Iterate through all retrievers
-        for retriever_class in self.researcher.retrievers:
-            # Instantiate the retriever with the sub-query
-            retriever = retriever_class(query)
-
-            # Perform the search using the current retriever
-            search_results = await asyncio.to_thread(
-                retriever.search, max_results=self.researcher.cfg.max_search_results_per_query
-            )
-
-            # Collect new URLs from search results
-            search_urls = [url.get("href") for url in search_results]
-            new_search_urls.extend(search_urls)
+        # Search all retrievers concurrently, results are deduplicated and interleaved by rank
+        search_results = await search_with_retrievers(
+            query,
+            self.researcher.retrievers,
+            max_results=self.researcher.cfg.max_search_results_per_query,
+            timeout=self.researcher.cfg.retriever_timeout,
+            cache=self.get_search_cache(),
+        )
 
         # Get unique URLs
-        new_search_urls = await self._get_new_urls(new_search_urls)
-        random.shuffle(new_search_urls)
+        new_search_urls = await self._get_new_urls([result.get("href") for result in search_results])
 
         return new_search_urls
 
@@ -122,14 +122,21 @@ class ReportGenerator:
 
         return conclusion
 
-    async def write_introduction(self):
-        """Write the introduction section of the report."""
+    async def write_introduction(self, websocket=None):
+        """
+        Write the introduction section of the report.
+
+        Args:
+            websocket (Optional): Where the introduction is streamed to, the researcher's websocket by default.
+        """
+        if websocket is None:
+            websocket = self.researcher.websocket
         if self.researcher.verbose:
             await stream_output(
                 "logs",
                 "writing_introduction",
                 f"✍️ Writing introduction for '{self.researcher.query}'...",
-                self.researcher.websocket,
+                websocket,
             )
 
         introduction = await write_report_introduction(
@@ -137,7 +144,7 @@ class ReportGenerator:
             context=self.researcher.context,
             agent_role_prompt=self.researcher.cfg.agent_role or self.researcher.role,
             config=self.researcher.cfg,
-            websocket=self.researcher.websocket,
+            websocket=websocket,
             cost_callback=self.researcher.add_costs,
         )
 
@@ -146,7 +153,7 @@ class ReportGenerator:
                 "logs",
                 "introduction_written",
                 f"📝 Introduction written for '{self.researcher.query}'",
-                self.researcher.websocket,
+                websocket,
             )
 
         return introduction
@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .logger import get_formatted_logger
+
+logger = get_formatted_logger()
+
+
+class SQLiteCache:
+    """
+    A persistent key-value cache backed by a single SQLite file.
+
+    Every entry has an optional expiry time and a last access time. Expired entries are
+    kept until evicted so that callers can still revalidate them, and once the stored
+    values grow past `max_size` bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, max_size: int = 512 * 1024 * 1024):
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed_at ON entries (accessed_at)")
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the entry stored under `key`, including expired ones, as a dict with the
+        `value`, `created_at`, `expires_at` and `expired` keys.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        value, created_at, expires_at = row
+        return {
+            "value": value,
+            "created_at": created_at,
+            "expires_at": expires_at,
+            "expired": expires_at is not None and expires_at <= now,
+        }
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the value stored under `key`, or None when it is missing or expired."""
+        entry = self.get_entry(key)
+        if entry is None or entry["expired"]:
+            return None
+        return entry["value"]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Stores `value` under `key`, expiring after `ttl` seconds if given."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, len(value), now, expires_at, now),
+            )
+            self._evict()
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """Returns the unexpired values stored under any of `keys`, keyed by their key."""
+        now = time.time()
+        found = {}
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({placeholders}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    (*batch, now),
+                ).fetchall()
+                found.update(rows)
+                self._conn.executemany(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", [(now, key) for key, _ in rows]
+                )
+        return found
+
+    def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        """Stores all `items` in a single transaction."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, value, len(value), now, expires_at, now) for key, value in items.items()],
+            )
+            self._evict()
+
+    def touch(self, key: str, ttl: Optional[float] = None) -> None:
+        """Renews the expiry of an existing entry, e.g. after a successful revalidation."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET expires_at = ?, accessed_at = ? WHERE key = ?", (expires_at, now, key)
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of entries and their total size in bytes."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": entries, "size": size}
+
+    def _evict(self) -> None:
+        """Evicts least recently used entries until the cache is back under 90% of its size limit."""
+        (total_size,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total_size <= self.max_size:
+            return
+
+        target = self.max_size * 0.9
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total_size <= target:
+                break
+            evicted.append((key,))
+            total_size -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} entries from cache {self.path}")
+
+
+class MemoryCache:
+    """
+    An in-process key-value cache with the same interface as `SQLiteCache`.
+
+    Entries expire after their TTL and the least recently used ones are evicted once
+    more than `max_entries` are stored. Nothing survives the process.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the value stored under `key`, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Stores `value` under `key`, expiring after `ttl` seconds if given."""
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of entries and their total size in bytes."""
+        with self._lock:
+            return {"entries": len(self._entries), "size": sum(len(v) for v, _ in self._entries.values())}
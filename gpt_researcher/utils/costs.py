@@ -1,25 +1,73 @@
-import tiktoken
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Union
+
+from .tokens import ENCODING_NAME, count_tokens_batch, get_encoding_name_for_model
 
 # Per OpenAI Pricing Page: https://openai.com/api/pricing/
-ENCODING_MODEL = "o200k_base"
+ENCODING_MODEL = ENCODING_NAME
 INPUT_COST_PER_TOKEN = 0.000005
 OUTPUT_COST_PER_TOKEN = 0.000015
 IMAGE_INFERENCE_COST = 0.003825
 EMBEDDING_COST = 0.02 / 1000000 # Assumes new ada-3-small
+# Tokens added by the chat format around every message
+TOKENS_PER_MESSAGE = 4
+
+# The phase of the research that costs incurred in the current task are accounted to
+_cost_phase: ContextVar[str] = ContextVar("cost_phase", default="other")
+
+
+@contextmanager
+def cost_phase(phase: str):
+    """Accounts the costs incurred within the block, including in tasks it starts, to `phase`."""
+    token = _cost_phase.set(phase)
+    try:
+        yield
+    finally:
+        _cost_phase.reset(token)
+
+
+def get_cost_phase() -> str:
+    return _cost_phase.get()
+
+
+def report_cost(cost_callback: Callable, cost: float, model: Optional[str] = None) -> None:
+    """
+    Calls `cost_callback` with the cost, and with the model as `model` keyword argument if the
+    callback accepts one, so that callbacks only taking the cost keep working.
+    """
+    try:
+        parameters = inspect.signature(cost_callback).parameters.values()
+    except (TypeError, ValueError):
+        parameters = []
+    if model is not None and any(p.name == "model" or p.kind is p.VAR_KEYWORD for p in parameters):
+        cost_callback(cost, model=model)
+    else:
+        cost_callback(cost)
+
+
+def count_message_tokens(messages: Union[str, List[dict]]) -> int:
+    """
+    Returns the number of input tokens of a prompt. Messages are counted one by one so that
+    a system prompt or context repeated across calls is only tokenized once.
+    """
+    if isinstance(messages, str):
+        return count_tokens_batch([messages], ENCODING_MODEL)[0]
+    contents = [str(message.get("content", "")) for message in messages]
+    return sum(count_tokens_batch(contents, ENCODING_MODEL)) + TOKENS_PER_MESSAGE * len(contents)
 
 
 # Cost estimation is via OpenAI libraries and models. May vary for other models
-def estimate_llm_cost(input_content: str, output_content: str) -> float:
-    encoding = tiktoken.get_encoding(ENCODING_MODEL)
-    input_tokens = encoding.encode(input_content)
-    output_tokens = encoding.encode(output_content)
-    input_costs = len(input_tokens) * INPUT_COST_PER_TOKEN
-    output_costs = len(output_tokens) * OUTPUT_COST_PER_TOKEN
+def estimate_llm_cost(input_content: Union[str, List[dict]], output_content: str) -> float:
+    input_tokens = count_message_tokens(input_content)
+    output_tokens = count_tokens_batch([output_content], ENCODING_MODEL)[0]
+    input_costs = input_tokens * INPUT_COST_PER_TOKEN
+    output_costs = output_tokens * OUTPUT_COST_PER_TOKEN
     return input_costs + output_costs
 
 
 def estimate_embedding_cost(model, docs):
-    encoding = tiktoken.encoding_for_model(model)
-    total_tokens = sum(len(encoding.encode(str(doc))) for doc in docs)
+    encoding_name = get_encoding_name_for_model(model)
+    total_tokens = sum(count_tokens_batch([str(doc) for doc in docs], encoding_name))
     return total_tokens * EMBEDDING_COST
-
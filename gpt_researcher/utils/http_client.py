@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = 10
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+
+_async_clients = weakref.WeakKeyDictionary()
+_sync_sessions = {}
+_sync_lock = threading.Lock()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled async HTTP client shared by everything running on the current
+    event loop. Connections are kept alive between requests, so repeated calls to the
+    same host skip the TCP and TLS handshakes.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client() -> None:
+    """Closes the pooled client of the current event loop, if any."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def get_sync_session(user_agent: str | None = None) -> requests.Session:
+    """
+    Returns a pooled requests session shared by the blocking scrapers. Sessions are
+    keyed by user agent since the header is set on the session itself.
+    """
+    with _sync_lock:
+        session = _sync_sessions.get(user_agent)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_KEEPALIVE_CONNECTIONS, pool_maxsize=MAX_CONNECTIONS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if user_agent:
+                session.headers.update({"User-Agent": user_agent})
+            _sync_sessions[user_agent] = session
+        return session
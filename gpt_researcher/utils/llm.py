@@ -1,8 +1,10 @@
 # libraries
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import time
 from typing import Optional, Any, Dict
 
 from colorama import Fore, Style
@@ -10,13 +12,18 @@ from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import PromptTemplate
 
 from ..prompts import generate_subtopics_prompt
-from .costs import estimate_llm_cost
+from .costs import count_message_tokens, estimate_llm_cost, report_cost
+from .llm_cache import LLMCache
+from .llm_retry import RetryPolicy, get_hedge_delay, hedged, is_retryable, record_latency
+from .scheduler import Scheduler, get_scheduler
+from .tokens import count_tokens
 from .validators import Subtopics
 
 
 def get_llm(llm_provider, **kwargs):
-    from gpt_researcher.llm_provider import GenericLLMProvider
-    return GenericLLMProvider.from_provider(llm_provider, **kwargs)
+    """Returns the shared client of the provider for the given model and parameters, see `get_llm_client`."""
+    from gpt_researcher.llm_provider import get_llm_client
+    return get_llm_client(llm_provider, **kwargs)
 
 
 async def create_chat_completion(
@@ -28,7 +35,11 @@ async def create_chat_completion(
         stream: Optional[bool] = False,
         websocket: Any | None = None,
         llm_kwargs: Dict[str, Any] | None = None,
-        cost_callback: callable = None
+        cost_callback: callable = None,
+        cache: LLMCache | None = None,
+        bypass_cache: bool = False,
+        retry: RetryPolicy | None = None,
+        scheduler: Scheduler | None = None,
 ) -> str:
     """Create a chat completion using the OpenAI API
     Args:
@@ -39,7 +50,12 @@ async def create_chat_completion(
         stream (bool, optional): Whether to stream the response. Defaults to False.
         llm_provider (str, optional): The LLM Provider to use.
         webocket (WebSocket): The websocket used in the currect request,
-        cost_callback: Callback function for updating cost
+        cost_callback: Callback function for updating cost, also given the `model` if it accepts that argument
+        cache (LLMCache, optional): Cache of responses, see `get_llm_cache`. Cached responses cost nothing.
+            Calls at a temperature above the cache's `max_temperature` are not cached.
+        bypass_cache (bool, optional): Whether to call the LLM even if the response is cached. Defaults to False.
+        retry (RetryPolicy, optional): How failed calls are retried, see `get_retry_policy`. Defaults to `RetryPolicy()`.
+        scheduler (Scheduler, optional): Admits the request within the limits of the provider, see `get_scheduler`.
     Returns:
         str: The response from the chat completion
     """
@@ -50,25 +66,121 @@ async def create_chat_completion(
         raise ValueError(
             f"Max tokens cannot be more than 16,000, but got {max_tokens}")
 
+    cache_key = None
+    if cache is not None and cache.is_cacheable(temperature):
+        cache_key = cache.get_key(llm_provider, model, messages, temperature, max_tokens, llm_kwargs)
+        # The on-disk cache does file I/O, keep it off the event loop
+        cached = None if bypass_cache else await asyncio.to_thread(cache.get, cache_key, model)
+        if cached is not None:
+            if stream:
+                await _send_cached_response(cached, websocket)
+            return cached
+
+    retry = retry or RetryPolicy()
+    scheduler = scheduler or get_scheduler()
+    output = _StreamOutput(websocket) if stream else websocket
+    try:
+        response = await _call_with_retries(
+            messages, model, temperature, max_tokens, llm_provider, stream, output, llm_kwargs, retry, scheduler
+        )
+    except Exception as e:
+        # A response partly streamed to the client can't be taken back, so it is not tried again
+        if not retry.fallback_model or retry.fallback_model == model or (stream and output.sent):
+            logging.error(f"Failed to get response from {llm_provider} API: {e}")
+            raise
+        logging.warning(f"Failed to get response from {model} ({e}), falling back to {retry.fallback_model}")
+        model, llm_provider, cache_key = retry.fallback_model, retry.fallback_provider, None
+        response = await _call_with_retries(
+            messages, model, temperature, max_tokens, llm_provider, stream, output, llm_kwargs,
+            RetryPolicy(max_retries=0, deadline=retry.deadline), scheduler,
+        )
+
+    if cost_callback:
+        llm_costs = estimate_llm_cost(messages, response)
+        report_cost(cost_callback, llm_costs, model)
+
+    # Responses of the fallback model are not cached for the original model
+    if cache_key is not None:
+        await asyncio.to_thread(cache.set, cache_key, response)
+    return response
+
+
+async def _call_with_retries(
+        messages: list,
+        model: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        llm_provider: Optional[str],
+        stream: Optional[bool],
+        websocket: Any | None,
+        llm_kwargs: Dict[str, Any] | None,
+        retry: RetryPolicy,
+        scheduler: Scheduler,
+) -> str:
     # Get the provider from supported providers
     provider = get_llm(llm_provider, model=model, temperature=temperature,
                        max_tokens=max_tokens, **(llm_kwargs or {}))
-
-    response = ""
-    # create response
-    for _ in range(10):  # maximum of 10 attempts
-        response = await provider.get_chat_response(
-            messages, stream, websocket
-        )
-
-        if cost_callback:
-            llm_costs = estimate_llm_cost(str(messages), response)
-            cost_callback(llm_costs)
-
-        return response
-
-    logging.error(f"Failed to get response from {llm_provider} API")
-    raise RuntimeError(f"Failed to get response from {llm_provider} API")
+    input_tokens = count_message_tokens(messages)
+
+    async def request() -> str:
+        # Providers count the token limit of the response against their tokens per minute
+        async with scheduler.limit("llm", llm_provider, tokens=input_tokens + (max_tokens or 0)) as reservation:
+            response = await provider.get_chat_response(messages, stream, websocket)
+            reservation.settle(input_tokens + count_tokens(response))
+            return response
+    # Streamed responses are already being sent to the client, so they are never duplicated
+    hedge_delay = get_hedge_delay(model) if retry.hedge and not stream else None
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + retry.deadline if retry.deadline else None
+    for attempt in range(retry.max_retries + 1):
+        remaining = deadline - loop.time() if deadline is not None else None
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                hedged(request, hedge_delay),
+                timeout=remaining,
+            )
+        except Exception as e:
+            if deadline is not None and loop.time() >= deadline:
+                raise TimeoutError(f"{model} did not respond within {retry.deadline}s") from e
+            if not is_retryable(e) or attempt == retry.max_retries:
+                raise
+            # Retrying a partly streamed response would send its beginning to the client twice
+            if isinstance(websocket, _StreamOutput) and websocket.sent:
+                raise
+            delay = retry.get_retry_delay(e, attempt)
+            if deadline is not None and loop.time() + delay >= deadline:
+                raise
+            logging.warning(f"{model} request failed ({e!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        else:
+            if not stream:
+                record_latency(model, time.monotonic() - started)
+            return response
+
+
+class _StreamOutput:
+    """Where a streamed response is sent, remembers whether any of it was sent already."""
+
+    def __init__(self, websocket: Any | None = None):
+        self.websocket = websocket
+        self.sent = False
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        self.sent = True
+        if self.websocket is not None:
+            await self.websocket.send_json(data)
+        else:
+            print(f"{Fore.GREEN}{data.get('output')}{Style.RESET_ALL}")
+
+
+async def _send_cached_response(response: str, websocket: Any | None = None) -> None:
+    """Sends a cached response where a streamed response would have gone."""
+    if websocket is not None:
+        await websocket.send_json({"type": "report", "output": response})
+    else:
+        print(f"{Fore.GREEN}{response}{Style.RESET_ALL}")
 
 
 async def construct_subtopics(task: str, data: str, config, subtopics: list = []) -> list:
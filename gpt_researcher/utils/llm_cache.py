@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from .cache import MemoryCache, SQLiteCache
+
+_llm_stores: Dict[tuple, Optional[Union[MemoryCache, SQLiteCache]]] = {}
+_llm_caches: Dict[tuple, "LLMCache"] = {}
+
+
+def _serialize_message(message: Any) -> Any:
+    """Returns a JSON-serializable form of a chat message, either an OpenAI style dict or a LangChain message."""
+    if isinstance(message, dict):
+        return message
+    if hasattr(message, "content"):
+        return {"role": getattr(message, "type", type(message).__name__), "content": message.content}
+    return str(message)
+
+
+class LLMCache:
+    """
+    Cache of chat completions, keyed by the hash of the provider, the model, the messages,
+    the temperature, the token limit and the provider kwargs.
+
+    Entries live for `ttl` seconds. With `bypass` set the cache is not read, but new
+    responses are still stored, so that a run can refresh the cached responses.
+    Only calls at a temperature of at most `max_temperature` are cached, responses sampled
+    at a higher temperature are meant to differ between calls.
+    Hits and misses are counted per model.
+    """
+
+    def __init__(
+        self,
+        backend: Union[MemoryCache, SQLiteCache],
+        ttl: int = 604800,
+        bypass: bool = False,
+        max_temperature: float = 0.5,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.bypass = bypass
+        self.max_temperature = max_temperature
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def get_key(
+        llm_provider: Optional[str],
+        model: str,
+        messages: List[Any],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        llm_kwargs: Optional[Dict[str, Any]],
+    ) -> str:
+        key = json.dumps(
+            [llm_provider, model, [_serialize_message(m) for m in messages], temperature, max_tokens, llm_kwargs or {}],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def is_cacheable(self, temperature: Optional[float]) -> bool:
+        """Whether responses at `temperature` are cached. Without a temperature the provider's default applies."""
+        return temperature is not None and temperature <= self.max_temperature
+
+    def _count(self, model: str, hit: bool) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(model, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def get(self, key: str, model: str) -> Optional[str]:
+        """Returns the cached response, or None on a miss or when the cache is bypassed."""
+        if self.bypass:
+            return None
+        value = self.backend.get(key)
+        self._count(model, value is not None)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, response: str) -> None:
+        if not response:
+            return
+        self.backend.set(key, response.encode(), ttl=self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the overall and per model hit/miss counts."""
+        with self._lock:
+            models = {name: dict(counts) for name, counts in self._stats.items()}
+        hits = sum(counts["hits"] for counts in models.values())
+        misses = sum(counts["misses"] for counts in models.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "models": models,
+        }
+
+
+def get_llm_cache(cfg) -> Optional[LLMCache]:
+    """
+    Returns the process-wide LLM response cache configured by `cfg`, or None if LLM
+    response caching is disabled or the on-disk cache could not be opened.
+    """
+    backend = (getattr(cfg, "llm_cache", None) or "none").lower() if cfg else "none"
+    if backend not in ("memory", "disk"):
+        return None
+
+    path = os.path.join(os.path.expanduser(cfg.cache_dir), "llm_cache.sqlite")
+    store_key = (backend, path if backend == "disk" else None)
+    if store_key not in _llm_stores:
+        try:
+            if backend == "disk":
+                _llm_stores[store_key] = SQLiteCache(path, max_size=cfg.llm_cache_max_size * 1024 * 1024)
+            else:
+                _llm_stores[store_key] = MemoryCache(max_entries=cfg.llm_cache_max_entries)
+        except Exception as e:
+            print(f"Failed to open LLM cache at {path}: {e}. Calling the LLM without cache.")
+            _llm_stores[store_key] = None
+    if _llm_stores[store_key] is None:
+        return None
+
+    # Bypassing runs share the store, so the responses they refresh are used by later runs
+    key = store_key + (cfg.llm_cache_ttl, bool(cfg.llm_cache_bypass), cfg.llm_cache_max_temperature)
+    if key not in _llm_caches:
+        _llm_caches[key] = LLMCache(
+            _llm_stores[store_key],
+            ttl=cfg.llm_cache_ttl,
+            bypass=bool(cfg.llm_cache_bypass),
+            max_temperature=cfg.llm_cache_max_temperature,
+        )
+    return _llm_caches[key]
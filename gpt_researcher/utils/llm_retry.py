@@ -0,0 +1,159 @@
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+# Statuses of provider errors that are worth retrying, 529 is Anthropic's "overloaded"
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+# Names of the exceptions provider SDKs raise for network errors and timeouts
+RETRY_ERROR_NAMES = ("Timeout", "Connection", "RateLimit", "Overloaded", "ServiceUnavailable", "InternalServer")
+
+# Latencies remembered per model to estimate their p95
+LATENCY_WINDOW = 100
+# Latencies observed before requests of a model are hedged
+MIN_LATENCY_SAMPLES = 20
+# Requests are never hedged sooner than this many seconds
+MIN_HEDGE_DELAY = 1.0
+
+_latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+_latencies_lock = threading.Lock()
+
+
+class RetryPolicy:
+    """
+    How `create_chat_completion` retries failed LLM calls.
+
+    Rate limits, server errors, timeouts and connection errors are retried up to
+    `max_retries` times with exponential backoff and jitter, or after the delay the provider
+    asked for in its Retry-After header. Streamed calls are only retried while nothing has
+    been sent to the client yet. All attempts of a call have to finish within
+    `deadline` seconds, 0 disables the deadline. With `hedge` set, a non-streamed request
+    still running after the p95 latency of its model is duplicated and the first response
+    wins. If every attempt failed, the call is tried once more with `fallback_model` if given.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff_factor: float = 1.0,
+        deadline: float = 600,
+        hedge: bool = False,
+        fallback_provider: Optional[str] = None,
+        fallback_model: Optional[str] = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.deadline = deadline
+        self.hedge = hedge
+        self.fallback_provider = fallback_provider
+        self.fallback_model = fallback_model
+
+    def get_retry_delay(self, error: Exception, attempt: int) -> float:
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return retry_after
+        return self.backoff_factor * 2 ** attempt + random.uniform(0, self.backoff_factor)
+
+
+def get_retry_policy(cfg) -> RetryPolicy:
+    """Returns the retry policy configured by `cfg`, falling back to the fast LLM if enabled."""
+    if not cfg:
+        return RetryPolicy()
+    fallback = getattr(cfg, "llm_fallback_to_fast", False)
+    return RetryPolicy(
+        max_retries=cfg.llm_max_retries,
+        backoff_factor=cfg.llm_backoff_factor,
+        deadline=cfg.llm_deadline,
+        hedge=cfg.llm_hedge,
+        fallback_provider=cfg.fast_llm_provider if fallback else None,
+        fallback_model=cfg.fast_llm_model if fallback else None,
+    )
+
+
+def _get_status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an error raised by a provider SDK is transient."""
+    status = _get_status_code(error)
+    if status is not None:
+        return status in RETRY_STATUSES
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return any(name in type(error).__name__ for name in RETRY_ERROR_NAMES)
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """The number of seconds the provider asked us to wait before retrying, if it did."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def record_latency(model: str, seconds: float) -> None:
+    with _latencies_lock:
+        _latencies[model].append(seconds)
+
+
+def get_hedge_delay(model: str) -> Optional[float]:
+    """The p95 latency of the model, None until enough requests were observed."""
+    with _latencies_lock:
+        latencies = sorted(_latencies[model])
+    if len(latencies) < MIN_LATENCY_SAMPLES:
+        return None
+    return max(MIN_HEDGE_DELAY, latencies[int(len(latencies) * 0.95) - 1])
+
+
+async def hedged(call: Callable[[], Awaitable[Any]], delay: Optional[float]) -> Any:
+    """
+    Awaits `call()`, and if it did not finish after `delay` seconds, a second `call()`
+    alongside it. Returns the first successful result and cancels the other request.
+    """
+    first = asyncio.ensure_future(call())
+    if delay is None:
+        return await first
+
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # Also cancels the requests when the caller gives up, e.g. at its deadline
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,325 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """Priority classes of LLM and embedding requests, lower values are served first."""
+    INTERACTIVE = 0
+    RESEARCH = 1
+    BACKGROUND = 2
+
+
+# The priority of the requests made in the current task
+_priority: ContextVar[Priority] = ContextVar("priority", default=Priority.RESEARCH)
+
+
+@contextmanager
+def priority(value: Priority):
+    """Schedules the requests made within the block, including in tasks and threads it starts, with `value`."""
+    token = _priority.set(value)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def get_priority() -> Priority:
+    return _priority.get()
+
+
+def in_event_loop() -> bool:
+    """Whether the current thread is running an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class TokenBucket:
+    """Allows `per_minute` units per minute, refilled continuously. 0 disables the limit."""
+
+    def __init__(self, per_minute: int = 0):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._rate = per_minute / 60
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def get_wait(self, amount: float) -> float:
+        """Seconds until `amount` units are available, requests larger than the bucket wait for a full one."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self._rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        if self.capacity:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    def __init__(self, priority: Priority, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.granted = False
+        self.abandoned = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._future: Optional[asyncio.Future] = None
+        self._event: Optional[threading.Event] = None
+
+    def grant(self) -> None:
+        self.granted = True
+        if self._event is not None:
+            self._event.set()
+        elif self._future is not None:
+            self._loop.call_soon_threadsafe(lambda: self._future.done() or self._future.set_result(None))
+
+
+class Reservation:
+    """A granted request slot. `tokens` is the number of tokens reserved from the TPM budget."""
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.used_tokens: Optional[int] = None
+
+    def settle(self, used_tokens: int) -> None:
+        """Records the tokens the request really used, the difference is returned to the budget on release."""
+        self.used_tokens = used_tokens
+
+
+class RateLimiter:
+    """
+    Admits the requests to one provider: at most `max_concurrency` at once, `rpm` requests
+    and `tpm` tokens per minute. Waiting requests are admitted by priority and then in
+    arrival order, so that a request never overtakes an earlier one of its class.
+
+    Works across event loops and threads, so blocking callers like the LangChain
+    compressors share the budget with the async ones.
+
+    `saturated` counts the requests that had to wait for the concurrency limit, the first
+    of them logs a warning naming the limiter.
+    """
+
+    def __init__(self, max_concurrency: int = 16, rpm: int = 0, tpm: int = 0, name: str = ""):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        # Re-admits the waiting requests once the buckets have refilled
+        self._timer: Optional[threading.Timer] = None
+        self._timer_due = 0.0
+        self._stats = {"requests": 0, "throttled": 0, "saturated": 0, "peak_in_flight": 0, "peak_waiting": 0}
+
+    def _admit(self) -> Optional[float]:
+        """
+        Admits waiting requests while the limits allow it. Returns the seconds until the
+        next one can be admitted by the refill of the buckets, None if it waits for a slot.
+        Called with the lock held.
+        """
+        while self._waiters:
+            waiter = self._waiters[0][2]
+            if waiter.abandoned:
+                heapq.heappop(self._waiters)
+                continue
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                return None
+            wait = max(self._requests.get_wait(1), self._tokens.get_wait(waiter.tokens))
+            if wait > 0:
+                # Waiters blocked on the concurrency limit don't poll, so the refill has to wake them
+                self._schedule_admission(wait)
+                return wait
+            heapq.heappop(self._waiters)
+            self._requests.take(1)
+            self._tokens.take(waiter.tokens)
+            self._in_flight += 1
+            self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._in_flight)
+            waiter.grant()
+        return None
+
+    def _schedule_admission(self, wait: float) -> None:
+        """Runs `_admit` again after `wait` seconds, unless it already runs sooner. Called with the lock held."""
+        due = time.monotonic() + wait
+        if self._timer is not None:
+            if self._timer_due <= due:
+                return
+            self._timer.cancel()
+        self._timer = threading.Timer(wait, self._on_timer)
+        self._timer.daemon = True
+        self._timer_due = due
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            if self._timer is threading.current_thread():
+                self._timer = None
+            self._admit()
+
+    def _enqueue(self, waiter: _Waiter) -> Optional[float]:
+        with self._lock:
+            heapq.heappush(self._waiters, (waiter.priority, next(self._sequence), waiter))
+            self._stats["requests"] += 1
+            wait = self._admit()
+            if not waiter.granted:
+                self._stats["throttled"] += 1
+                if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                    self._stats["saturated"] += 1
+                    if self._stats["saturated"] == 1:
+                        logging.warning(
+                            f"{self.name or 'Request'} concurrency limit of {self.max_concurrency} reached, "
+                            f"requests are waiting for a free slot"
+                        )
+                self._stats["peak_waiting"] = max(self._stats["peak_waiting"], len(self._waiters))
+            return wait
+
+    def _retry_admission(self) -> Optional[float]:
+        with self._lock:
+            return self._admit()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                self._in_flight -= 1
+            waiter.abandoned = True
+            self._admit()
+
+    def _release(self, reservation: Reservation) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if reservation.used_tokens is not None and reservation.used_tokens < reservation.tokens:
+                self._tokens.give_back(reservation.tokens - reservation.used_tokens)
+            self._admit()
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0, priority: Optional[Priority] = None):
+        """Holds a request slot for the duration of the block, waiting for one if needed."""
+        waiter = _Waiter(priority if priority is not None else get_priority(), tokens)
+        waiter._loop = asyncio.get_running_loop()
+        waiter._future = waiter._loop.create_future()
+        wait = self._enqueue(waiter)
+        try:
+            while not waiter.granted:
+                await asyncio.wait({waiter._future}, timeout=wait)
+                if not waiter.granted:
+                    wait = self._retry_admission()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+        reservation = Reservation(tokens)
+        try:
+            yield reservation
+        finally:
+            self._release(reservation)
+
+    @contextmanager
+    def acquire_sync(self, tokens: int = 0, priority: Optional[Priority] = None):
+        """
+        Blocking variant of `acquire` for calls made from worker threads. Raises RuntimeError
+        in a thread running an event loop, where waiting would block the async holders of the
+        slots from ever releasing them.
+        """
+        if in_event_loop():
+            raise RuntimeError("acquire_sync would block the running event loop, use acquire instead")
+        waiter = _Waiter(priority if priority is not None else get_priority(), tokens)
+        waiter._event = threading.Event()
+        wait = self._enqueue(waiter)
+        try:
+            while not waiter.granted:
+                waiter._event.wait(timeout=wait)
+                if not waiter.granted:
+                    wait = self._retry_admission()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+        reservation = Reservation(tokens)
+        try:
+            yield reservation
+        finally:
+            self._release(reservation)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "in_flight": self._in_flight, "waiting": len(self._waiters)}
+
+
+class Scheduler:
+    """
+    Process-wide admission control for LLM and embedding requests, with one `RateLimiter`
+    per kind of request and provider, so that concurrent research sessions, sub-queries
+    and agents share the rate limits of each provider instead of running into them.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[int, int, int]]):
+        # Per kind of request: the concurrency, requests per minute and tokens per minute
+        self.limits = limits
+        self._limiters: Dict[Tuple[str, str], RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get_limiter(self, kind: str, provider: Optional[str]) -> RateLimiter:
+        key = (kind, provider or "")
+        with self._lock:
+            if key not in self._limiters:
+                self._limiters[key] = RateLimiter(*self.limits[kind], name=f"{kind}:{provider or ''}")
+            return self._limiters[key]
+
+    def limit(self, kind: str, provider: Optional[str], tokens: int = 0, priority: Optional[Priority] = None):
+        """Async context manager holding a slot of `provider` for a request of `kind` ("llm" or "embedding")."""
+        return self.get_limiter(kind, provider).acquire(tokens, priority)
+
+    def limit_sync(self, kind: str, provider: Optional[str], tokens: int = 0, priority: Optional[Priority] = None):
+        return self.get_limiter(kind, provider).acquire_sync(tokens, priority)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the admission statistics per kind of request and provider."""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {f"{kind}:{provider}": limiter.stats() for (kind, provider), limiter in limiters.items()}
+
+
+_schedulers: Dict[tuple, Scheduler] = {}
+_schedulers_lock = threading.Lock()
+
+DEFAULT_LIMITS = {"llm": (16, 0, 0), "embedding": (8, 0, 0)}
+
+
+def get_scheduler(cfg=None) -> Scheduler:
+    """
+    Returns the process-wide scheduler for the limits configured by `cfg`, or for the
+    default limits, so that every research session with the same limits shares it.
+    """
+    if cfg:
+        limits = {
+            "llm": (cfg.llm_max_concurrency, cfg.llm_rpm, cfg.llm_tpm),
+            "embedding": (cfg.embedding_max_concurrency, cfg.embedding_rpm, cfg.embedding_tpm),
+        }
+    else:
+        limits = DEFAULT_LIMITS
+    key = tuple(sorted(limits.items()))
+    with _schedulers_lock:
+        if key not in _schedulers:
+            _schedulers[key] = Scheduler(limits)
+        return _schedulers[key]
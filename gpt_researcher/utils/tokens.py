@@ -0,0 +1,105 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import tiktoken
+
+from .logger import get_formatted_logger
+
+logger = get_formatted_logger()
+
+ENCODING_NAME = "o200k_base"
+# Average number of characters per token, used when no encoding can be loaded
+CHARS_PER_TOKEN = 4
+
+# Number of token counts remembered, keyed by the hash of the counted text
+TOKEN_COUNT_CACHE_SIZE = 100000
+
+_encodings: Dict[str, Optional[tiktoken.Encoding]] = {}
+_encodings_lock = threading.Lock()
+_token_counts: "OrderedDict[bytes, int]" = OrderedDict()
+_token_counts_lock = threading.Lock()
+
+
+def get_encoding(name: str = ENCODING_NAME) -> Optional[tiktoken.Encoding]:
+    """
+    Returns the tiktoken encoding called `name`, loading it once per process. Returns None
+    if it cannot be loaded, e.g. because its definition cannot be downloaded, in which case
+    token counts are estimated from the length of the text.
+    """
+    encoding = _encodings.get(name)
+    if encoding is not None or name in _encodings:
+        return encoding
+    with _encodings_lock:
+        if name not in _encodings:
+            try:
+                _encodings[name] = tiktoken.get_encoding(name)
+            except Exception as e:
+                logger.warning(f"Could not load tiktoken encoding {name}, estimating token counts instead: {e}")
+                _encodings[name] = None
+        return _encodings[name]
+
+
+def get_encoding_name_for_model(model: str) -> str:
+    """Returns the name of the encoding used by an OpenAI model, `ENCODING_NAME` for unknown models."""
+    try:
+        return tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        return ENCODING_NAME
+
+
+def _key(text: str, encoding_name: str) -> bytes:
+    return hashlib.blake2b(f"{encoding_name}\0{text}".encode(), digest_size=16).digest()
+
+
+def _remember(counts: Dict[bytes, int]) -> None:
+    with _token_counts_lock:
+        _token_counts.update(counts)
+        while len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+            _token_counts.popitem(last=False)
+
+
+def count_tokens(text: str, encoding_name: str = ENCODING_NAME) -> int:
+    """
+    Returns the number of tokens of `text`. Counts are remembered by the hash of the text,
+    so texts counted again, e.g. the same documents for every sub-query, are not re-encoded.
+    """
+    return count_tokens_batch([text], encoding_name)[0]
+
+
+def count_tokens_batch(texts: List[str], encoding_name: str = ENCODING_NAME) -> List[int]:
+    """
+    Returns the number of tokens of every text. Texts not counted before are encoded in one
+    `encode_batch` call, which tokenizes them in parallel threads.
+    """
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return [-(-len(text) // CHARS_PER_TOKEN) for text in texts]
+
+    keys = [_key(text, encoding_name) for text in texts]
+    with _token_counts_lock:
+        counts = {key: _token_counts[key] for key in keys if key in _token_counts}
+        for key in counts:
+            _token_counts.move_to_end(key)
+
+    missing = {key: text for key, text in zip(keys, texts) if key not in counts}
+    if missing:
+        tokens = encoding.encode_batch(list(missing.values()), disallowed_special=())
+        new_counts = {key: len(encoded) for key, encoded in zip(missing, tokens)}
+        _remember(new_counts)
+        counts.update(new_counts)
+    return [counts[key] for key in keys]
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str = ENCODING_NAME) -> str:
+    """Returns the longest prefix of `text` that is at most `max_tokens` tokens long."""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
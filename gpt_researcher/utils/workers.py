@@ -0,0 +1,131 @@
+import asyncio
+import atexit
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures.thread import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class WorkerPool:
+    """
+    Bounds the scraping work of every research session running in the process.
+
+    Blocking scrapers run on one shared thread pool and every page, blocking or not,
+    has to hold a global slot and a slot for its host while it is being scraped.
+    """
+
+    def __init__(self, max_workers: int = 20, max_workers_per_host: int = 4):
+        self.max_workers = max_workers
+        self.max_workers_per_host = max_workers_per_host
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gptr-scraper")
+        # asyncio primitives are bound to the loop they are first used in
+        self._limits = weakref.WeakKeyDictionary()
+
+    def _get_limits(self) -> Tuple[asyncio.Semaphore, Dict[str, list]]:
+        loop = asyncio.get_running_loop()
+        limits = self._limits.get(loop)
+        if limits is None:
+            limits = (asyncio.Semaphore(self.max_workers), {})
+            self._limits[loop] = limits
+        return limits
+
+    @asynccontextmanager
+    async def throttle(self, url: str = ""):
+        """Hold a global slot and a per-host slot for the duration of the block."""
+        global_semaphore, hosts = self._get_limits()
+        host = urlparse(url).netloc.lower()
+
+        # Per-host semaphores are reference counted so idle hosts do not pile up
+        entry = hosts.setdefault(host, [asyncio.Semaphore(self.max_workers_per_host), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                async with global_semaphore:
+                    yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                hosts.pop(host, None)
+
+    async def run_in_executor(self, func, *args):
+        """Run a blocking callable on the shared thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+
+_worker_pools: Dict[Tuple[int, int], WorkerPool] = {}
+
+
+def get_worker_pool(max_workers: int = 20, max_workers_per_host: int = 4) -> WorkerPool:
+    """
+    Returns the process-wide worker pool for the given limits, so that concurrent
+    research sessions with the same configuration share a single in-flight cap.
+    """
+    key = (max_workers, max_workers_per_host)
+    if key not in _worker_pools:
+        _worker_pools[key] = WorkerPool(max_workers, max_workers_per_host)
+    return _worker_pools[key]
+
+
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+_process_pools_lock = threading.Lock()
+
+
+def get_process_pool(max_workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Returns the process-wide pool of `max_workers` processes used for CPU-bound parsing,
+    or None if `max_workers` is 0, in which case callers parse in the current process.
+
+    Workers are spawned rather than forked, since forking a process that runs threads
+    and an event loop can deadlock the child. They are started lazily on first use.
+    """
+    if max_workers <= 0:
+        return None
+    with _process_pools_lock:
+        pool = _process_pools.get(max_workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            _process_pools[max_workers] = pool
+            if len(_process_pools) == 1:
+                atexit.register(_shutdown_process_pools)
+        return pool
+
+
+def reset_process_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Discards a pool that broke because a worker died, e.g. on a malformed document,
+    so that the next call to `get_process_pool` starts a fresh one.
+    """
+    with _process_pools_lock:
+        for max_workers, existing in list(_process_pools.items()):
+            if existing is pool:
+                del _process_pools[max_workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_in_process(max_workers: int, func: Callable[..., Any], *args) -> Any:
+    """
+    Runs `func(*args)` on the process pool of `max_workers` processes and waits for its
+    result. Runs it in the calling thread when the pool is disabled or a worker died.
+    `func` has to be a module-level function, and its arguments and result picklable.
+    """
+    pool = get_process_pool(max_workers)
+    if pool is None:
+        return func(*args)
+    try:
+        return pool.submit(func, *args).result()
+    except BrokenProcessPool:
+        reset_process_pool(pool)
+        return func(*args)
+
+
+def _shutdown_process_pools() -> None:
+    with _process_pools_lock:
+        pools = list(_process_pools.values())
+        _process_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -4,6 +4,9 @@ from langchain_community.adapters.openai import convert_openai_messages
 
 from gpt_researcher.config.config import Config
 from gpt_researcher.utils.llm import create_chat_completion
+from gpt_researcher.utils.llm_cache import get_llm_cache
+from gpt_researcher.utils.llm_retry import get_retry_policy
+from gpt_researcher.utils.scheduler import get_scheduler
 
 from loguru import logger
 
@@ -28,6 +31,9 @@ async def call_model(
             temperature=0,
             llm_provider=cfg.smart_llm_provider,
             llm_kwargs=cfg.llm_kwargs,
+            cache=get_llm_cache(cfg),
+            retry=get_retry_policy(cfg),
+            scheduler=get_scheduler(cfg),
             # cost_callback=cost_callback,
         )
 
@@ -0,0 +1,26 @@
+from gpt_researcher.scraper.browser import pool
+
+
+class FakeDriver:
+    def __init__(self, settings):
+        self.settings = settings
+        self.current_window_handle = "base"
+
+    def quit(self):
+        pass
+
+
+def test_scrapers_with_different_settings_do_not_share_browsers(monkeypatch):
+    monkeypatch.setattr(pool, "_browser_pools", {})
+    headless = ("chrome", True, "agent", False)
+    headed = ("chrome", False, "agent", False)
+
+    headless_pool = pool.get_browser_pool(headless, lambda slot: FakeDriver(headless))
+    headed_pool = pool.get_browser_pool(headed, lambda slot: FakeDriver(headed))
+
+    assert headless_pool is not headed_pool
+    assert pool.get_browser_pool(headless, lambda slot: FakeDriver(None)) is headless_pool
+    with headed_pool.page() as driver:
+        assert driver.settings == headed
+    with headless_pool.page() as driver:
+        assert driver.settings == headless
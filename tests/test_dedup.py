@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+from gpt_researcher.scraper.dedup import ContentDeduplicator, canonical_url
+from gpt_researcher.skills import browser
+from gpt_researcher.skills.browser import BrowserManager
+
+
+def text(length=200, replaced=()):
+    return " ".join("changed" if i in replaced else f"word{i}" for i in range(length))
+
+
+def page(url, raw_content):
+    return {"url": url, "raw_content": raw_content}
+
+
+def test_canonical_url_merges_mirrors():
+    expected = canonical_url("https://example.com/news/story")
+    assert canonical_url("http://www.example.com/news/story/") == expected
+    assert canonical_url("https://m.example.com/news/story") == expected
+    assert canonical_url("https://amp.example.com/news/story") == expected
+    assert canonical_url("https://example.com/news/story/amp") == expected
+    assert canonical_url("https://example.com/news/story?amp") == expected
+    assert canonical_url("https://example.com/news/story?amp=1") == expected
+    assert canonical_url("https://example.com/news/story?outputType=amp") == expected
+
+
+def test_canonical_url_keeps_parameters_that_select_content():
+    assert canonical_url("https://example.com/search?q=amp") != canonical_url("https://example.com/search")
+    assert canonical_url("https://example.com/wiki?title=amp") != canonical_url("https://example.com/wiki?title=ohm")
+    assert canonical_url("https://example.com/story?id=1") != canonical_url("https://example.com/story?id=2")
+
+
+def test_exact_duplicates_are_dropped():
+    pages, duplicates = ContentDeduplicator().deduplicate([
+        page("https://a.com/1", text()),
+        page("https://b.com/2", text().upper()),
+    ])
+    assert duplicates == 1
+    assert [p["url"] for p in pages] == ["https://a.com/1"]
+    assert pages[0]["merged_urls"] == ["https://b.com/2"]
+
+
+def test_near_duplicates_are_dropped():
+    pages, duplicates = ContentDeduplicator(threshold=0.8).deduplicate([
+        page("https://a.com/1", text()),
+        page("https://b.com/2", text(replaced={50, 150})),
+    ])
+    assert duplicates == 1
+    assert len(pages) == 1
+
+
+def test_pages_below_the_threshold_are_kept():
+    pages, duplicates = ContentDeduplicator(threshold=0.8).deduplicate([
+        page("https://a.com/1", text()),
+        page("https://b.com/2", text(replaced=set(range(0, 200, 10)))),
+    ])
+    assert duplicates == 0
+    assert [p["url"] for p in pages] == ["https://a.com/1", "https://b.com/2"]
+
+
+def test_the_longest_page_of_a_batch_is_kept_in_order():
+    pages, duplicates = ContentDeduplicator(threshold=0.8).deduplicate([
+        page("https://short.com", text(190)),
+        page("https://other.com", " ".join(f"other{i}" for i in range(100))),
+        page("https://long.com", text(200)),
+    ])
+    assert duplicates == 1
+    assert [p["url"] for p in pages] == ["https://other.com", "https://long.com"]
+    assert pages[1]["merged_urls"] == ["https://short.com"]
+
+
+def test_merged_urls_stay_citable(monkeypatch):
+    async def scrape_urls(urls, cfg):
+        return [page(url, text()) for url in urls], []
+
+    monkeypatch.setattr(browser, "scrape_urls", scrape_urls)
+    sources = []
+    researcher = SimpleNamespace(
+        verbose=False,
+        websocket=None,
+        cfg=SimpleNamespace(deduplicate_content=True, deduplication_threshold=0.8),
+        visited_urls=set(),
+        add_research_sources=sources.extend,
+        add_research_images=lambda images: None,
+        get_research_images=lambda: [],
+    )
+
+    scraped = asyncio.run(BrowserManager(researcher).browse_urls(["https://a.com/1", "https://b.com/2"]))
+
+    assert [p["url"] for p in scraped] == ["https://a.com/1"]
+    assert scraped[0]["merged_urls"] == ["https://b.com/2"]
+    assert sources == scraped
+    assert "https://b.com/2" in researcher.visited_urls
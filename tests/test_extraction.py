@@ -0,0 +1,29 @@
+from gpt_researcher.scraper.extraction import extract_text, is_boilerplate, parse_html
+
+
+def test_layout_classes_do_not_prune_the_page():
+    html = """
+    <html><body class="home page has-sidebar">
+      <div id="page" class="site no-sidebar">
+        <p>This paragraph is the actual content of the page.</p>
+      </div>
+    </body></html>
+    """
+    assert extract_text(parse_html(html)) == "This paragraph is the actual content of the page."
+
+
+def test_content_tags_are_never_pruned():
+    root = parse_html('<html class="menu"><body class="sidebar"><main class="nav"><p>x</p></main></body></html>')
+    assert not any(is_boilerplate(element) for element in root.iter("html", "body", "main"))
+
+
+def test_boilerplate_tokens_match_exactly():
+    root = parse_html(
+        '<div><div class="sidebar widget">a</div><div class="right-sidebar">b</div><div id="footer">c</div></div>'
+    )
+    assert [is_boilerplate(element) for element in root.iter("div")][1:] == [True, False, True]
+
+
+def test_line_breaks_stay_in_their_block():
+    html = "<p>Hello world this is<br>the text.</p><p>Another paragraph of text.</p>"
+    assert extract_text(parse_html(html)) == "Hello world this is\nthe text.\n\nAnother paragraph of text."
@@ -0,0 +1,46 @@
+import asyncio
+
+from gpt_researcher.utils import llm
+from gpt_researcher.utils.cache import MemoryCache
+from gpt_researcher.utils.llm_cache import LLMCache
+
+
+class FakeProvider:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_chat_response(self, messages, stream, websocket=None):
+        self.calls += 1
+        return f"response {self.calls}"
+
+
+def complete(cache, temperature):
+    return asyncio.run(llm.create_chat_completion(
+        [{"role": "user", "content": "hi"}],
+        model="model",
+        llm_provider="fake",
+        temperature=temperature,
+        cache=cache,
+    ))
+
+
+def test_low_temperature_responses_are_cached(monkeypatch):
+    provider = FakeProvider()
+    monkeypatch.setattr(llm, "get_llm", lambda *args, **kwargs: provider)
+    cache = LLMCache(MemoryCache(), max_temperature=0.5)
+
+    assert complete(cache, 0.2) == "response 1"
+    assert complete(cache, 0.2) == "response 1"
+    assert provider.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_high_temperature_responses_are_not_cached(monkeypatch):
+    provider = FakeProvider()
+    monkeypatch.setattr(llm, "get_llm", lambda *args, **kwargs: provider)
+    cache = LLMCache(MemoryCache(), max_temperature=0.5)
+
+    assert complete(cache, 1) == "response 1"
+    assert complete(cache, 1) == "response 2"
+    assert provider.calls == 2
+    assert cache.stats()["hits"] + cache.stats()["misses"] == 0
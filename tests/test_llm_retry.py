@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx
+import pytest
+
+from gpt_researcher.utils import llm
+from gpt_researcher.utils.llm_retry import RetryPolicy, get_retry_after, hedged, is_retryable
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = httpx.Response(status_code, headers=headers or {})
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+def test_is_retryable():
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(529))
+    assert is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(StatusError(401))
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(APIConnectionError())
+    assert not is_retryable(ValueError("bad request"))
+
+
+def test_get_retry_after():
+    assert get_retry_after(StatusError(429, {"retry-after": "3"})) == 3.0
+    assert get_retry_after(StatusError(429, {"retry-after-ms": "1500", "retry-after": "3"})) == 1.5
+    assert get_retry_after(StatusError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert get_retry_after(StatusError(429, {"retry-after": "soon"})) is None
+    assert get_retry_after(StatusError(429)) is None
+    assert get_retry_after(ValueError()) is None
+
+
+def test_hedged_returns_the_first_response_and_cancels_the_other():
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        try:
+            # The first request is stuck, the hedged one answers quickly
+            await asyncio.sleep(10 if len(calls) == 1 else 0.01)
+        except asyncio.CancelledError:
+            calls.append("cancelled")
+            raise
+        return len(calls)
+
+    async def main():
+        result = await asyncio.wait_for(hedged(call, 0.05), timeout=5)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == 2
+    assert "cancelled" in calls
+
+
+def test_hedged_without_delay_makes_a_single_request():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return "ok"
+
+    assert asyncio.run(hedged(call, None)) == "ok"
+    assert calls == [1]
+
+
+class FakeProvider:
+    """Streams one paragraph per call, failing the first call with a retryable error."""
+
+    def __init__(self, fail_after_output: bool):
+        self.fail_after_output = fail_after_output
+        self.calls = 0
+
+    async def get_chat_response(self, messages, stream, websocket=None):
+        self.calls += 1
+        if self.fail_after_output:
+            await websocket.send_json({"type": "report", "output": "partial\n"})
+        if self.calls == 1:
+            raise StatusError(503)
+        await websocket.send_json({"type": "report", "output": "complete\n"})
+        return "complete"
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.outputs = []
+
+    async def send_json(self, data):
+        self.outputs.append(data["output"])
+
+
+@pytest.mark.parametrize("fail_after_output", [False, True])
+def test_streamed_calls_are_not_retried_once_output_was_sent(monkeypatch, fail_after_output):
+    provider = FakeProvider(fail_after_output)
+    monkeypatch.setattr(llm, "get_llm", lambda *args, **kwargs: provider)
+    websocket = FakeWebSocket()
+
+    async def main():
+        return await llm.create_chat_completion(
+            [{"role": "user", "content": "hi"}],
+            model="model",
+            llm_provider="fake",
+            stream=True,
+            websocket=websocket,
+            retry=RetryPolicy(max_retries=2, backoff_factor=0.01),
+        )
+
+    if fail_after_output:
+        with pytest.raises(StatusError):
+            asyncio.run(main())
+        assert provider.calls == 1
+        assert websocket.outputs == ["partial\n"]
+    else:
+        assert asyncio.run(main()) == "complete"
+        assert provider.calls == 2
+        assert websocket.outputs == ["complete\n"]
@@ -0,0 +1,60 @@
+import pytest
+
+from gpt_researcher.context import packing
+from gpt_researcher.context.packing import pack_context
+
+
+@pytest.fixture(autouse=True)
+def count_words(monkeypatch):
+    """Counts a token per word so that budgets are easy to reason about."""
+    calls = []
+
+    def count_tokens_batch(texts):
+        calls.append(list(texts))
+        return [len(text.split()) for text in texts]
+
+    monkeypatch.setattr(packing, "count_tokens_batch", count_tokens_batch)
+    monkeypatch.setattr(packing, "count_tokens", lambda text: len(text.split()))
+    monkeypatch.setattr(packing, "truncate_to_tokens", lambda text, max_tokens: " ".join(text.split()[:max_tokens]))
+    return calls
+
+
+def chunk(source, words=8):
+    # "Source: <url>" counts as two words
+    return f"Source: {source}\n" + " ".join(["word"] * (words - 2))
+
+
+def test_chunks_are_taken_by_rank_across_sub_queries():
+    context = ["\n".join([chunk("a1"), chunk("a2"), chunk("a3")]), "\n".join([chunk("b1"), chunk("b2")])]
+    # Room for four chunks of 8 words and their separators
+    packed, report = pack_context(context, 36)
+    assert packed == ["\n".join([chunk("a1"), chunk("a2")]), "\n".join([chunk("b1"), chunk("b2")])]
+    assert report["kept_chunks"] == 4
+    assert report["dropped_chunks"] == 1
+    assert report["dropped_sources"] == ["a3"]
+
+
+def test_chunks_are_dropped_whole():
+    context = "\n".join([chunk("a", 8), chunk("b", 20), chunk("c", 8)])
+    packed, report = pack_context(context, 25)
+    # b does not fit, but the smaller c after it still does
+    assert packed == "\n".join([chunk("a", 8), chunk("c", 8)])
+    assert report["sources"] == ["a", "c"]
+    assert not report["truncated"]
+
+
+def test_duplicate_chunks_are_kept_once(count_words):
+    context = [chunk("a"), "\n".join([chunk("a"), chunk("b")])]
+    packed, report = pack_context(context, 100)
+    assert packed == [chunk("a"), chunk("b")]
+    assert report["kept_chunks"] == 2
+    # All chunks are counted in a single batch
+    assert count_words == [[chunk("a"), chunk("b")]]
+
+
+def test_the_top_chunk_is_truncated_if_nothing_fits():
+    packed, report = pack_context("\n".join([chunk("a", 50), chunk("b", 50)]), 11)
+    assert packed.split() == ["Source:", "a"] + ["word"] * 8
+    assert report["truncated"]
+    assert report["tokens"] == 11
+    assert report["kept_chunks"] == 1
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+from gpt_researcher.utils.scheduler import RateLimiter
+
+
+def test_refill_wakes_waiters_blocked_on_concurrency():
+    # The third request queues behind the concurrency limit and then has to wait for the
+    # token bucket to refill, which no other request arrives to trigger
+    limiter = RateLimiter(max_concurrency=1, tpm=600)
+
+    async def request(tokens):
+        async with limiter.acquire(tokens=tokens):
+            await asyncio.sleep(0.01)
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.wait_for(asyncio.gather(request(300), request(290), request(20)), timeout=10)
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 5
+
+
+def test_refill_wakes_blocking_waiters():
+    limiter = RateLimiter(max_concurrency=1, tpm=600)
+
+    def request(tokens):
+        with limiter.acquire_sync(tokens=tokens):
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=request, args=(tokens,), daemon=True) for tokens in (300, 290, 20)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_blocking_acquire_refuses_to_block_the_event_loop():
+    limiter = RateLimiter(max_concurrency=1)
+
+    async def main():
+        async with limiter.acquire():
+            try:
+                with limiter.acquire_sync():
+                    pass
+            except RuntimeError:
+                return True
+        return False
+
+    assert asyncio.run(asyncio.wait_for(main(), timeout=5))
+    # The refused request left no waiter behind
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_cached_embeddings_do_not_block_the_event_loop():
+    from langchain_core.embeddings import Embeddings
+
+    from gpt_researcher.memory.embedding_cache import CachedEmbeddings
+    from gpt_researcher.utils.scheduler import Scheduler
+
+    class FakeEmbeddings(Embeddings):
+        def embed_documents(self, texts):
+            return [[float(len(text))] for text in texts]
+
+        def embed_query(self, text):
+            return [float(len(text))]
+
+    scheduler = Scheduler({"llm": (1, 0, 0), "embedding": (1, 0, 0)})
+    embeddings = CachedEmbeddings(FakeEmbeddings(), namespace="fake:model", scheduler=scheduler)
+
+    async def main():
+        # Another request holds the only embedding slot while a blocking call runs on the loop
+        async with scheduler.limit("embedding", "fake"):
+            return embeddings.embed_documents(["a", "bb"])
+
+    assert asyncio.run(asyncio.wait_for(main(), timeout=5)) == [[1.0], [2.0]]
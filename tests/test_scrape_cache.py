@@ -0,0 +1,36 @@
+import pytest
+
+from gpt_researcher.scraper.cache import ScrapeCache
+
+
+def make_cache(tmp_path, validators):
+    cache = ScrapeCache(str(tmp_path / "scrape_cache.sqlite"), ttl=3600)
+    cache.set("https://example.com/page", "content", [], "title", validators)
+    return cache
+
+
+def expires_in(cache, url="https://example.com/page"):
+    entry = cache.cache.get_entry(cache.get_key(url))
+    return entry["expires_at"] - entry["created_at"]
+
+
+def test_refresh_uses_the_max_age_of_the_304(tmp_path):
+    cache = make_cache(tmp_path, {"etag": '"v1"', "max_age": 60})
+    cache.refresh("https://example.com/page", {"max_age": 120})
+    assert expires_in(cache) == pytest.approx(120)
+    assert not cache.get("https://example.com/page")["stale"]
+
+
+def test_refresh_without_max_age_falls_back_to_the_ttl(tmp_path):
+    cache = make_cache(tmp_path, {"etag": '"v1"', "max_age": 60})
+    cache.refresh("https://example.com/page", {})
+    assert expires_in(cache) == pytest.approx(3600)
+
+
+def test_refresh_keeps_the_new_validators(tmp_path):
+    cache = make_cache(tmp_path, {"etag": '"v1"'})
+    cache.refresh("https://example.com/page", {"etag": '"v2"', "max_age": 0})
+    cached = cache.get("https://example.com/page")
+    assert cached["etag"] == '"v2"'
+    assert cached["raw_content"] == "content"
+    assert cached["stale"]
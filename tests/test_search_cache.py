@@ -0,0 +1,41 @@
+import asyncio
+from functools import partial
+
+from gpt_researcher.actions.retriever import search_with_retriever
+from gpt_researcher.retrievers.base import AsyncRetriever
+from gpt_researcher.retrievers.cache import SearchCache
+from gpt_researcher.utils.cache import MemoryCache
+
+
+class TopicSearch(AsyncRetriever):
+    searches = 0
+
+    def __init__(self, query, topic="general"):
+        self.query = query
+        self.topic = topic
+
+    def get_search_params(self):
+        return {"topic": self.topic}
+
+    async def asearch(self, max_results=7):
+        TopicSearch.searches += 1
+        return [{"href": f"https://example.com/{self.topic}", "body": self.query}]
+
+
+def test_search_parameters_are_part_of_the_cache_key():
+    cache = SearchCache(MemoryCache())
+    assert cache.get_key(TopicSearch("q"), "q", 5) != cache.get_key(TopicSearch("q", "news"), "q", 5)
+    assert cache.get_key(TopicSearch("q"), "q", 5) == cache.get_key(TopicSearch("Q "), " Q", 5)
+
+
+def test_searches_are_only_served_from_the_cache_for_the_same_parameters():
+    cache = SearchCache(MemoryCache())
+    TopicSearch.searches = 0
+
+    general = asyncio.run(search_with_retriever(TopicSearch, "q", 5, 1, cache))
+    assert asyncio.run(search_with_retriever(TopicSearch, "q", 5, 1, cache)) == general
+    assert TopicSearch.searches == 1
+
+    news = asyncio.run(search_with_retriever(partial(TopicSearch, topic="news"), "q", 5, 1, cache))
+    assert news == [{"href": "https://example.com/news", "body": "q"}]
+    assert TopicSearch.searches == 2